@@ -1,87 +1,108 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
+from functools import partial
 import numpy as np
-import requests
-import urllib.parse
-import plotly.express as px
-import plotly.graph_objects as go
-from scipy.stats import linregress
-from sklearn.preprocessing import StandardScaler
-from sklearn.neighbors import NearestNeighbors
-import matplotlib.pyplot as plt
-from sklearn.decomposition import PCA
-from sklearn.manifold import TSNE
-import umap.umap_ as umap
+# plotly, scipy, sklearn, matplotlib and umap are imported inside the mode that uses
+# them, so a rerun or a fresh worker only loads what the chosen mode needs
+from derived_features import load_features
+from frame_cache import FrameCache
+from frame_schema import compact_frame, concat_frames
+from league_manifest import league_names
+from league_summary import read_summary
+from parallel_loader import load_in_parallel
+from player_index import embedding, load_index, nearest, pool_embedding
+from player_form import WINDOW, form_leaderboard, form_series, form_trends
+from position_profiles import PROFILES, goalkeeper_table
+from profile_pool import score_profiles
+from rankings import load_rankings
+from ratio_features import add_ratio_features
+from stage_profiler import StageLog, mark_miss
+from set_pieces import SET_PIECE_TYPES, X_EDGES, Y_EDGES, load_events, load_set_pieces, sum_grid, zone_summary
+from team_matches import in_window, load_team_matches
 
 st.set_page_config(layout='wide')
 
-repo_url = "https://api.github.com/repos/AC-Horsens/AC-Horsens-scouting/contents/"
+
+def github_token():
+    # Sent with every league list refresh, so it is not held to GitHub's unauthenticated rate limit
+    try:
+        return st.secrets['github_token']
+    except Exception:
+        return None
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def project_2d(X_raw, method, n_neighbors=15, min_dist=0.3):
+    """2-D projection of the League/Team Comparison features, computed once per
+    (data, method, parameters). 'umap' uses cosine distance on the raw values,
+    'pca' standardises first."""
+    from sklearn.decomposition import PCA
+    from sklearn.preprocessing import StandardScaler
+
+    mark_miss()
+    if method == "umap":
+        # umap pulls in numba and takes seconds to import, so it is only loaded when needed
+        import umap.umap_ as umap
+        reducer = umap.UMAP(
+            n_components=2,
+            metric="cosine",
+            random_state=42,
+            n_neighbors=n_neighbors,
+            min_dist=min_dist
+        )
+        return reducer.fit_transform(X_raw)
+    X_scaled = StandardScaler().fit_transform(X_raw)
+    return PCA(n_components=2).fit_transform(X_scaled)
+
+
+def timed_project_2d(X_raw, method, **params):
+    with perf.stage('project_2d', rows_in=len(X_raw), cached=True, detail=method):
+        return project_2d(X_raw, method, **params)
+
+
+def timed_loader(stage, load_fn):
+    """``load_fn`` for load_in_parallel, recorded as one cached stage per league."""
+    def load(league):
+        with perf.stage(stage, cached=True, detail=league) as record:
+            df = load_fn(league)
+            record['rows_out'] = len(df)
+        return df
+    return load
+
 
 # Get list of folders (leagues)
-view_mode = st.sidebar.radio('Choose mode', ['Scouting', 'League Comparison', 'Team Comparison'], index=0)
+view_mode = st.sidebar.radio('Choose mode', ['Scouting', 'League Comparison', 'Team Comparison', 'Set Pieces'], index=0, key='mode')
+
+# Stage timings of this session; the panel is filled in at the end of the run
+if 'stage_log' not in st.session_state:
+    st.session_state.stage_log = StageLog()
+perf = st.session_state.stage_log
+perf.start_run()
+perf.enable(st.sidebar.toggle('Performance panel', key='perf_panel'))
+perf_panel = st.sidebar.container()
 
 if view_mode == 'League Comparison':
-    st.title("🏆 League Comparison Dashboard")
+    import plotly.express as px
+    from sklearn.neighbors import NearestNeighbors
+    from sklearn.preprocessing import StandardScaler
 
-    # ------------------------------------------------------------
-    # LOAD ALL LEAGUES AUTOMATICALLY
-    # ------------------------------------------------------------
-    @st.cache_data(show_spinner="Loading all leagues from GitHub…")
-    def load_all_leagues():
-        """Fetch all league folders and load their matchstats CSVs."""
-        base_url = "https://raw.githubusercontent.com/AC-Horsens/AC-Horsens-scouting/main/"
-        api_url = "https://api.github.com/repos/AC-Horsens/AC-Horsens-scouting/contents"
-
-        # get league folders
-        resp = requests.get(api_url)
-        if resp.status_code != 200:
-            st.error(f"Failed to fetch repo contents: {resp.status_code}")
-            st.stop()
-        contents = resp.json()
-        league_folders = [x["name"] for x in contents if x["type"] == "dir"]
-
-        dfs = []
-        for league in league_folders:
-            file_url = f"{base_url}{league}/matchstats_all%20{league}.csv"
-            try:
-                df = pd.read_csv(file_url)
-                df["source_folder"] = league
-                df["source_file"] = f"matchstats_all {league}.csv"
-                dfs.append(df)
-            except Exception as e:
-                st.warning(f"⚠️ Could not load {league}: {e}")
-
-        if not dfs:
-            st.error("No league data could be loaded from GitHub.")
-            st.stop()
-
-        return pd.concat(dfs, ignore_index=True)
+    st.title("🏆 League Comparison Dashboard")
 
     # ------------------------------------------------------------
-    # LOAD + CLEAN DATA
+    # LOAD PRECOMPUTED LEAGUE SUMMARY (python league_summary.py)
     # ------------------------------------------------------------
-    df_leagues = load_all_leagues()
+    df_leagues = read_summary()
+    if df_leagues is None:
+        st.error("No league summary found. Build it with `python league_summary.py`.")
+        st.stop()
 
     # basic cleaning
-    if "league_name" in df_leagues.columns:
-        df_leagues = df_leagues[~df_leagues["league_name"].str.contains("DBU", na=False)]
-    if "successfulOpenPlayPass" in df_leagues.columns:
-        df_leagues = df_leagues[df_leagues["successfulOpenPlayPass"].notna()]
-    df_leagues = df_leagues.drop(columns='minsPlayed')
-
-    # aggregate by league
-    df_leagues = (
-        df_leagues.groupby(["league_name","country", "label", "date"])
-        .sum(numeric_only=True)
-        .round(2)
-    )
-    df_leagues = df_leagues.groupby(["league_name","country"]).mean(numeric_only=True).round(2)
+    df_leagues = df_leagues[~df_leagues["league_name"].str.contains("DBU", na=False)]
+
     # ------------------------------------------------------------
     # DISPLAY TABLE
     # ------------------------------------------------------------
-    # Reset and filter leagues
-    df_leagues = df_leagues.reset_index()
+    # Filter leagues
     #df_leagues = df_leagues[
     #    df_leagues['league_name'].isin([
     #        "Allsvenskan",
@@ -93,11 +114,7 @@ if view_mode == 'League Comparison':
     #    ])
     #]
 
-    # Group by league and country
-    df_leagues = (
-        df_leagues.groupby(["league_name", "country"])
-        .mean(numeric_only=True)
-        .round(2))
+    df_leagues = df_leagues.set_index(["league_name", "country"])
 
     st.subheader("🤝 Find Similar Leagues")
 
@@ -118,7 +135,6 @@ if view_mode == 'League Comparison':
             X = X_raw.values
         else:
             # Euclidean / Manhattan → standardiser features
-            from sklearn.preprocessing import StandardScaler
             scaler = StandardScaler()
             X = scaler.fit_transform(X_raw)
 
@@ -146,26 +162,11 @@ if view_mode == 'League Comparison':
     X_raw = df_leagues.select_dtypes(include="number").fillna(0)
 
     if metric_choice == "cosine":
-        import umap.umap_ as umap
-
         # Brug rå værdier, lad UMAP selv håndtere cosine
-        reducer = umap.UMAP(
-            n_components=2,
-            metric="cosine",
-            random_state=42,
-            n_neighbors=10,
-            min_dist=0.2
-        )
-        X_embedded = reducer.fit_transform(X_raw)
+        X_embedded = timed_project_2d(X_raw, "umap", n_neighbors=10, min_dist=0.2)
         method_name = "UMAP (Cosine)"
     else:
-        from sklearn.preprocessing import StandardScaler
-        from sklearn.decomposition import PCA
-
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X_raw)
-        pca = PCA(n_components=2)
-        X_embedded = pca.fit_transform(X_scaled)
+        X_embedded = timed_project_2d(X_raw, "pca")
         method_name = "PCA"
 
     # Combine with metadata
@@ -201,33 +202,27 @@ if view_mode == 'League Comparison':
     st.plotly_chart(fig, use_container_width=True)
 
 if view_mode == 'Team Comparison':
+    import plotly.express as px
+    from sklearn.neighbors import NearestNeighbors
+    from sklearn.preprocessing import normalize
+
     st.title("⚽ Team Comparison Dashboard")
 
     # ------------------------------------------------------------
     # LOAD + FILTER BY SELECTED LEAGUES
     # ------------------------------------------------------------
-    @st.cache_data(show_spinner="Loading selected leagues…")
-    def load_league_data(selected_leagues):
-        base_url = "https://raw.githubusercontent.com/AC-Horsens/AC-Horsens-scouting/main/"
-        dfs = []
-        for league in selected_leagues:
-            file_url = f"{base_url}{league}/matchstats_all%20{league}.csv"
-            try:
-                df = pd.read_csv(file_url)
-                df["source_folder"] = league
-                dfs.append(df)
-            except Exception as e:
-                st.warning(f"⚠️ Could not load {league}: {e}")
-        return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+    @st.cache_data(show_spinner=False)
+    def load_league_data(league):
+        # Per-team match rows (python team_matches.py), not the player-level matchstats
+        df = compact_frame(load_team_matches(league))
+        df["source_folder"] = league
+        return df
 
     # ------------------------------------------------------------
     # SELECT LEAGUES
     # ------------------------------------------------------------
-    api_url = "https://api.github.com/repos/AC-Horsens/AC-Horsens-scouting/contents"
-    resp = requests.get(api_url)
-    if resp.status_code == 200:
-        contents = resp.json()
-        league_folders = [x["name"] for x in contents if x["type"] == "dir"]
+    league_folders = league_names(token=github_token())
+    if league_folders:
         selected_leagues = st.multiselect("Select leagues:", league_folders)
     else:
         st.error("Could not fetch league list.")
@@ -237,138 +232,68 @@ if view_mode == 'Team Comparison':
         st.info("Select one or more leagues to compare teams.")
         st.stop()
 
-    df_teams = load_league_data(selected_leagues)
+    with st.spinner("Loading selected leagues…"):
+        loaded, failed = load_in_parallel(selected_leagues, timed_loader('load_team_matches', load_league_data))
+    for league, e in failed.items():
+        st.warning(f"⚠️ Could not load {league}: {e}")
+    if not loaded:
+        st.error("None of the selected leagues could be loaded.")
+        st.stop()
+    df_teams = concat_frames(loaded.values())
 
     # ------------------------------------------------------------
-    # FILTER BY DATE (LAST 3 MONTHS)
+    # FILTER BY DATE WINDOW
     # ------------------------------------------------------------
-    df_teams["date"] = pd.to_datetime(df_teams["date"], errors="coerce")
-    recent_date = pd.Timestamp.now() - pd.DateOffset(months=3)
-    df_teams = df_teams[df_teams["date"] >= recent_date]
+    window = st.radio(
+        "Window:",
+        ["Last 3 months", "Date range", "Last N matches"],
+        horizontal=True,
+    )
+    if window == "Last 3 months":
+        df_teams = in_window(df_teams, start=pd.Timestamp.now() - pd.DateOffset(months=3))
+        window_label = "Last 3 Months"
+    elif window == "Date range":
+        first_date, last_date = df_teams["date"].min().date(), df_teams["date"].max().date()
+        date_range = st.date_input(
+            "Match dates:",
+            value=(max(first_date, (pd.Timestamp(last_date) - pd.DateOffset(months=3)).date()), last_date),
+            min_value=first_date,
+            max_value=last_date,
+        )
+        # While only the first date is picked the range is open-ended
+        start, end = (list(date_range) + [None])[:2]
+        df_teams = in_window(df_teams, start=pd.Timestamp(start), end=pd.Timestamp(end) if end else None)
+        window_label = f"{start} to {end or last_date}"
+    else:
+        last_n = st.number_input("Matches per team:", min_value=1, max_value=60, value=10)
+        df_teams = in_window(df_teams, last_n=int(last_n))
+        window_label = f"Last {int(last_n)} Matches"
+    if df_teams.empty:
+        st.info("No matches in the selected window.")
+        st.stop()
 
     # ------------------------------------------------------------
-    # CLEANING + TEAM AGGREGATION
+    # TEAM AGGREGATION
     # ------------------------------------------------------------
-    if "successfulOpenPlayPass" in df_teams.columns:
-        df_teams = df_teams[df_teams["successfulOpenPlayPass"].notna()]
-    df_teams = df_teams.drop(columns=["formationUsed", "minsPlayed"], errors="ignore")
-
     if "team_name" not in df_teams.columns:
         st.error("Column 'team_name' missing from dataset.")
         st.stop()
     df_teams = (
-        df_teams.groupby(["source_folder", "team_name",'date'])
+        df_teams.groupby(["source_folder", "team_name",'date'], observed=True)
         .sum(numeric_only=True)
+        .astype(float)
         .round(2)
         .reset_index()
     )
 
     df_teams = (
-        df_teams.groupby(["source_folder", "team_name"])
+        df_teams.groupby(["source_folder", "team_name"], observed=True)
         .mean(numeric_only=True)
         .round(2)
         .reset_index()
     )
-    df_teams['duel_win_%'] = np.where(
-        (df_teams['duelWon'] + df_teams['duelLost']) > 0,
-        100 * df_teams['duelWon'] / (df_teams['duelWon'] + df_teams['duelLost']),
-        0
-    )
-
-    df_teams['pass_%'] = np.where(
-        df_teams['openPlayPass'] > 0,
-        100 * df_teams['successfulOpenPlayPass'] / df_teams['openPlayPass'],
-        0
-    )
-
-    # Zone shares
-    df_teams['own_half_pass_share_%'] = np.where(
-        df_teams['openPlayPass'] > 0,
-        100 * df_teams['totalBackZonePass'] / df_teams['openPlayPass'],
-        0
-    )
-
-    df_teams['opponent_half_pass_share_%'] = np.where(
-        df_teams['openPlayPass'] > 0,
-        100 * df_teams['totalFwdZonePass'] / df_teams['openPlayPass'],
-        0
-    )
-
-    df_teams['final_third_pass_share_%'] = np.where(
-        df_teams['openPlayPass'] > 0,
-        100 * df_teams['totalFinalThirdPasses'] / df_teams['openPlayPass'],
-        0
-    )
-
-    # Accuracy for hver zone
-    df_teams['back_zone_pass_accuracy_%'] = np.where(
-        df_teams['totalBackZonePass'] > 0,
-        100 * df_teams['accurateBackZonePass'] / df_teams['totalBackZonePass'],
-        0
-    )
-
-    df_teams['fwd_zone_pass_accuracy_%'] = np.where(
-        df_teams['totalFwdZonePass'] > 0,
-        100 * df_teams['accurateFwdZonePass'] / df_teams['totalFwdZonePass'],
-        0
-    )
-
-    df_teams['final_third_pass_accuracy_%'] = np.where(
-        df_teams['totalFinalThirdPasses'] > 0,
-        100 * df_teams['successfulFinalThirdPasses'] / df_teams['totalFinalThirdPasses'],
-        0
-    )
-
-    # Forward pass share
-    df_teams['forward_pass_share_%'] = np.where(
-        df_teams['openPlayPass'] > 0,
-        100 * df_teams['fwdPass'] / df_teams['openPlayPass'],
-        0
-    )
-
-    df_teams['cross_per_final_third_pass_%'] = np.where(
-        df_teams['totalFinalThirdPasses'] > 0,
-        100 * df_teams['totalCrossNocorner'] / df_teams['totalFinalThirdPasses'],
-        0
-    )
-
-    # Crosses pr. entries i final third
-    df_teams['cross_per_final_third_entry_%'] = np.where(
-        df_teams['finalThirdEntries'] > 0,
-        100 * df_teams['totalCrossNocorner'] / df_teams['finalThirdEntries'],
-        0
-    )
-    df_teams['total_poss_won'] = (
-        df_teams['possWonDef3rd'] +
-        df_teams['possWonMid3rd'] +
-        df_teams['possWonAtt3rd']
-    )
-
-    # Andel i defensiv tredjedel
-    df_teams['poss_won_def3rd_%'] = np.where(
-        df_teams['total_poss_won'] > 0,
-        100 * df_teams['possWonDef3rd'] / df_teams['total_poss_won'],
-        0
-    )
-
-    # Andel i midterste tredjedel
-    df_teams['poss_won_mid3rd_%'] = np.where(
-        df_teams['total_poss_won'] > 0,
-        100 * df_teams['possWonMid3rd'] / df_teams['total_poss_won'],
-        0
-    )
-
-    # Andel i offensiv tredjedel
-    df_teams['poss_won_att3rd_%'] = np.where(
-        df_teams['total_poss_won'] > 0,
-        100 * df_teams['possWonAtt3rd'] / df_teams['total_poss_won'],
-        0
-    )
-    df_teams['long_pass_share_%'] = np.where(
-        df_teams['openPlayPass'] > 0,
-        100 * df_teams['totalLongBalls'] / df_teams['openPlayPass'],
-        0
-    )
+    # Ratio features (ratio_features.RATIO_FEATURES), computed in one pass
+    df_teams = add_ratio_features(df_teams)
     df_teams = df_teams[[
         'team_name',
         'source_folder',
@@ -396,7 +321,7 @@ if view_mode == 'Team Comparison':
     # ------------------------------------------------------------
     # DISPLAY TABLE
     # ------------------------------------------------------------
-    st.subheader("📊 Team Averages (Last 3 Months)")
+    st.subheader(f"📊 Team Averages ({window_label})")
     st.dataframe(df_teams, use_container_width=True,hide_index=True)
 
     # ------------------------------------------------------------
@@ -414,8 +339,6 @@ if view_mode == 'Team Comparison':
     selected_team = st.selectbox("Select a team:", df_teams["team_name"].unique())
 
     if selected_team:
-        from sklearn.preprocessing import normalize
-
         # Normaliser for cosine-baseret sammenligning
         X_raw = df_teams.select_dtypes(include="number").fillna(0)
         X = normalize(X_raw)
@@ -446,31 +369,16 @@ if view_mode == 'Team Comparison':
 
     st.subheader("🧭 Team Visualization (Dimensionality Reduction)")
 
-    from sklearn.preprocessing import normalize
     X_raw = df_teams.select_dtypes(include="number").fillna(0)
 
     # Choose dimensionality reduction method based on metric
     if metric_choice == "cosine":
-        import umap.umap_ as umap
-
         # Brug rå værdier og lad UMAP selv håndtere cosine-afstanden
-        reducer = umap.UMAP(
-            n_components=2,
-            metric="cosine",
-            random_state=42,
-            n_neighbors=15,
-            min_dist=0.3
-        )
-        X_embedded = reducer.fit_transform(X_raw)
+        X_embedded = timed_project_2d(X_raw, "umap", n_neighbors=15, min_dist=0.3)
         method_name = "UMAP (cosine)"
     else:
         # StandardScaler giver fair vægtning pr. feature for Euclidean/Manhattan
-        from sklearn.preprocessing import StandardScaler
-        from sklearn.decomposition import PCA
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X_raw)
-        pca = PCA(n_components=2)
-        X_embedded = pca.fit_transform(X_scaled)
+        X_embedded = timed_project_2d(X_raw, "pca")
         method_name = "PCA"
 
 
@@ -495,68 +403,165 @@ if view_mode == 'Team Comparison':
     fig.update_traces(textposition="top center")
     st.plotly_chart(fig, use_container_width=True)
 
+if view_mode == 'Set Pieces':
+    import plotly.express as px
+
+    st.title("🎯 Set Pieces Dashboard")
+
+    # ------------------------------------------------------------
+    # LOAD AGGREGATES (python set_pieces.py)
+    # ------------------------------------------------------------
+    @st.cache_data(show_spinner=False)
+    def load_set_piece_tables(league):
+        tables = load_set_pieces(league)
+        for name in ["teams", "players"]:
+            tables[name].insert(0, "source_folder", league)
+        return tables
+
+    @st.cache_data(show_spinner=False)
+    def load_set_piece_events(league):
+        return load_events(league)
+
+    league_folders = league_names(token=github_token())
+    selected_leagues = st.multiselect("Select leagues:", league_folders)
+    if not selected_leagues:
+        st.info("Select one or more leagues to compare set pieces.")
+        st.stop()
+
+    with st.spinner("Loading set pieces…"):
+        loaded, failed = load_in_parallel(selected_leagues, load_set_piece_tables)
+    for league, e in failed.items():
+        st.warning(f"⚠️ Could not load set pieces for {league}: {e}")
+    if not loaded:
+        st.error("None of the selected leagues have set-piece data.")
+        st.stop()
+    df_teams, df_players = (
+        pd.concat([tables[name] for tables in loaded.values()], ignore_index=True)
+        for name in ['teams', 'players']
+    )
+    grids = {league: tables["grid"] for league, tables in loaded.items()}
+
+    set_piece_types = st.multiselect(
+        "Set-piece types:",
+        SET_PIECE_TYPES,
+        default=[t for t in SET_PIECE_TYPES if t != 'penalty'],
+    )
+    df_teams = df_teams[df_teams["set_piece_type"].isin(set_piece_types)]
+    df_players = df_players[df_players["set_piece_type"].isin(set_piece_types)]
+    if df_teams.empty:
+        st.info("No set-piece shots for the selected types.")
+        st.stop()
+
+    # ------------------------------------------------------------
+    # TEAMS
+    # ------------------------------------------------------------
+    st.subheader("📊 Set-piece output per team")
+    team_totals = (
+        df_teams.groupby(["source_folder", "team_name"])
+        .agg(matches=("matches", "max"), shots=("shots", "sum"), goals=("goals", "sum"),
+             on_target=("on_target", "sum"), xg=("xg", "sum"))
+        .reset_index()
+    )
+    team_totals["xg_per_match"] = np.where(team_totals["matches"] > 0, team_totals["xg"] / team_totals["matches"], 0)
+    team_totals["xg_per_shot"] = team_totals["xg"] / team_totals["shots"]
+    team_totals = team_totals.sort_values("xg_per_match", ascending=False).round(3)
+    st.dataframe(team_totals, use_container_width=True, hide_index=True)
+
+    by_type = df_teams.merge(team_totals[["source_folder", "team_name"]], on=["source_folder", "team_name"])
+    by_type["xg_per_match"] = np.where(by_type["matches"] > 0, by_type["xg"] / by_type["matches"], 0)
+    fig = px.bar(
+        by_type,
+        x="team_name",
+        y="xg_per_match",
+        color="set_piece_type",
+        category_orders={"team_name": team_totals["team_name"].tolist()},
+        title="Set-piece xG per match by type",
+        height=500,
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # ------------------------------------------------------------
+    # HEATMAP + ZONES (from the pre-binned grids, any number of leagues)
+    # ------------------------------------------------------------
+    all_teams = "All teams in the selected leagues"
+    team_options = [all_teams] + [f"{row.team_name} ({row.source_folder})" for row in team_totals.itertuples()]
+    selected_team = st.selectbox("Select a team:", team_options)
+    if selected_team == all_teams:
+        grid_total = sum_grid(grids.values(), set_piece_types=set_piece_types)
+        team_league, team_name = None, "the selected leagues"
+    else:
+        team_row = team_totals.iloc[team_options.index(selected_team) - 1]
+        team_league, team_name = team_row["source_folder"], team_row["team_name"]
+        grid_total = sum_grid([grids[team_league]], teams=[team_name], set_piece_types=set_piece_types)
+
+    heat_metric = st.radio("Heatmap:", ["xg", "shots", "goals"], horizontal=True)
+    import matplotlib.pyplot as plt
+    from mplsoccer import Pitch
+
+    pitch = Pitch(pitch_type="opta", half=True, line_zorder=2)
+    fig, ax = pitch.draw(figsize=(7, 5))
+    x_grid, y_grid = np.meshgrid(X_EDGES, Y_EDGES)
+    cx, cy = np.meshgrid((X_EDGES[:-1] + X_EDGES[1:]) / 2, (Y_EDGES[:-1] + Y_EDGES[1:]) / 2)
+    # mplsoccer wants the statistic as (y, x)
+    pitch.heatmap({"statistic": grid_total[heat_metric].T, "x_grid": x_grid, "y_grid": y_grid, "cx": cx, "cy": cy},
+                  ax=ax, cmap="Reds", edgecolors="white")
+    ax.set_title(f"Set-piece shots ({heat_metric}) for {team_name}")
+    st.pyplot(fig)
+    plt.close(fig)
+
+    st.write(f"Where **{team_name}**'s set-piece shots are taken:")
+    st.dataframe(zone_summary(grid_total).round(2), use_container_width=True)
+
+    if team_league is None:
+        st.stop()
+
+    min_shots = st.number_input("Minimum shots per player:", min_value=1, max_value=50, value=2)
+    targets = (
+        df_players[(df_players["source_folder"] == team_league) & (df_players["team_name"] == team_name)]
+        .groupby("playerName")
+        .agg(shots=("shots", "sum"), goals=("goals", "sum"), on_target=("on_target", "sum"), xg=("xg", "sum"))
+        .reset_index()
+    )
+    targets = targets[targets["shots"] >= min_shots].sort_values("xg", ascending=False).round(3)
+    st.write(f"Players **{team_name}**'s set pieces find:")
+    st.dataframe(targets, use_container_width=True, hide_index=True)
+
+    # Event rows are only read here
+    if st.checkbox("Show shot map (event level)"):
+        events = load_set_piece_events(team_league)
+        events = events[(events["team_name"] == team_name) & (events["set_piece_type"].isin(set_piece_types))]
+        fig = px.scatter(
+            events,
+            x="x",
+            y="y",
+            color="set_piece_type",
+            size="xg",
+            symbol="state",
+            hover_data=["playerName", "label", "date", "zone", "goal"],
+            range_x=[50, 100],
+            range_y=[0, 100],
+            title=f"{team_name}: set-piece shots (attacking towards x = 100)",
+            height=600,
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
 if view_mode == 'Scouting':
 
-    response = requests.get(repo_url)
-    repo_content = response.json()
-    @st.cache_data(ttl=3600)
-    def get_leagues():
-        repo_url = "https://api.github.com/repos/AC-Horsens/AC-Horsens-scouting/contents"
-        headers = {"Authorization": f"token {st.secrets['github_token']}"}
-
-        response = requests.get(repo_url, headers=headers)
-
-        if response.status_code != 200:
-            st.error(f"GitHub API error: {response.status_code}")
-            return []
-
-        try:
-            repo_content = response.json()
-        except Exception as e:
-            st.error(f"Could not parse GitHub JSON: {e}")
-            return []
-
-        if not isinstance(repo_content, list):
-            st.error("GitHub response was not a list — possibly rate-limited or malformed.")
-            st.write(repo_content)
-            return []
-
-        return [item['name'] for item in repo_content if item.get('type') == 'dir']
-
-    leagues = get_leagues()
-
-    # Define base URL for loading CSV files
-    base_url = "https://raw.githubusercontent.com/AC-Horsens/AC-Horsens-scouting/main/"
-    def Process_data(df_possession_xa,df_pv,df_matchstats,df_xg,squads):
-        if df_pv is df_possession_xa:
-            required_cols = ['playerName', 'team_name', 'label']
-            for col in required_cols:
-                if col not in df_pv.columns:
-                    df_pv[col] = 'UNKNOWN'
-            if '318.0' not in df_pv.columns:
-                raise ValueError("No xA column in fallback possession_xa data")
-            df_pv['possessionValue.pvValue'] = df_pv['xA'].astype(float)
-            df_pv['possessionValue.pvAdded'] = df_pv['xA'].astype(float)
-
-
-        def weighted_mean(scores, weights):
-            expanded_scores = []
-            for score, weight in zip(scores, weights):
-                expanded_scores.extend([score] * weight)
-            return np.mean(expanded_scores)
-
-        def calculate_score(df, column, score_column):
-            df_unique = df.drop_duplicates(column).copy()
-            df_unique.loc[:, score_column] = pd.qcut(df_unique[column], q=10, labels=False, duplicates='drop') + 1
-            return df.merge(df_unique[[column, score_column]], on=column, how='left')
-
-        def calculate_opposite_score(df, column, score_column):
-            df_unique = df.drop_duplicates(column).copy()
-            df_unique.loc[:, score_column] = pd.qcut(-df_unique[column], q=10, labels=False, duplicates='drop') + 1
-            return df.merge(df_unique[[column, score_column]], on=column, how='left')
+    # Served from the local league manifest, revalidated against GitHub in the background
+    leagues = league_names(token=github_token())
+
+    def Process_data(df_scouting):
+        import matplotlib.pyplot as plt
+        import plotly.express as px
+        import plotly.graph_objects as go
 
         def player_performance_profile(df_position, position_title='Player'):
-            """Display individual player performance chart and table for a specific position."""
+            """Display the "in form" table and the individual player performance chart and table for a specific position."""
+            series, trends, leaderboard = profile_form(df_position)
+            with st.expander('Players trending up'):
+                st.caption(f'Trend of the {WINDOW}-game rolling Total score per game; sort by any column')
+                st.dataframe(leaderboard.round(3), use_container_width=True, hide_index=True)
+
             with st.expander('Choose player'):
                 players = sorted(df_position['playerName'].unique())
                 selected_player = st.selectbox('Choose player', players)
@@ -565,18 +570,14 @@ if view_mode == 'Scouting':
 
                 exclude_cols = ['playerName', 'team_name', 'player_position', 'player_positionSide',
                                 'minsPlayed', 'label', 'date', 'age_today']
-
-                metrics_df = df.drop(columns=exclude_cols, errors='ignore')
-                metrics_df['label'] = df['label']
-
-                melted_df = metrics_df.melt(id_vars='label', var_name='Metric', value_name='Value')
+                metric_cols = [col for col in df.columns if col not in exclude_cols]
 
                 fig = px.line(
-                    melted_df,
+                    df,
                     x='label',
-                    y='Value',
-                    color='Metric',
+                    y=metric_cols,
                     markers=True,
+                    labels={'variable': 'Metric', 'value': 'Value'},
                     title=f'Performance profile as {position_title}'
                 )
 
@@ -599,16 +600,12 @@ if view_mode == 'Scouting':
                     ]
                 )
 
-                # 3-game rolling average + regression for Total score
-                total_df = melted_df[melted_df['Metric'] == 'Total score'].copy().reset_index(drop=True)
-                total_df['rolling_avg'] = total_df['Value'].rolling(window=3, min_periods=1).mean()
-                total_df['index'] = total_df.index
-
-                regression_df = total_df.dropna(subset=['rolling_avg'])
+                # 3-game rolling average + regression for Total score, from the profile's form series
+                regression_df = series[series['playerName'] == selected_player].dropna(subset=['rolling_avg'])
 
-                if not regression_df.empty and len(regression_df) >= 2:
-                    slope, intercept, *_ = linregress(regression_df['index'], regression_df['rolling_avg'])
-                    regression_df['regression_line'] = intercept + slope * regression_df['index']
+                if len(regression_df) >= 2:
+                    slope, intercept = trends.loc[selected_player, ['slope', 'intercept']]
+                    regression_df = regression_df.assign(regression_line=intercept + slope * regression_df['game'])
 
                     fig.add_trace(
                         go.Scatter(
@@ -642,899 +639,59 @@ if view_mode == 'Scouting':
         with col3:
             alder = st.number_input('Max age', value=25, key="alder")
 
-        df_possession_xa = df_possession_xa.rename(columns={'318.0': 'xA'})
-        df_possession_xa['xA'] = df_possession_xa['xA'].astype(float)
-        df_possession_xa_summed = df_possession_xa.groupby(['playerName','label'])['xA'].mean().reset_index()
-        df_possession_xa_summed = df_possession_xa_summed.fillna(0)
-
-        df_pv = df_pv[['playerName', 'team_name', 'label', 'possessionValue.pvValue', 'possessionValue.pvAdded']]
-        df_pv.loc[:, 'possessionValue.pvValue'] = df_pv['possessionValue.pvValue'].astype(float)
-        df_pv.loc[:, 'possessionValue.pvAdded'] = df_pv['possessionValue.pvAdded'].astype(float)
-        df_pv['possessionValue'] = df_pv['possessionValue.pvValue'] + df_pv['possessionValue.pvAdded']
-        df_kamp = df_pv.groupby(['playerName', 'label', 'team_name']).mean()
-
-        df_kamp = df_kamp.reset_index()
-        df_matchstats = df_matchstats[['player_matchName','player_playerId','contestantId','duelLost','aerialLost','player_position','player_positionSide','successfulOpenPlayPass','totalContest','duelWon','penAreaEntries','accurateBackZonePass','possWonDef3rd','wonContest','accurateFwdZonePass','openPlayPass','totalBackZonePass','minsPlayed','fwdPass','finalThirdEntries','ballRecovery','totalFwdZonePass','successfulFinalThirdPasses','totalFinalThirdPasses','attAssistOpenplay','aerialWon','totalAttAssist','possWonMid3rd','interception','totalCrossNocorner','interceptionWon','attOpenplay','touchesInOppBox','attemptsIbox','totalThroughBall','possWonAtt3rd','accurateCrossNocorner','bigChanceCreated','accurateThroughBall','totalLayoffs','accurateLayoffs','totalFastbreak','shotFastbreak','formationUsed','goals','label','match_id','date','possLostAll','league_name']]
-        df_matchstats = df_matchstats.rename(columns={'player_matchName': 'playerName'})
-        df_scouting = df_matchstats.merge(df_kamp)
-        def calculate_match_pv(df_scouting):
-            # Calculate the total match_xg for each match_id
-            df_scouting['match_pv'] = df_scouting.groupby('match_id')['possessionValue.pvValue'].transform('sum')
-            
-            # Calculate the total team_xg for each team in each match
-            df_scouting['team_pv'] = df_scouting.groupby(['contestantId', 'match_id'])['possessionValue.pvValue'].transform('sum')
-            
-            # Calculate opponents_xg as match_xg - team_xg
-            df_scouting['opponents_pv'] = df_scouting['match_pv'] - df_scouting['team_pv']
-            df_scouting['opponents_pv'] = pd.to_numeric(df_scouting['opponents_pv'], errors='coerce')
-            return df_scouting
-        df_scouting = calculate_match_pv(df_scouting)
-        
-        df_xg = df_xg[['contestantId','team_name','playerName','playerId','321','322','9','match_id','label','date']]
-        df_xg = df_xg[df_xg['9']!= True]
-        df_xg = df_xg.rename(columns={'321': 'xg'})
-        df_xg = df_xg.rename(columns={'322': 'post shot xg'})
-        df_xg['xg'] = df_xg['xg'].astype(float)
-        df_xg['post shot xg'] = df_xg['post shot xg'].astype(float)
-        df_xg = df_xg.fillna(0)
-        df_xg = df_xg.groupby(['playerName','playerId','match_id','contestantId','team_name','label','date']).sum()
-        df_xg = df_xg.reset_index()
-
-        df_scouting = df_scouting.rename(columns={'player_playerId': 'playerId'})
-        df_scouting = df_scouting.merge(df_xg, how='left', on=['playerName', 'playerId', 'match_id', 'contestantId', 'team_name', 'label', 'date']).reset_index()
-        df_scouting = df_scouting.merge(df_possession_xa_summed,how='left')
-        df_scouting['label'] = df_scouting['label'] + ' ' + df_scouting['date']
-        def calculate_match_goals(df_scouting):
-            # Calculate the total match_xg for each match_id
-            df_scouting['match_goals'] = df_scouting.groupby('match_id')['goals'].transform('sum')
-            
-            # Calculate the total team_xg for each team in each match
-            df_scouting['team_goals'] = df_scouting.groupby(['contestantId', 'match_id'])['goals'].transform('sum')
-            
-            # Calculate opponents_xg as match_xg - team_xg
-            df_scouting['opponents_goals'] = df_scouting['match_goals'] - df_scouting['team_goals']
-            df_scouting['opponents_goals'] = pd.to_numeric(df_scouting['opponents_goals'], errors='coerce')
-        
-            return df_scouting
-
-        def calculate_match_xg(df_scouting):
-            # Calculate the total match_xg for each match_id
-            df_scouting['match_xg'] = df_scouting.groupby('match_id')['xg'].transform('sum')
-            
-            # Calculate the total team_xg for each team in each match
-            df_scouting['team_xg'] = df_scouting.groupby(['contestantId', 'match_id'])['xg'].transform('sum')
-            
-            # Calculate opponents_xg as match_xg - team_xg
-            df_scouting['opponents_xg'] = df_scouting['match_xg'] - df_scouting['team_xg']
-            df_scouting['opponents_xg'] = pd.to_numeric(df_scouting['opponents_xg'], errors='coerce')
-        
-            return df_scouting
-
-        def calculate_match_post_shot_xg(df_scouting):
-            # Calculate the total match_xg for each match_id
-            df_scouting['match_post_shot_xg'] = df_scouting.groupby('match_id')['post shot xg'].transform('sum')
-            
-            # Calculate the total team_xg for each team in each match
-            df_scouting['team_post_shot_xg'] = df_scouting.groupby(['contestantId', 'match_id'])['post shot xg'].transform('sum')
-            
-            # Calculate opponents_xg as match_xg - team_xg
-            df_scouting['opponents_post_shot_xg'] = df_scouting['match_post_shot_xg'] - df_scouting['team_post_shot_xg']
-            df_scouting['opponents_post_shot_xg'] = pd.to_numeric(df_scouting['opponents_post_shot_xg'], errors='coerce')
-        
-            return df_scouting
-
-
-        df_scouting = calculate_match_xg(df_scouting)
-        df_scouting = calculate_match_goals(df_scouting)
-        df_scouting = calculate_match_post_shot_xg(df_scouting)
-
-        df_scouting = df_scouting.merge(df_possession_xa_summed, how='left')
-        def calculate_match_xa(df_scouting):
-            # Calculate the total match_xg for each match_id
-            df_scouting['match_xA'] = df_scouting.groupby('match_id')['xA'].transform('sum')
-            
-            # Calculate the total team_xg for each team in each match
-            df_scouting['team_xA'] = df_scouting.groupby(['contestantId', 'match_id'])['xA'].transform('sum')
-            
-            # Calculate opponents_xg as match_xg - team_xg
-            df_scouting['opponents_xA'] = df_scouting['match_xA'] - df_scouting['team_xA']
-            df_scouting['opponents_xA'] = pd.to_numeric(df_scouting['opponents_xA'], errors='coerce')
-            
-            return df_scouting
-        df_scouting = calculate_match_xa(df_scouting)
-        
-        df_scouting.fillna(0, inplace=True)
-        squads['dateOfBirth'] = pd.to_datetime(squads['dateOfBirth'])
-        today = datetime.today()
-        squads['age_today'] = ((today - squads['dateOfBirth']).dt.days / 365.25).apply(np.floor)
-        squads = squads[['id','matchName','nationality','dateOfBirth','age_today']]
-        squads = squads.rename(columns={'id': 'playerId'})
-        squads = squads.rename(columns={'matchName': 'playerName'})
-        squads.fillna(0,inplace=True)
-
-        df_scouting = df_scouting.merge(squads,how='outer')
-        df_scouting = df_scouting.drop_duplicates(subset=['playerName', 'team_name', 'player_position', 'player_positionSide', 'label'])
-        df_scouting['post_shot_xg_per90'] = (df_scouting['post shot xg'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['xg_per90'] = (df_scouting['xg'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['xA_per90'] = (df_scouting['xA'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['Pv_added_stoppere'] = df_scouting['possessionValue.pvValue'].astype(float).loc[df_scouting['possessionValue.pvValue'].astype(float) < 0.1]
-        df_scouting['Pv_added_stoppere_per90'] = (df_scouting['Pv_added_stoppere'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['possessionValue.pvValue_per90'] = (df_scouting['possessionValue.pvValue'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['possessionValue.pvAdded_per90'] = (df_scouting['possessionValue.pvAdded'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['Possession value total per_90'] = df_scouting['possessionValue.pvAdded_per90'] + df_scouting['possessionValue.pvValue_per90']
-        df_scouting['penAreaEntries_per90&crosses%shotassists'] = ((df_scouting['penAreaEntries'].astype(float)+df_scouting['totalCrossNocorner'].astype(float) + df_scouting['attAssistOpenplay'].astype(float))/ df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['penAreaEntries_per90'] = (df_scouting['penAreaEntries'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90    
-        df_scouting['attAssistOpenplay_per90'] = (df_scouting['attAssistOpenplay'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['totalCrossNocorner_per90'] = (df_scouting['totalCrossNocorner'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['finalThird passes %'] = (df_scouting['successfulFinalThirdPasses'].astype(float) / df_scouting['totalFinalThirdPasses'].astype(float)) * 100
-        df_scouting['finalThirdEntries_per90'] = (df_scouting['finalThirdEntries'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['interception_per90'] = (df_scouting['interception'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['possWonDef3rd_possWonMid3rd'] = (df_scouting['possWonDef3rd'].astype(float) + df_scouting['possWonMid3rd'].astype(float))
-        df_scouting['possWonDef3rd_possWonMid3rd_per90'] =  (df_scouting['possWonDef3rd_possWonMid3rd'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['possWonDef3rd_possWonMid3rd_possWonAtt3rd'] = (df_scouting['possWonDef3rd'].astype(float) + df_scouting['possWonMid3rd'].astype(float) + df_scouting['possWonAtt3rd'].astype(float))
-        df_scouting['possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90'] =  (df_scouting['possWonDef3rd_possWonMid3rd_possWonAtt3rd'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['possWonDef3rd_possWonMid3rd_per90&interceptions_per90'] = ((df_scouting['interception_per90'].astype(float) + df_scouting['possWonDef3rd_possWonMid3rd_per90'].astype(float))/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['duels won %'] = (df_scouting['duelWon'].astype(float) / (df_scouting['duelWon'].astype(float) + df_scouting['duelLost'].astype(float)))*100
-        df_scouting['Forward zone pass %'] = (df_scouting['accurateFwdZonePass'].astype(float) / df_scouting['totalFwdZonePass'].astype(float)) * 100
-        df_scouting['Forward zone pass_per90'] = (df_scouting['accurateFwdZonePass'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['Back zone pass %'] = (df_scouting['accurateBackZonePass'].astype(float) / df_scouting['totalBackZonePass'].astype(float)) * 100
-        df_scouting['Back zone pass_per90'] = (df_scouting['accurateBackZonePass'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['Passing %'] = (df_scouting['successfulOpenPlayPass'].astype(float) / df_scouting['openPlayPass'].astype(float)) * 100
-        df_scouting['Passes_per90'] = (df_scouting['successfulOpenPlayPass'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['Duels_per90'] = (df_scouting['duelWon'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['Aerial duel %'] = (df_scouting['aerialWon'].astype(float) / (df_scouting['aerialWon'].astype(float) + df_scouting['aerialLost'].astype(float))) * 100
-        df_scouting['Ballrecovery_per90'] = (df_scouting['ballRecovery'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['fwdPass_per90'] = (df_scouting['fwdPass'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['fwdPass_share'] = (df_scouting['fwdPass'].astype(float)/df_scouting['openPlayPass'].astype(float)) * 100
-        df_scouting['finalthirdpass_per90'] = (df_scouting['successfulFinalThirdPasses'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['shotFastbreak_per90'] = (df_scouting['shotFastbreak'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['bigChanceCreated_per90'] = (df_scouting['bigChanceCreated'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['dribble %'] = (df_scouting['wonContest'].astype(float) / df_scouting['totalContest'].astype(float)) * 100
-        df_scouting['dribble_per90'] = (df_scouting['wonContest'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['touches_in_box_per90'] = (df_scouting['touchesInOppBox'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['totalThroughBall_per90'] = (df_scouting['totalThroughBall'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['attemptsIbox_per90'] = (df_scouting['attemptsIbox'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['aerialWon_per90'] = (df_scouting['aerialWon'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['possLost_per90'] = (df_scouting['possLostAll'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
-        df_scouting['Goals saved'] = (df_scouting['opponents_post_shot_xg'].astype(float) - df_scouting['opponents_goals'].astype(float))
-        df_scouting.fillna(0, inplace=True)
-
         def Goalkeeper():
             st.title('Goalkeeper')
-            Goalkeeper = df_scouting[(df_scouting['player_position'] == 'Goalkeeper')]
-            Goalkeeper = Goalkeeper[['playerName','team_name','minsPlayed','age_today','Back zone pass %','Goals saved']]
-            Goalkeeper['minsPlayed'] = Goalkeeper['minsPlayed'].astype(int)
-            Goalkeeper = Goalkeeper[Goalkeeper['minsPlayed'].astype(int) >= minutter_kamp]
-            Goalkeeper = Goalkeeper[Goalkeeper['age_today'].astype(int) >= alder]
-            Goalkeeper = Goalkeeper.groupby(
-                ['playerName','team_name', 'age_today']
-            ).agg({
-                'minsPlayed':'sum',
-                'Back zone pass %': 'mean',
-                'Goals saved': 'sum'
-            }).reset_index()
-            Goalkeeper = Goalkeeper[Goalkeeper['minsPlayed'].astype(int) >= minutter_total]
+            Goalkeeper = goalkeeper_table(df_scouting, minutter_kamp, alder, minutter_total)
             st.dataframe(Goalkeeper,hide_index=True)
 
-        def ball_playing_central_defender():
-            st.title('Ball playing central defender')
-            df_spillende_stopper = df_scouting[(df_scouting['player_position'] == 'Defender') & (df_scouting['player_positionSide'].str.contains('Centre'))]
-            df_spillende_stopper['minsPlayed'] = df_spillende_stopper['minsPlayed'].astype(int)
-            df_spillende_stopper = df_spillende_stopper[df_spillende_stopper['minsPlayed'].astype(int) >= minutter_kamp]
-            df_spillende_stopper = df_spillende_stopper[df_spillende_stopper['age_today'].astype(int) <= alder]
-            df_spillende_stopper = calculate_score(df_spillende_stopper,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_spillende_stopper = calculate_score(df_spillende_stopper, 'duels won %', 'duels won % score')
-            df_spillende_stopper = calculate_score(df_spillende_stopper, 'Forward zone pass %', 'Forward zone pass % score')
-            df_spillende_stopper = calculate_score(df_spillende_stopper, 'Passing %', 'Open play passing % score')
-            df_spillende_stopper = calculate_score(df_spillende_stopper, 'Back zone pass %', 'Back zone pass % score')
-            df_spillende_stopper = calculate_score(df_spillende_stopper, 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score')
-            df_spillende_stopper = calculate_score(df_spillende_stopper, 'Ballrecovery_per90', 'Ballrecovery_per90 score')
-
-            
-            df_spillende_stopper['Passing'] = df_spillende_stopper[['Open play passing % score', 'Back zone pass % score']].mean(axis=1)
-            df_spillende_stopper['Forward passing'] = df_spillende_stopper[['Forward zone pass % score', 'Possession value added score', 'Possession value added score']].mean(axis=1)
-            df_spillende_stopper['Defending'] = df_spillende_stopper[['duels won % score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'Ballrecovery_per90 score']].mean(axis=1)
-            df_spillende_stopper['Possession value added'] = df_spillende_stopper['Possession value added score']
-            
-            df_spillende_stopper['Total score'] = df_spillende_stopper[['Passing','Passing','Forward passing','Forward passing','Forward passing','Defending','Defending','Possession value added','Possession value added','Possession value added']].mean(axis=1)
-            df_spillende_stopper = df_spillende_stopper[['playerName','team_name','player_position','label','date','minsPlayed','age_today','Passing','Forward passing','Defending','Possession value added score','Total score']] 
-            df_spillende_stoppertotal = df_spillende_stopper[['playerName','team_name','player_position','minsPlayed','age_today','Passing','Forward passing','Defending','Possession value added score','Total score']]
-            df_spillende_stoppertotal = df_spillende_stoppertotal.groupby(['playerName','team_name','player_position','age_today']).mean().reset_index()
-            minutter = df_spillende_stopper.groupby(['playerName', 'team_name','player_position','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_spillende_stoppertotal['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_spillende_stopper = df_spillende_stopper.sort_values('Total score',ascending = False)
-                st.dataframe(df_spillende_stopper,hide_index=True)
-            with st.expander('Total'):
-                df_spillende_stoppertotal = df_spillende_stoppertotal[['playerName','team_name','player_position','age_today','minsPlayed total','Passing','Forward passing','Defending','Possession value added score','Total score']]
-                df_spillende_stoppertotal = df_spillende_stoppertotal[df_spillende_stoppertotal['minsPlayed total'].astype(int) >= minutter_total]
-                df_spillende_stoppertotal = df_spillende_stoppertotal.sort_values('Total score',ascending = False)
-                st.dataframe(df_spillende_stoppertotal,hide_index=True)
-        
-        def defending_central_defender():
-            st.title('Defending central defender')
-            df_forsvarende_stopper = df_scouting[(df_scouting['player_position'] == 'Defender') & (df_scouting['player_positionSide'].str.contains('Centre'))]
-            df_forsvarende_stopper['minsPlayed'] = df_forsvarende_stopper['minsPlayed'].astype(int)
-            df_forsvarende_stopper = df_forsvarende_stopper[df_forsvarende_stopper['minsPlayed'].astype(int) >= minutter_kamp]
-            df_forsvarende_stopper = df_forsvarende_stopper[df_forsvarende_stopper['age_today'].astype(int) <= alder]
-            
-            df_forsvarende_stopper = calculate_score(df_forsvarende_stopper, 'duels won %', 'duels won % score')
-            df_forsvarende_stopper = calculate_score(df_forsvarende_stopper, 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score')
-            df_forsvarende_stopper = calculate_score(df_forsvarende_stopper, 'Ballrecovery_per90', 'ballRecovery score')
-            df_forsvarende_stopper = calculate_score(df_forsvarende_stopper,'Aerial duel %', 'Aerial duel score')
-            df_forsvarende_stopper = calculate_score(df_forsvarende_stopper,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_forsvarende_stopper = calculate_score(df_forsvarende_stopper, 'Passing %', 'Open play passing % score')
-            df_forsvarende_stopper = calculate_score(df_forsvarende_stopper, 'Back zone pass %', 'Back zone pass % score')
-
-
-            df_forsvarende_stopper['Defending'] = df_forsvarende_stopper[['duels won % score','Aerial duel score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'ballRecovery score']].mean(axis=1)
-            df_forsvarende_stopper['Duels'] = df_forsvarende_stopper[['duels won % score','duels won % score','Aerial duel score']].mean(axis=1)
-            df_forsvarende_stopper['Intercepting'] = df_forsvarende_stopper[['possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','ballRecovery score']].mean(axis=1)
-            df_forsvarende_stopper['Passing'] = df_forsvarende_stopper[['Open play passing % score', 'Back zone pass % score','Possession value added score','Possession value added score']].mean(axis=1)
-            
-            df_forsvarende_stopper['Total score'] = df_forsvarende_stopper[['Defending','Defending','Defending','Defending','Duels','Duels','Duels','Intercepting','Intercepting','Intercepting','Passing','Passing']].mean(axis=1)
-
-            df_forsvarende_stopper = df_forsvarende_stopper[['playerName','team_name','player_position','label','minsPlayed','age_today','Defending','Duels','Intercepting','Passing','Total score']]
-            df_forsvarende_stoppertotal = df_forsvarende_stopper[['playerName','team_name','player_position','minsPlayed','age_today','Defending','Duels','Intercepting','Passing','Total score']]
-            df_forsvarende_stoppertotal = df_forsvarende_stoppertotal.groupby(['playerName','team_name','player_position','age_today']).mean().reset_index()
-            minutter = df_forsvarende_stopper.groupby(['playerName', 'team_name','player_position','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_forsvarende_stoppertotal['minsPlayed total'] = minutter['minsPlayed']
+        # Every profile scored in this run shares populations and metric deciles
+        profile_cache = {}
+
+        # Tables of the selected profiles, filled in before the tabs render
+        profile_results = {}
+
+        def score_selected_profiles(names):
+            # A single league with the filters of the nightly run (python rankings.py) reads its stored
+            # tables; the others are scored together, one worker process per population
+            confirmed = st.session_state.confirmed_leagues
+            pending = []
+            for name in names:
+                stored = None
+                if len(confirmed) == 1:
+                    with perf.stage('load_rankings', detail=name):
+                        stored = load_rankings(confirmed[0], name, minutter_kamp, alder, minutter_total)
+                if stored is None:
+                    pending.append(name)
+                else:
+                    profile_results[name] = stored
+            if pending:
+                with perf.stage('score_profiles', rows_in=len(df_scouting), detail=', '.join(pending)) as record:
+                    scored = score_profiles(df_scouting, pending, minutter_kamp, alder, minutter_total, profile_cache)
+                    record['rows_out'] = sum(len(games) for games, _ in scored.values())
+                profile_results.update(scored)
+
+        def show_profile(name):
+            st.title(name)
+            games, totals = profile_results[name]
             with st.expander('Game by game'):
-                df_forsvarende_stopper = df_forsvarende_stopper.sort_values('Total score',ascending = False)
-                st.dataframe(df_forsvarende_stopper,hide_index=True)
+                st.dataframe(games,hide_index=True)
             with st.expander('Total'):
-                df_forsvarende_stoppertotal = df_forsvarende_stoppertotal[['playerName','team_name','player_position','age_today','minsPlayed total','Defending','Duels','Intercepting','Passing','Total score']]
-                df_forsvarende_stoppertotal = df_forsvarende_stoppertotal[df_forsvarende_stoppertotal['minsPlayed total'].astype(int) >= minutter_total]
-                df_forsvarende_stoppertotal = df_forsvarende_stoppertotal.sort_values('Total score',ascending = False)
-                st.dataframe(df_forsvarende_stoppertotal,hide_index=True)
-
-        def balanced_central_defender():
-            st.title('Balanced central defender')
-            df_balanced_central_defender = df_scouting[(df_scouting['player_position'] == 'Defender') & (df_scouting['player_positionSide'].str.contains('Centre'))]
-            df_balanced_central_defender['minsPlayed'] = df_balanced_central_defender['minsPlayed'].astype(int)
-            df_balanced_central_defender = df_balanced_central_defender[df_balanced_central_defender['minsPlayed'].astype(int) >= minutter_kamp]
-            df_balanced_central_defender = df_balanced_central_defender[df_balanced_central_defender['age_today'].astype(int) <= alder]
-
-            df_balanced_central_defender = df_balanced_central_defender[df_balanced_central_defender['minsPlayed'].astype(int) >= minutter_kamp]
-            df_balanced_central_defender = calculate_opposite_score(df_balanced_central_defender,'opponents_pv', 'opponents pv score')
-            df_balanced_central_defender = calculate_opposite_score(df_balanced_central_defender,'opponents_xg', 'opponents xg score')
-            df_balanced_central_defender = calculate_opposite_score(df_balanced_central_defender,'opponents_xA', 'opponents xA score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'duels won %', 'duels won % score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Duels_per90', 'duelWon score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Ballrecovery_per90', 'ballRecovery score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Aerial duel %', 'Aerial duel % score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'aerialWon_per90', 'Aerial duel score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender,'Pv_added_stoppere_per90', 'Possession value added score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Passing %', 'Open play passing % score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Passes_per90', 'Passing score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Back zone pass %', 'Back zone pass % score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Back zone pass_per90', 'Back zone pass score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Forward zone pass %', 'Forward zone pass % score')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Forward zone pass_per90', 'Forward zone pass score')
-            df_balanced_central_defender = calculate_opposite_score(df_balanced_central_defender,'possLost_per90','possLost per90 score')
-
-            df_balanced_central_defender['Defending'] = df_balanced_central_defender[['duels won % score','duels won % score','duelWon score','opponents pv score','opponents xg score','opponents xA score','opponents pv score','opponents xg score','opponents xA score','Aerial duel % score','Aerial duel % score','Aerial duel score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'ballRecovery score']].mean(axis=1)
-            df_balanced_central_defender['Possession value added'] = df_balanced_central_defender[['Possession value added score','possLost per90 score']].mean(axis=1)
-            df_balanced_central_defender['Passing'] = df_balanced_central_defender[['Open play passing % score','Passing score', 'Back zone pass % score','Back zone pass score','Back zone pass % score','Back zone pass score','Back zone pass % score','Back zone pass score','possLost per90 score','possLost per90 score']].mean(axis=1)
-            
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Defending', 'Defending_')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Passing', 'Passing_')
-            df_balanced_central_defender = calculate_score(df_balanced_central_defender, 'Possession value added', 'Possession_value_added')
-
-            df_balanced_central_defender['Total score'] = df_balanced_central_defender.apply(
-                lambda row: weighted_mean(
-                    [row['Defending_'], row['Passing_'], row['Possession_value_added']],
-                    [
-                        7 if row['Defending_'] < 3 else 5,
-                        4 if row['Passing_'] < 3 else 3,
-                        1 if row['Possession_value_added'] < 3 else 1
-                    ]
-                ),
-                axis=1
-            )
-            df_balanced_central_defender = df_balanced_central_defender[['playerName','team_name','player_position','label','date','minsPlayed','age_today','Defending_','Possession_value_added','Passing_','Total score']]
-            
-            df_balanced_central_defendertotal = df_balanced_central_defender[['playerName','team_name','player_position','minsPlayed','age_today','Defending_','Possession_value_added','Passing_','Total score']]
-            df_balanced_central_defendertotal = df_balanced_central_defendertotal.groupby(['playerName','team_name','player_position','age_today']).mean().reset_index()
-            minutter = df_balanced_central_defender.groupby(['playerName', 'team_name','player_position','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_balanced_central_defendertotal['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_balanced_central_defender = df_balanced_central_defender.sort_values('date',ascending = False)
-                st.dataframe(df_balanced_central_defender,hide_index=True)
-            with st.expander('Total'):
-                df_balanced_central_defendertotal = df_balanced_central_defendertotal[['playerName','team_name','player_position','age_today','minsPlayed total','Defending_','Possession_value_added','Passing_','Total score']]
-                df_balanced_central_defendertotal = df_balanced_central_defendertotal[df_balanced_central_defendertotal['minsPlayed total'].astype(int) >= minutter_total]
-                df_balanced_central_defendertotal = df_balanced_central_defendertotal.sort_values('Total score',ascending = False)
-                st.dataframe(df_balanced_central_defendertotal,hide_index=True)
-            player_performance_profile(df_balanced_central_defender, position_title='Central defender')
-
-        def fullbacks():
-            st.title('Fullbacks')
-            mask = (
-            (df_scouting['player_position'] == 'Defender') &
-            (df_scouting['player_positionSide'].isin(['Right', 'Left'])))
-            
-            df_backs = df_scouting[mask].copy()
-            df_backs['minsPlayed'] = df_backs['minsPlayed'].astype(int)
-            df_backs = df_backs[df_backs['minsPlayed'].astype(int) >= minutter_kamp]
-            df_backs = df_backs[df_backs['age_today'].astype(int) <= alder]
-
-            df_backs = calculate_opposite_score(df_backs,'opponents_pv', 'opponents pv score')
-            df_backs = calculate_opposite_score(df_backs,'opponents_xg', 'opponents xg score')
-            df_backs = calculate_opposite_score(df_backs,'opponents_xA', 'opponents xA score')
-
-            df_backs = calculate_score(df_backs,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_backs = calculate_score(df_backs, 'duels won %', 'duels won % score')
-            df_backs = calculate_score(df_backs, 'Duels_per90', 'Duels per 90 score')
-            df_backs = calculate_score(df_backs, 'Forward zone pass %', 'Forward zone pass % score')
-            df_backs = calculate_score(df_backs, 'Forward zone pass_per90', 'Forward zone pass per 90 score')
-            df_backs = calculate_score(df_backs, 'penAreaEntries_per90&crosses%shotassists', 'Penalty area entries & crosses & shot assists score')
-            df_backs = calculate_score(df_backs, 'attAssistOpenplay_per90', 'attAssistOpenplay_per90 score')
-            df_backs = calculate_score(df_backs, 'finalThird passes %', 'finalThird passes % score')
-            df_backs = calculate_score(df_backs, 'finalThirdEntries_per90', 'finalThirdEntries_per90 score')
-            df_backs = calculate_score(df_backs, 'interception_per90', 'interception_per90 score')
-            df_backs = calculate_score(df_backs, 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score')
-            df_backs = calculate_score(df_backs, 'Back zone pass %', 'Back zone pass % score')
-            df_backs = calculate_score(df_backs, 'Back zone pass_per90', 'Back zone pass_per90 score')
-            df_backs = calculate_score(df_backs, 'totalCrossNocorner_per90', 'totalCrossNocorner_per90 score')
-            df_backs = calculate_score(df_backs, 'xA_per90', 'xA per90 score')
-            df_backs = calculate_opposite_score(df_backs,'possLost_per90', 'possLost_per90 score')
-            
-            df_backs['Defending'] = df_backs[['opponents pv score','opponents xg score','opponents xA score','duels won % score','Duels per 90 score','Duels per 90 score','duels won % score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score']].mean(axis=1)
-            df_backs['Passing'] = df_backs[['Forward zone pass % score','Forward zone pass per 90 score','finalThird passes % score','finalThirdEntries_per90 score','Back zone pass % score','Back zone pass_per90 score','Possession value added score','possLost_per90 score','possLost_per90 score']].mean(axis=1)
-            df_backs['Chance creation'] = df_backs[['Penalty area entries & crosses & shot assists score','totalCrossNocorner_per90 score','xA per90 score','xA per90 score','finalThirdEntries_per90 score','finalThirdEntries_per90 score','Forward zone pass % score','Forward zone pass per 90 score','Forward zone pass per 90 score','Forward zone pass % score','Possession value added score','Possession value added score']].mean(axis=1)
-            df_backs['Possession value added'] = df_backs[['Possession value added score','possLost_per90 score']].mean(axis=1)
-            
-            df_backs = calculate_score(df_backs, 'Defending', 'Defending_')
-            df_backs = calculate_score(df_backs, 'Passing', 'Passing_')
-            df_backs = calculate_score(df_backs, 'Chance creation','Chance_creation')
-            df_backs = calculate_score(df_backs, 'Possession value added', 'Possession_value_added')
-            
-            df_backs['Total score'] = df_backs.apply(
-                lambda row: weighted_mean(
-                    [row['Defending_'], row['Passing_'], row['Chance_creation'], row['Possession_value_added']],
-                    [3 if row['Defending_'] < 3 else 3, 3 if row['Passing_'] < 2 else 1, 6 if row['Chance_creation'] > 3 else 2, 3 if row['Possession_value_added'] < 3 else 2]
-                ), axis=1
-            )        
-            df_backs = df_backs[['playerName','team_name','player_position','player_positionSide','label','date','minsPlayed','age_today','Defending_','Passing_','Chance_creation','Possession_value_added','Total score']]
-            df_backs = df_backs.dropna()
-            df_backstotal = df_backs[['playerName','team_name','player_position','player_positionSide','minsPlayed','age_today','Defending_','Passing_','Chance_creation','Possession_value_added','Total score']]
-            df_backstotal = df_backstotal.groupby(['playerName','team_name','player_position','player_positionSide','age_today']).mean().reset_index()
-            minutter = df_backs.groupby(['playerName', 'team_name','player_position','player_positionSide','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_backstotal['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_backs = df_backs.sort_values('date',ascending = False)
-                st.dataframe(df_backs,hide_index=True)
-            with st.expander('Total'):
-                df_backstotal = df_backstotal[['playerName','team_name','player_position','player_positionSide','age_today','minsPlayed total','Defending_','Passing_','Chance_creation','Possession_value_added','Total score']]
-                df_backstotal = df_backstotal[df_backstotal['minsPlayed total'].astype(int) >= minutter_total]
-                df_backstotal = df_backstotal.sort_values('Total score',ascending = False)
-                st.dataframe(df_backstotal,hide_index=True)
-            player_performance_profile(df_backs, position_title='Fullback')
-
-        def wingbacks():
-            st.title('Wingbacks')
-            mask = (
-            ((df_scouting['formationUsed'].isin([532, 541])) &
-            (df_scouting['player_position'] == 'Defender') &
-            (df_scouting['player_positionSide'].isin(['Right', 'Left'])))
-            |
-            ((df_scouting['formationUsed'].isin([352, 343,3421])) &
-            (df_scouting['player_position'] == 'Midfielder') &
-            (df_scouting['player_positionSide'].isin(['Right', 'Left'])))
-            |
-            (df_scouting['player_position'] == 'Wing Back') &
-            (df_scouting['player_positionSide'].isin(['Right', 'Left'])))
-            
-
-            df_backs = df_scouting[mask].copy()
-            df_backs['minsPlayed'] = df_backs['minsPlayed'].astype(int)
-            df_backs = df_backs[df_backs['minsPlayed'].astype(int) >= minutter_kamp]
-            df_backs = df_backs[df_backs['age_today'].astype(int) <= alder]
-
-            df_backs = calculate_opposite_score(df_backs,'opponents_pv', 'opponents pv score')
-            df_backs = calculate_opposite_score(df_backs,'opponents_xg', 'opponents xg score')
-            df_backs = calculate_opposite_score(df_backs,'opponents_xA', 'opponents xA score')
-
-            df_backs = calculate_score(df_backs,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_backs = calculate_score(df_backs, 'duels won %', 'duels won % score')
-            df_backs = calculate_score(df_backs, 'Duels_per90', 'Duels per 90 score')
-            df_backs = calculate_score(df_backs, 'Forward zone pass %', 'Forward zone pass % score')
-            df_backs = calculate_score(df_backs, 'Forward zone pass_per90', 'Forward zone pass per 90 score')
-            df_backs = calculate_score(df_backs, 'penAreaEntries_per90&crosses%shotassists', 'Penalty area entries & crosses & shot assists score')
-            df_backs = calculate_score(df_backs, 'attAssistOpenplay_per90', 'attAssistOpenplay_per90 score')
-            df_backs = calculate_score(df_backs, 'finalThird passes %', 'finalThird passes % score')
-            df_backs = calculate_score(df_backs, 'finalThirdEntries_per90', 'finalThirdEntries_per90 score')
-            df_backs = calculate_score(df_backs, 'interception_per90', 'interception_per90 score')
-            df_backs = calculate_score(df_backs, 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score')
-            df_backs = calculate_score(df_backs, 'Back zone pass %', 'Back zone pass % score')
-            df_backs = calculate_score(df_backs, 'Back zone pass_per90', 'Back zone pass_per90 score')
-            df_backs = calculate_score(df_backs, 'totalCrossNocorner_per90', 'totalCrossNocorner_per90 score')
-            df_backs = calculate_score(df_backs, 'xA_per90', 'xA per90 score')
-            df_backs = calculate_opposite_score(df_backs,'possLost_per90', 'possLost_per90 score')
-            
-            df_backs['Defending'] = df_backs[['opponents pv score','opponents xg score','opponents xA score','duels won % score','Duels per 90 score','Duels per 90 score','duels won % score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score']].mean(axis=1)
-            df_backs['Passing'] = df_backs[['Forward zone pass % score','Forward zone pass per 90 score','finalThird passes % score','finalThirdEntries_per90 score','Back zone pass % score','Back zone pass_per90 score','Possession value added score','possLost_per90 score','possLost_per90 score']].mean(axis=1)
-            df_backs['Chance creation'] = df_backs[['Penalty area entries & crosses & shot assists score','totalCrossNocorner_per90 score','xA per90 score','xA per90 score','finalThirdEntries_per90 score','finalThirdEntries_per90 score','Forward zone pass % score','Forward zone pass per 90 score','Forward zone pass per 90 score','Forward zone pass % score','Possession value added score','Possession value added score']].mean(axis=1)
-            df_backs['Possession value added'] = df_backs[['Possession value added score','possLost_per90 score']].mean(axis=1)
-            
-            df_backs = calculate_score(df_backs, 'Defending', 'Defending_')
-            df_backs = calculate_score(df_backs, 'Passing', 'Passing_')
-            df_backs = calculate_score(df_backs, 'Chance creation','Chance_creation')
-            df_backs = calculate_score(df_backs, 'Possession value added', 'Possession_value_added')
-            
-            df_backs['Total score'] = df_backs.apply(
-                lambda row: weighted_mean(
-                    [row['Defending_'], row['Passing_'], row['Chance_creation'], row['Possession_value_added']],
-                    [3 if row['Defending_'] < 3 else 5, 1 if row['Passing_'] < 2 else 1, 6 if row['Chance_creation'] > 3 else 2, 3 if row['Possession_value_added'] < 3 else 2]
-                ), axis=1
-            )
-
-            df_backs = df_backs[['playerName','team_name','label','date','minsPlayed','age_today','Defending_','Passing_','Chance_creation','Possession_value_added','Total score']]
-            df_backs = df_backs.dropna()
-            df_backstotal = df_backs[['playerName','team_name','minsPlayed','age_today','Defending_','Passing_','Chance_creation','Possession_value_added','Total score']]
-            df_backstotal = df_backstotal.groupby(['playerName','team_name','age_today']).mean().reset_index()
-            minutter = df_backs.groupby(['playerName', 'team_name','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_backstotal['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_backs = df_backs.sort_values('date',ascending = False)
-                st.dataframe(df_backs,hide_index=True)
-            with st.expander('Total'):
-                df_backstotal = df_backstotal[['playerName','team_name','age_today','minsPlayed total','Defending_','Passing_','Chance_creation','Possession_value_added','Total score']]
-                df_backstotal = df_backstotal[df_backstotal['minsPlayed total'].astype(int) >= minutter_total]
-                df_backstotal = df_backstotal.sort_values('Total score',ascending = False)
-                st.dataframe(df_backstotal,hide_index=True)
-            player_performance_profile(df_backs, position_title='Fullback')
-
-        def number6():
-            st.title('Number 6')
-            df_sekser = df_scouting[((df_scouting['player_position'] == 'Defensive Midfielder') | (df_scouting['player_position'] == 'Midfielder')) & df_scouting['player_positionSide'].str.contains('Centre')]
-            df_sekser['minsPlayed'] = df_sekser['minsPlayed'].astype(int)
-            df_sekser = df_sekser[df_sekser['minsPlayed'].astype(int) >= minutter_kamp]
-            df_sekser = df_sekser[df_sekser['age_today'].astype(int) <= alder]
-
-            df_sekser = calculate_score(df_sekser,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_sekser = calculate_score(df_sekser, 'duels won %', 'duels won % score')
-            df_sekser = calculate_score(df_sekser, 'Duels_per90', 'Duels per 90 score')
-            df_sekser = calculate_score(df_sekser, 'Passing %', 'Passing % score')
-            df_sekser = calculate_score(df_sekser, 'Passes_per90', 'Passing score')
-            df_sekser = calculate_score(df_sekser, 'Back zone pass %', 'Back zone pass % score')
-            df_sekser = calculate_score(df_sekser, 'Back zone pass_per90', 'Back zone pass_per90 score')
-            df_sekser = calculate_score(df_sekser, 'finalThirdEntries_per90', 'finalThirdEntries_per90 score')
-            df_sekser = calculate_score(df_sekser, 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score')
-            df_sekser = calculate_score(df_sekser, 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90', 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90 score')
-            df_sekser = calculate_score(df_sekser, 'Forward zone pass %', 'Forward zone pass % score')
-            df_sekser = calculate_score(df_sekser, 'Forward zone pass_per90', 'Forward zone pass_per90 score')
-            df_sekser = calculate_score(df_sekser, 'Ballrecovery_per90', 'ballRecovery score')
-            df_sekser = calculate_opposite_score(df_sekser, 'possLost_per90', 'possLost_per90 score')
-
-            
-            df_sekser['Defending'] = df_sekser[['duels won % score','Duels per 90 score','Duels per 90 score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','ballRecovery score']].mean(axis=1)
-            df_sekser['Passing'] = df_sekser[['Back zone pass % score','Back zone pass_per90 score','Passing % score','Passing score','possLost_per90 score','possLost_per90 score']].mean(axis=1)
-            df_sekser['Progressive ball movement'] = df_sekser[['Possession value added score','Possession value added score','Forward zone pass % score','Forward zone pass_per90 score','finalThirdEntries_per90 score']].mean(axis=1)
-            df_sekser['Possession value added'] = df_sekser[['Possession value added score','possLost_per90 score']].mean(axis=1)
-            
-            df_sekser = calculate_score(df_sekser, 'Defending', 'Defending_')
-            df_sekser = calculate_score(df_sekser, 'Passing', 'Passing_')
-            df_sekser = calculate_score(df_sekser, 'Progressive ball movement','Progressive_ball_movement')
-            df_sekser = calculate_score(df_sekser, 'Possession value added', 'Possession_value_added')
-            
-            df_sekser['Total score'] = df_sekser.apply(
-            lambda row: weighted_mean(
-                [row['Defending_'], row['Passing_'],row['Progressive_ball_movement'],row['Possession_value_added']],
-                [3 if row['Defending_'] < 5 else 5, 3 if row['Passing_'] < 5 else 4, 3 if row['Progressive_ball_movement'] < 5 else 2, 1 if row['Possession_value_added'] < 5 else 1]
-            ), axis=1
-            )
-
-            df_sekser = df_sekser[['playerName','team_name','player_position','label','date','minsPlayed','age_today','Defending_','Passing_','Progressive_ball_movement','Possession_value_added','Total score']]
-            df_sekser = df_sekser.dropna()
-            df_seksertotal = df_sekser[['playerName','team_name','player_position','minsPlayed','age_today','Defending_','Passing_','Progressive_ball_movement','Possession_value_added','Total score']]
-
-            df_seksertotal = df_seksertotal.groupby(['playerName','team_name','player_position','age_today']).mean().reset_index()
-            minutter = df_sekser.groupby(['playerName', 'team_name','player_position','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_seksertotal['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_sekser = df_sekser.sort_values('date',ascending = False)
-                st.dataframe(df_sekser,hide_index=True)
-            with st.expander('Total'):
-                df_seksertotal = df_seksertotal[['playerName','team_name','player_position','age_today','minsPlayed total','Defending_','Passing_','Progressive_ball_movement','Possession_value_added','Total score']]
-                df_seksertotal= df_seksertotal[df_seksertotal['minsPlayed total'].astype(int) >= minutter_total]
-                df_seksertotal = df_seksertotal.sort_values('Total score',ascending = False)
-                st.dataframe(df_seksertotal,hide_index=True)
-            player_performance_profile(df_sekser, position_title='Number 6')
-
-        def number6_destroyer():
-            st.title('Number 6 (destroyer)')
-            df_sekser = df_scouting[((df_scouting['player_position'] == 'Defensive Midfielder') | (df_scouting['player_position'] == 'Midfielder')) & df_scouting['player_positionSide'].str.contains('Centre')]
-            df_sekser['minsPlayed'] = df_sekser['minsPlayed'].astype(int)
-            df_sekser = df_sekser[df_sekser['minsPlayed'].astype(int) >= minutter_kamp]
-            df_sekser = df_sekser[df_sekser['age_today'].astype(int) <= alder]
-
-            df_sekser = calculate_score(df_sekser,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_sekser = calculate_score(df_sekser, 'duels won %', 'duels won % score')
-            df_sekser = calculate_score(df_sekser, 'Passing %', 'Passing % score')
-            df_sekser = calculate_score(df_sekser, 'Back zone pass %', 'Back zone pass % score')
-            df_sekser = calculate_score(df_sekser, 'finalThirdEntries_per90', 'finalThirdEntries_per90 score')
-            df_sekser = calculate_score(df_sekser, 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score')
-            df_sekser = calculate_score(df_sekser, 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90', 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90 score')
-            df_sekser = calculate_score(df_sekser, 'Forward zone pass %', 'Forward zone pass % score')
-            df_sekser = calculate_score(df_sekser, 'Ballrecovery_per90', 'ballRecovery score')
-
-            
-            df_sekser['Defending'] = df_sekser[['duels won % score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','ballRecovery score']].mean(axis=1)
-            df_sekser['Passing'] = df_sekser[['Back zone pass % score','Passing % score']].mean(axis=1)
-            df_sekser['Progressive ball movement'] = df_sekser[['Possession value added score','Possession value added score','Forward zone pass % score']].mean(axis=1)
-            df_sekser['Possession value added'] = df_sekser['Possession value added score']
-            
-            df_sekser = calculate_score(df_sekser, 'Defending', 'Defending_')
-            df_sekser = calculate_score(df_sekser, 'Passing', 'Passing_')
-            df_sekser = calculate_score(df_sekser, 'Progressive ball movement','Progressive_ball_movement')
-            df_sekser = calculate_score(df_sekser, 'Possession value added', 'Possession_value_added')
-            
-            df_sekser['Total score'] = df_sekser[['Defending_','Defending_','Defending_','Passing_','Passing_','Progressive_ball_movement','Possession_value_added']].mean(axis=1)
-            df_sekser = df_sekser[['playerName','team_name','player_position','label','minsPlayed','age_today','Defending_','Passing_','Progressive_ball_movement','Possession_value_added','Total score']]
-            df_sekser = df_sekser.dropna()
-
-            df_seksertotal = df_sekser[['playerName','team_name','player_position','minsPlayed','age_today','Defending_','Passing_','Progressive_ball_movement','Possession_value_added','Total score']]
-
-            df_seksertotal = df_seksertotal.groupby(['playerName','team_name','player_position','age_today']).mean().reset_index()
-            minutter = df_sekser.groupby(['playerName', 'team_name','player_position','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_seksertotal['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_sekser = df_sekser.sort_values('Total score',ascending = False)
-                st.dataframe(df_sekser,hide_index=True)
-            with st.expander('Total'):
-                df_seksertotal = df_seksertotal[['playerName','team_name','player_position','age_today','minsPlayed total','Defending_','Passing_','Progressive_ball_movement','Possession_value_added','Total score']]
-                df_seksertotal= df_seksertotal[df_seksertotal['minsPlayed total'].astype(int) >= minutter_total]
-                df_seksertotal = df_seksertotal.sort_values('Total score',ascending = False)
-                st.dataframe(df_seksertotal,hide_index=True)
-            player_performance_profile(df_sekser, position_title='Number 6 (destroyer)')
-
-        def number6_double_6_forward():
-            st.title('Number 6 (double 6 forward)')
-            df_sekser = df_scouting[((df_scouting['player_position'] == 'Defensive Midfielder') | (df_scouting['player_position'] == 'Midfielder')) & df_scouting['player_positionSide'].str.contains('Centre')]
-            df_sekser['minsPlayed'] = df_sekser['minsPlayed'].astype(int)
-            df_sekser = df_sekser[df_sekser['minsPlayed'].astype(int) >= minutter_kamp]
-            df_sekser = df_sekser[df_sekser['age_today'].astype(int) <= alder]
-
-            df_sekser = calculate_score(df_sekser,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_sekser = calculate_score(df_sekser, 'duels won %', 'duels won % score')
-            df_sekser = calculate_score(df_sekser, 'Passing %', 'Passing % score')
-            df_sekser = calculate_score(df_sekser, 'Back zone pass %', 'Back zone pass % score')
-            df_sekser = calculate_score(df_sekser, 'finalThirdEntries_per90', 'finalThirdEntries_per90 score')
-            df_sekser = calculate_score(df_sekser, 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score')
-            df_sekser = calculate_score(df_sekser, 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90', 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90 score')
-            df_sekser = calculate_score(df_sekser, 'Forward zone pass %', 'Forward zone pass % score')
-            df_sekser = calculate_score(df_sekser, 'Ballrecovery_per90', 'ballRecovery score')
-
-            
-            df_sekser['Defending'] = df_sekser[['duels won % score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','ballRecovery score']].mean(axis=1)
-            df_sekser['Passing'] = df_sekser[['Back zone pass % score','Passing % score']].mean(axis=1)
-            df_sekser['Progressive ball movement'] = df_sekser[['Possession value added score','Possession value added score','Forward zone pass % score']].mean(axis=1)
-            df_sekser['Possession value added'] = df_sekser['Possession value added score']
-            
-            df_sekser = calculate_score(df_sekser, 'Defending', 'Defending_')
-            df_sekser = calculate_score(df_sekser, 'Passing', 'Passing_')
-            df_sekser = calculate_score(df_sekser, 'Progressive ball movement','Progressive_ball_movement')
-            df_sekser = calculate_score(df_sekser, 'Possession value added', 'Possession_value_added')
-            
-            df_sekser['Total score'] = df_sekser[['Defending_','Defending_','Passing_','Passing_','Progressive_ball_movement','Progressive_ball_movement','Possession_value_added','Possession_value_added']].mean(axis=1)
-            df_sekser = df_sekser[['playerName','team_name','player_position','label','minsPlayed','age_today','Defending_','Passing_','Progressive_ball_movement','Possession_value_added','Total score']]
-            df_sekser = df_sekser.dropna()
-            df_seksertotal = df_sekser[['playerName','team_name','player_position','minsPlayed','age_today','Defending_','Passing_','Progressive_ball_movement','Possession_value_added','Total score']]
-
-            df_seksertotal = df_seksertotal.groupby(['playerName','team_name','player_position','age_today']).mean().reset_index()
-            minutter = df_sekser.groupby(['playerName', 'team_name','player_position','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_seksertotal['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_sekser = df_sekser.sort_values('Total score',ascending = False)
-                st.dataframe(df_sekser,hide_index=True)
-            with st.expander('Total'):
-                df_seksertotal = df_seksertotal[['playerName','team_name','player_position','age_today','minsPlayed total','Defending_','Passing_','Progressive_ball_movement','Possession_value_added','Total score']]
-                df_seksertotal= df_seksertotal[df_seksertotal['minsPlayed total'].astype(int) >= minutter_total]
-                df_seksertotal = df_seksertotal.sort_values('Total score',ascending = False)
-                st.dataframe(df_seksertotal,hide_index=True)
-
-        def number8():
-            st.title('Number 8')
-            df_otter = df_scouting[(df_scouting['player_position'] == 'Midfielder') & df_scouting['player_positionSide'].str.contains('Centre')]
-            df_otter['minsPlayed'] = df_otter['minsPlayed'].astype(int)
-            df_otter = df_otter[df_otter['minsPlayed'].astype(int) >= minutter_kamp]
-            df_otter = df_otter[df_otter['age_today'].astype(int) <= alder]
-
-            df_otter = calculate_score(df_otter,'Possession value total per_90','Possession value total score')
-            df_otter = calculate_score(df_otter,'possessionValue.pvValue_per90', 'Possession value score')
-            df_otter = calculate_score(df_otter,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_otter = calculate_score(df_otter, 'duels won %', 'duels won % score')
-            df_otter = calculate_score(df_otter,'Duels_per90', 'Duels per 90 score')
-            df_otter = calculate_score(df_otter, 'Passing %', 'Passing % score')
-            df_otter = calculate_score(df_otter, 'Passes_per90', 'Passing score')
-            df_otter = calculate_score(df_otter, 'Back zone pass %', 'Back zone pass % score')
-            df_otter = calculate_score(df_otter, 'Back zone pass_per90', 'Back zone pass score')
-            df_otter = calculate_score(df_otter, 'finalThirdEntries_per90', 'finalThirdEntries_per90 score')
-            df_otter = calculate_score(df_otter, 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score')
-            df_otter = calculate_score(df_otter, 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90', 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90 score')
-            df_otter = calculate_score(df_otter, 'Forward zone pass %', 'Forward zone pass % score')
-            df_otter = calculate_score(df_otter, 'Forward zone pass_per90', 'Forward zone pass score')
-            df_otter = calculate_score(df_otter, 'fwdPass_per90', 'fwd_Pass_per90 score')
-            df_otter = calculate_score(df_otter, 'attAssistOpenplay_per90','attAssistOpenplay_per90 score')
-            df_otter = calculate_score(df_otter, 'penAreaEntries_per90','penAreaEntries_per90 score')
-            df_otter = calculate_opposite_score(df_otter, 'possLost_per90', 'possLost_per90 score')
-            df_otter = calculate_score(df_otter, 'xA_per90','xA_per90 score')
-
-            df_otter['Defending'] = df_otter[['duels won % score','Duels per 90 score','possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90 score']].mean(axis=1)
-            df_otter['Passing'] = df_otter[['Forward zone pass % score','Forward zone pass score','Passing % score','Passing score','possLost_per90 score']].mean(axis=1)
-            df_otter['Progressive ball movement'] = df_otter[['xA_per90 score','fwd_Pass_per90 score','penAreaEntries_per90 score','Forward zone pass % score','Forward zone pass score','finalThirdEntries_per90 score','Possession value total score','possLost_per90 score']].mean(axis=1)
-            df_otter['Possession value'] = df_otter[['Possession value added score','Possession value total score','possLost_per90 score']].mean(axis=1)
-            
-            df_otter = calculate_score(df_otter, 'Defending', 'Defending_')
-            df_otter = calculate_score(df_otter, 'Passing', 'Passing_')
-            df_otter = calculate_score(df_otter, 'Progressive ball movement','Progressive_ball_movement')
-            df_otter = calculate_score(df_otter, 'Possession value', 'Possession_value')
-            
-            df_otter['Total score'] = df_otter.apply(
-                lambda row: weighted_mean(
-                    [row['Defending_'], row['Passing_'], row['Progressive_ball_movement'], row['Possession_value']],
-                    [5 if row['Defending_'] > 5 else 1, 5 if row['Passing_'] > 5 else 1, 
-                    1 if row['Progressive_ball_movement'] < 5 else 3, 1 if row['Possession_value'] < 5 else 3]
-                ), axis=1
-            )
-            df_otter = df_otter[['playerName','team_name','player_position','label','date','minsPlayed','age_today','Defending_','Passing_','Progressive_ball_movement','Possession_value','Total score']]
-            df_otter = df_otter.dropna()
-
-            df_ottertotal = df_otter[['playerName','team_name','player_position','minsPlayed','age_today','Defending_','Passing_','Progressive_ball_movement','Possession_value','Total score']]
-
-            df_ottertotal = df_ottertotal.groupby(['playerName','team_name','player_position','age_today']).mean().reset_index()
-            minutter = df_otter.groupby(['playerName', 'team_name','player_position','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_ottertotal['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_otter = df_otter.sort_values('date',ascending = False)
-                st.dataframe(df_otter,hide_index=True)
-            with st.expander('Total'):
-                df_ottertotal = df_ottertotal[['playerName','team_name','player_position','age_today','minsPlayed total','Defending_','Passing_','Progressive_ball_movement','Possession_value','Total score']]
-                df_ottertotal= df_ottertotal[df_ottertotal['minsPlayed total'].astype(int) >= minutter_total]
-                df_ottertotal = df_ottertotal.sort_values('Total score',ascending = False)
-                st.dataframe(df_ottertotal,hide_index=True)
-
-            player_performance_profile(df_otter, position_title='Number 8')
-
-        def number10():
-            st.title('Number 10')
-            mask = (
-                (
-                    (df_scouting['formationUsed'].isin([343, 3421, 541, 4231, 4321])) &
-                    (df_scouting['player_position'].isin(['Attacking Midfielder', 'Striker'])) &
-                    (df_scouting['player_positionSide'].isin(['Centre/Right', 'Left/Centre']))
-                )
-                |
-                (
-                    (df_scouting['player_position'] == 'Attacking Midfielder') &
-                    (df_scouting['player_positionSide'].isin(['Centre','Centre/Right','Left/Centre']))
-                )
-            )
-
-            df_10 = df_scouting[mask].copy()
-
-
-            df_10['minsPlayed'] = df_10['minsPlayed'].astype(int)
-            df_10 = df_10[df_10['minsPlayed'].astype(int) >= minutter_kamp]
-            df_10 = df_10[df_10['age_today'].astype(int) <= alder]
-
-            df_10 = calculate_score(df_10,'Possession value total per_90','Possession value total score')
-            df_10 = calculate_score(df_10,'possessionValue.pvValue_per90', 'Possession value score')
-            df_10 = calculate_score(df_10,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_10 = calculate_score(df_10, 'Passing %', 'Passing % score')
-            df_10 = calculate_score(df_10, 'Passes_per90', 'Passing score')
-            df_10 = calculate_score(df_10, 'finalThirdEntries_per90', 'finalThirdEntries_per90 score')
-            df_10 = calculate_score(df_10, 'Forward zone pass %', 'Forward zone pass % score')
-            df_10 = calculate_score(df_10, 'Forward zone pass_per90', 'Forward zone pass score')
-            df_10 = calculate_score(df_10, 'fwdPass_per90', 'fwd_Pass_per90 score')
-            df_10 = calculate_score(df_10, 'attAssistOpenplay_per90','attAssistOpenplay_per90 score')
-            df_10 = calculate_score(df_10, 'penAreaEntries_per90','penAreaEntries_per90 score')
-            df_10 = calculate_score(df_10, 'finalThird passes %','finalThird passes % score')
-            df_10 = calculate_score(df_10, 'finalthirdpass_per90', 'finalthirdpass per 90 score')
-            df_10 = calculate_score(df_10, 'dribble %','dribble % score')
-            df_10 = calculate_score(df_10, 'dribble_per90','dribble score')
-            df_10 = calculate_score(df_10, 'touches_in_box_per90','touches_in_box_per90 score')
-            df_10 = calculate_score(df_10, 'xA_per90','xA_per90 score')
-            df_10 = calculate_score(df_10, 'xg_per90','xg_per90 score')
-            df_10 = calculate_opposite_score(df_10,'possLost_per90', 'possLost_per90 score')
-            df_10 = calculate_score(df_10, 'post_shot_xg_per90','post_shot_xg_per90 score')
-
-
-            df_10['Passing'] = df_10[['Forward zone pass % score','Forward zone pass score','Passing % score','Passing score']].mean(axis=1)
-            df_10['Chance creation'] = df_10[['attAssistOpenplay_per90 score','penAreaEntries_per90 score','Forward zone pass % score','Forward zone pass score','finalThird passes % score','finalthirdpass per 90 score','Possession value total score','Possession value score','dribble % score','touches_in_box_per90 score','xA_per90 score']].mean(axis=1)
-            df_10['Goalscoring'] = df_10[['xg_per90 score','xg_per90 score','xg_per90 score','post_shot_xg_per90 score','touches_in_box_per90 score']].mean(axis=1)
-            df_10['Possession value'] = df_10[['Possession value total score','Possession value total score','Possession value added score','Possession value score','possLost_per90 score']].mean(axis=1)
-                    
-            df_10 = calculate_score(df_10, 'Passing', 'Passing_')
-            df_10 = calculate_score(df_10, 'Chance creation','Chance_creation')
-            df_10 = calculate_score(df_10, 'Goalscoring','Goalscoring_')        
-            df_10 = calculate_score(df_10, 'Possession value', 'Possession_value')
-            
-            df_10['Total score'] = df_10.apply(
-                lambda row: weighted_mean(
-                    [row['Passing_'], row['Chance_creation'], row['Goalscoring_'], row['Possession_value']],
-                    [3 if row['Passing_'] > 5 else 1, 5 if row['Chance_creation'] > 5 else 1, 
-                    5 if row['Goalscoring_'] > 5 else 1, 3 if row['Possession_value'] < 5 else 1]
-                ), axis=1
-            )
-
-            # Prepare final output
-            df_10 = df_10[['playerName','team_name','label','date','minsPlayed','age_today','Passing_','Chance_creation','Goalscoring_','Possession_value','Total score']]
-            df_10 = df_10.fillna(1)
-            df_10total = df_10[['playerName','team_name','minsPlayed','age_today','Passing_','Chance_creation','Goalscoring_','Possession_value','Total score']]
-
-            df_10total = df_10total.groupby(['playerName','team_name','age_today']).mean().reset_index()
-            minutter = df_10.groupby(['playerName', 'team_name','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_10total['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_10 = df_10.sort_values('date',ascending = False)
-                st.dataframe(df_10,hide_index=True)
-            with st.expander('Total'):
-                df_10total = df_10total[['playerName','team_name','age_today','minsPlayed total','Passing_','Chance_creation','Goalscoring_','Possession_value','Total score']]
-                df_10total= df_10total[df_10total['minsPlayed total'].astype(int) >= minutter_total]
-                df_10total = df_10total.sort_values('Total score',ascending = False)
-                st.dataframe(df_10total,hide_index=True)
-            player_performance_profile(df_10, position_title='Number 10')
-
-        def winger():
-            st.title('Winger')
-            mask = (
-                ((df_scouting['formationUsed'].isin([442,541,451,4141])) &
-                (df_scouting['player_position'] == 'Midfielder') &
-                (df_scouting['player_positionSide'].isin(['Right', 'Left'])))
-                |
-                ((df_scouting['formationUsed'].isin([433])) &
-                (df_scouting['player_position'] == 'Striker') &
-                (df_scouting['player_positionSide'].isin(['Left/Centre', 'Centre/Right'])))
-                |
-                (df_scouting['player_position'].isin(['Attacking Midfielder', 'Striker'])) &
-                (df_scouting['player_positionSide'].isin(['Right', 'Left'])))        
-
-            df_10 = df_scouting[mask].copy()
-
-            df_10['minsPlayed'] = df_10['minsPlayed'].astype(int)
-            df_10 = df_10[df_10['minsPlayed'].astype(int) >= minutter_kamp]
-            df_10 = df_10[df_10['age_today'].astype(int) <= alder]
-
-            df_10 = calculate_score(df_10,'Possession value total per_90','Possession value total score')
-            df_10 = calculate_score(df_10,'possessionValue.pvValue_per90', 'Possession value score')
-            df_10 = calculate_score(df_10,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_10 = calculate_score(df_10, 'Passing %', 'Passing % score')
-            df_10 = calculate_score(df_10, 'Passes_per90', 'Passing score')
-            df_10 = calculate_score(df_10, 'finalThirdEntries_per90', 'finalThirdEntries_per90 score')
-            df_10 = calculate_score(df_10, 'Forward zone pass %', 'Forward zone pass % score')
-            df_10 = calculate_score(df_10, 'Forward zone pass_per90', 'Forward zone pass score')
-            df_10 = calculate_score(df_10, 'fwdPass_per90', 'fwd_Pass_per90 score')
-            df_10 = calculate_score(df_10, 'attAssistOpenplay_per90','attAssistOpenplay_per90 score')
-            df_10 = calculate_score(df_10, 'penAreaEntries_per90','penAreaEntries_per90 score')
-            df_10 = calculate_score(df_10, 'finalThird passes %','finalThird passes % score')
-            df_10 = calculate_score(df_10, 'finalthirdpass_per90', 'finalthirdpass per 90 score')
-            df_10 = calculate_score(df_10, 'dribble %','dribble % score')
-            df_10 = calculate_score(df_10, 'dribble_per90', 'dribble score')
-            df_10 = calculate_score(df_10, 'touches_in_box_per90','touches_in_box_per90 score')
-            df_10 = calculate_score(df_10, 'xA_per90','xA_per90 score')
-            df_10 = calculate_score(df_10, 'attemptsIbox_per90','attemptsIbox_per90 score')
-            df_10 = calculate_score(df_10, 'xg_per90','xg_per90 score')
-            df_10 = calculate_score(df_10, 'post_shot_xg_per90','post_shot_xg_per90 score')
-
-
-            df_10['Passing'] = df_10[['Forward zone pass % score','Forward zone pass score','Passing % score','Passing score']].mean(axis=1)
-            df_10['Chance creation'] = df_10[['attAssistOpenplay_per90 score','penAreaEntries_per90 score','Forward zone pass % score','Forward zone pass score','finalThird passes % score','finalthirdpass per 90 score','Possession value total score','Possession value score','dribble % score','dribble score','touches_in_box_per90 score','xA_per90 score']].mean(axis=1)
-            df_10['Goalscoring'] = df_10[['xg_per90 score','xg_per90 score','xg_per90 score','touches_in_box_per90 score','post_shot_xg_per90 score']].mean(axis=1)
-            df_10['Possession value'] = df_10[['Possession value total score','Possession value total score','Possession value added score','Possession value score','Possession value score','Possession value score']].mean(axis=1)
-                    
-            df_10 = calculate_score(df_10, 'Passing', 'Passing_')
-            df_10 = calculate_score(df_10, 'Chance creation','Chance_creation')
-            df_10 = calculate_score(df_10, 'Goalscoring','Goalscoring_')        
-            df_10 = calculate_score(df_10, 'Possession value', 'Possession_value')
-            
-            df_10['Total score'] = df_10.apply(
-                lambda row: weighted_mean(
-                    [row['Passing_'], row['Chance_creation'], row['Goalscoring_'], row['Possession_value']],
-                    [3 if row['Passing_'] > 5 else 1, 5 if row['Chance_creation'] > 5 else 1, 
-                    5 if row['Goalscoring_'] > 5 else 1, 3 if row['Possession_value'] > 5 else 1]
-                ), axis=1
-            )
-            df_10 = df_10[['playerName','team_name','label','date','minsPlayed','age_today','Passing_','Chance_creation','Goalscoring_','Possession_value','Total score']]
-            df_10 = df_10.dropna()
-            df_10total = df_10[['playerName','team_name','minsPlayed','age_today','Passing_','Chance_creation','Goalscoring_','Possession_value','Total score']]
-
-            df_10total = df_10total.groupby(['playerName','team_name','age_today']).mean().reset_index()
-            minutter = df_10.groupby(['playerName', 'team_name','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_10total['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_10 = df_10.sort_values('Total score',ascending = False)
-                st.dataframe(df_10,hide_index=True)
-            with st.expander('Total'):
-                df_10total = df_10total[['playerName','team_name','age_today','minsPlayed total','Passing_','Chance_creation','Goalscoring_','Possession_value','Total score']]
-                df_10total= df_10total[df_10total['minsPlayed total'].astype(int) >= minutter_total]
-                df_10total = df_10total.sort_values('Total score',ascending = False)
-                st.dataframe(df_10total,hide_index=True)
-            player_performance_profile(df_10, position_title='Winger')
-
-        def Classic_striker():
-            st.title('Classic striker')
-            mask = (
-            ((df_scouting['formationUsed'].isin([532,442,352,3142,3412])) &
-            (df_scouting['player_position'] == 'Striker') &
-            (df_scouting['player_positionSide'].str.contains('Centre')))
-            |
-            (df_scouting['player_position'] == 'Striker') &
-            (df_scouting['player_positionSide'] == 'Centre'))
-
-            df_striker = df_scouting[mask].copy()
-            df_striker['minsPlayed'] = df_striker['minsPlayed'].astype(int)
-            df_striker = df_striker[df_striker['minsPlayed'].astype(int) >= minutter_kamp]
-            df_striker = df_striker[df_striker['age_today'].astype(int) <= alder]
-
-            df_striker = calculate_score(df_striker,'Possession value total per_90','Possession value total score')
-            df_striker = calculate_score(df_striker,'possessionValue.pvValue_per90', 'Possession value score')
-            df_striker = calculate_score(df_striker,'possessionValue.pvAdded_per90', 'Possession value added score')
-            df_striker = calculate_score(df_striker, 'Passing %', 'Passing % score')
-            df_striker = calculate_score(df_striker, 'Passes_per90', 'Passing score')
-            df_striker = calculate_score(df_striker, 'finalThirdEntries_per90', 'finalThirdEntries_per90 score')
-            df_striker = calculate_score(df_striker, 'Forward zone pass %', 'Forward zone pass % score')
-            df_striker = calculate_score(df_striker, 'Forward zone pass_per90', 'Forward zone pass score')
-            df_striker = calculate_score(df_striker, 'fwdPass_per90', 'fwd_Pass_per90 score')
-            df_striker = calculate_score(df_striker, 'attAssistOpenplay_per90','attAssistOpenplay_per90 score')
-            df_striker = calculate_score(df_striker, 'penAreaEntries_per90','penAreaEntries_per90 score')
-            df_striker = calculate_score(df_striker, 'finalThird passes %','finalThird passes % score')
-            df_striker = calculate_score(df_striker, 'finalthirdpass_per90','finalThird passes per90 score')
-            df_striker = calculate_score(df_striker, 'shotFastbreak_per90','shotFastbreak_per90 score')
-            df_striker = calculate_score(df_striker, 'dribble %','dribble % score')
-            df_striker = calculate_score(df_striker, 'dribble_per90', 'dribble_per90 score')
-            df_striker = calculate_score(df_striker, 'touches_in_box_per90','touches_in_box_per90 score')
-            df_striker = calculate_score(df_striker, 'xA_per90','xA_per90 score')
-            df_striker = calculate_score(df_striker, 'attemptsIbox_per90','attemptsIbox_per90 score')
-            df_striker = calculate_score(df_striker, 'xg_per90','xg_per90 score')
-            df_striker = calculate_score(df_striker, 'post_shot_xg_per90','post_shot_xg_per90 score')
-
-            df_striker['Linkup_play'] = df_striker[['Forward zone pass % score','Forward zone pass score','Passing % score','Passing score','Possession value score','penAreaEntries_per90 score','finalThirdEntries_per90 score']].mean(axis=1)
-            df_striker['Chance_creation'] = df_striker[['penAreaEntries_per90 score','Possession value total score','touches_in_box_per90 score','finalThirdEntries_per90 score']].mean(axis=1)
-            df_striker['Goalscoring_'] = df_striker[['post_shot_xg_per90','xg_per90 score','xg_per90 score','xg_per90 score']].mean(axis=1)
-            df_striker['Possession_value'] = df_striker[['Possession value total score','Possession value score','Possession value score','Possession value score']].mean(axis=1)
-
-            df_striker = calculate_score(df_striker, 'Linkup_play', 'Linkup play')
-            df_striker = calculate_score(df_striker, 'Chance_creation','Chance creation')
-            df_striker = calculate_score(df_striker, 'Goalscoring_','Goalscoring')        
-            df_striker = calculate_score(df_striker, 'Possession_value', 'Possession value')
-
-            df_striker['Total score'] = df_striker.apply(
-                lambda row: weighted_mean(
-                    [row['Linkup play'], row['Chance creation'], row['Goalscoring'], row['Possession value']],
-                    [3 if row['Linkup play'] > 5 else 1, 3 if row['Chance creation'] > 5 else 1, 
-                    5 if row['Goalscoring'] > 5 else 2, 3 if row['Possession value'] < 5 else 1]
-                ), axis=1
-            )        
-            df_striker = df_striker[['playerName','team_name','label','date','minsPlayed','age_today','Linkup play','Chance creation','Goalscoring','Possession value','Total score']]
-            df_striker = df_striker.fillna(1)
-
-            df_strikertotal = df_striker[['playerName','team_name','minsPlayed','age_today','Linkup play','Chance creation','Goalscoring','Possession value','Total score']]
-
-            df_strikertotal = df_strikertotal.groupby(['playerName','team_name','age_today']).mean().reset_index()
-            minutter = df_striker.groupby(['playerName', 'team_name','age_today'])['minsPlayed'].sum().astype(float).reset_index()
-            df_strikertotal['minsPlayed total'] = minutter['minsPlayed']
-            with st.expander('Game by game'):
-                df_striker = df_striker.sort_values('date',ascending = False)
-                df_striker = df_striker.round(2)
-                st.dataframe(df_striker,hide_index=True)
-            with st.expander('Total'):
-                df_strikertotal = df_strikertotal[['playerName','team_name','age_today','minsPlayed total','Linkup play','Chance creation','Goalscoring','Possession value','Total score']]
-                df_strikertotal= df_strikertotal[df_strikertotal['minsPlayed total'].astype(int) >= minutter_total]
-                df_strikertotal = df_strikertotal.sort_values('Total score',ascending = False)
-                df_strikertotal = df_strikertotal.round(2)
-                st.dataframe(df_strikertotal,hide_index=True)
-            player_performance_profile(df_striker, position_title='Striker')
-
-        def scatter_plot(df_features, selected_player, similar_players, feature_cols):
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(df_features[feature_cols])
-
-            pca = PCA(n_components=2)
-            coords = pca.fit_transform(X_scaled)
+                st.dataframe(totals,hide_index=True)
+            if PROFILES[name]['performance_title']:
+                player_performance_profile(games, position_title=PROFILES[name]['performance_title'])
+
+        def plot_coords(df_features, feature_cols, method, perplexity=None, pool=None):
+            # Cached projection; with a pool (df_features_all, rows) the filtered players are looked up
+            # in the projection of the whole pool instead of refitting on every filter change
+            if pool is not None:
+                df_pool, rows = pool
+                with perf.stage('pool_embedding', rows_in=len(df_pool), cached=True, detail=method):
+                    return pool_embedding(df_pool, feature_cols, method)[rows]
+            with perf.stage('embedding', rows_in=len(df_features), cached=True, detail=method):
+                return embedding(df_features, feature_cols, method, perplexity)
+
+        def scatter_plot(df_features, selected_player, similar_players, feature_cols, pool=None):
+            coords = plot_coords(df_features, feature_cols, 'pca', pool=pool)
             df_features["PC1"], df_features["PC2"] = coords[:,0], coords[:,1]
 
             fig, ax = plt.subplots(figsize=(7,5))
@@ -1550,14 +707,9 @@ if view_mode == 'Scouting':
             ax.legend()
             st.pyplot(fig)
 
-        def tsne_plot(df_features, selected_player, similar_players, feature_cols,antal_spillere):
-            # Scale the features first
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(df_features[feature_cols])
-
-            # Run t-SNE (2D projection)
-            tsne = TSNE(n_components=2, random_state=42, perplexity=antal_spillere, max_iter=2000)
-            coords = tsne.fit_transform(X_scaled)
+        def tsne_plot(df_features, selected_player, similar_players, feature_cols,antal_spillere, pool=None):
+            # t-SNE (2D projection) of the scaled features
+            coords = plot_coords(df_features, feature_cols, 'tsne', perplexity=antal_spillere, pool=pool)
 
             df_features["TSNE1"], df_features["TSNE2"] = coords[:,0], coords[:,1]
 
@@ -1654,7 +806,7 @@ if view_mode == 'Scouting':
             # Hele datasættet uden aldersfilter
             df_features_all = (
                 df_pos[['playerName', 'team_name','league_name', 'minsPlayed', 'age_today'] + feature_cols]
-                .groupby(['playerName', 'team_name','league_name'])
+                .groupby(['playerName', 'team_name','league_name'], observed=True)
                 .agg({**{col: 'mean' for col in feature_cols},
                     'minsPlayed': 'sum',
                     'age_today': 'max'})
@@ -1683,26 +835,21 @@ if view_mode == 'Scouting':
 
             k = st.slider('Number of similar players', 1, 10, 5, key="num_neighbors")
             max_age = st.number_input("Max age of comparison players", min_value=15, max_value=50, value=25, key="max_age")
-            # Kandidatpulje = aldersfilter
-            df_features_candidates = df_features_all[df_features_all["age_today"] <= max_age].reset_index(drop=True)
+            # Kandidatpulje = aldersfilter (beholder index = rækken i df_features_all)
+            df_features_candidates = df_features_all[df_features_all["age_today"] <= max_age]
             leagues = df_features_candidates['league_name'].unique()
             chosen_leagues = st.multiselect("Leagues of comparison players",leagues)
             df_features_candidates = df_features_candidates[df_features_candidates['league_name'].isin(chosen_leagues)]
             if selected_player in df_features_all["playerName"].values and not df_features_candidates.empty:
-                scaler = StandardScaler()
-                X_scaled_all = scaler.fit_transform(df_features_all[feature_cols])
-                X_scaled_candidates = scaler.transform(df_features_candidates[feature_cols])
-
-                # Reference vektor
+                # Skalerede vektorer for hele puljen; alder og liga er kun en maske på kandidaterne
+                with perf.stage('load_index', rows_in=len(df_features_all), cached=True, detail=position):
+                    vectors = load_index(df_features_all, feature_cols)
                 idx_ref = df_features_all.index[df_features_all['playerName'] == selected_player][0]
-                ref_vector = X_scaled_all[idx_ref].reshape(1, -1)
 
                 # Find naboer blandt kandidater
-                model = NearestNeighbors(n_neighbors=min(k, len(df_features_candidates)),metric='cosine')
-                model.fit(X_scaled_candidates)
-                distances, indices = model.kneighbors(ref_vector)
-                results = df_features_candidates.iloc[indices[0]].copy()
-                results['distance'] = distances[0]
+                rows, distances = nearest(vectors, idx_ref, df_features_candidates.index.to_numpy(), k)
+                results = df_features_all.loc[rows].copy()
+                results['distance'] = distances
 
                 st.subheader("Similar players (table)")
                 st.dataframe(results, hide_index=True)
@@ -1711,79 +858,59 @@ if view_mode == 'Scouting':
                 df_for_plots = pd.concat([
                     df_features_candidates,
                     df_features_all[df_features_all['playerName'] == selected_player]
-                ]).drop_duplicates('playerName').reset_index(drop=True)
+                ]).drop_duplicates('playerName')
+                pool = None
+                if st.checkbox("Place players in the projection of the whole pool (faster, no refit)", key="embed_full_pool"):
+                    pool = (df_features_all, df_for_plots.index.to_numpy())
+                df_for_plots = df_for_plots.reset_index(drop=True)
 
                 antal_spillere = len(df_for_plots)-1
                 if not results.empty:
                     similar_players = results["playerName"].tolist()
 
                     st.subheader("t-SNE plot")
-                    tsne_plot(df_for_plots, selected_player, similar_players, feature_cols, antal_spillere=antal_spillere)
+                    tsne_plot(df_for_plots, selected_player, similar_players, feature_cols, antal_spillere=antal_spillere, pool=pool)
 
                     st.subheader("Similarity scatter plot (PCA)")
-                    scatter_plot(df_for_plots, selected_player, similar_players, feature_cols)
+                    scatter_plot(df_for_plots, selected_player, similar_players, feature_cols, pool=pool)
             else:
                 st.warning("No candidates available after filtering.")
 
         overskrifter_til_menu = {
             'Goalkeeper':Goalkeeper,
-            'Balanced central defender': balanced_central_defender,
-            'Fullbacks': fullbacks,
-            'Wingbacks': wingbacks,
-            'Number 6': number6,
-            'Number 6 (destroyer)': number6_destroyer,
-            'Number 8': number8,
-            'Number 10': number10,
-            'Winger' : winger,
-            'Classic striker' : Classic_striker,
+            'Balanced central defender': partial(show_profile, 'Balanced central defender'),
+            'Fullbacks': partial(show_profile, 'Fullbacks'),
+            'Wingbacks': partial(show_profile, 'Wingbacks'),
+            'Number 6': partial(show_profile, 'Number 6'),
+            'Number 6 (destroyer)': partial(show_profile, 'Number 6 (destroyer)'),
+            'Number 8': partial(show_profile, 'Number 8'),
+            'Number 10': partial(show_profile, 'Number 10'),
+            'Winger' : partial(show_profile, 'Winger'),
+            'Classic striker' : partial(show_profile, 'Classic striker'),
             'Player comparison (ML)': player_comparison_ml,        
         }
 
 
         selected_tabs = st.multiselect("Choose position profile", list(overskrifter_til_menu.keys()))
 
+        score_selected_profiles([tab for tab in selected_tabs if tab in PROFILES])
         for selected_tab in selected_tabs:
-            overskrifter_til_menu[selected_tab]()
+            with perf.stage(f'tab: {selected_tab}', rows_in=len(df_scouting)):
+                overskrifter_til_menu[selected_tab]()
 
-    @st.cache_data(ttl=3600)
-    def load_league_data(league_name):
-        folder = f"{base_url}{league_name}/"
-
-        def build_url(file_type):
-            # Handles space in filename by encoding it
-            file_name = f"{file_type} {league_name}.csv"
-            encoded_file_name = urllib.parse.quote(file_name)
-            return f"{folder}{encoded_file_name}"
-
-        try:
-            try:
-                df_pv = pd.read_csv(build_url('pv_all'))
-            except Exception:
-                df_pv = None
-
-            df_possession_xa = pd.read_csv(build_url('xA_all'))
-            df_matchstats = pd.read_csv(build_url('matchstats_all'))
-            df_xg = pd.read_csv(build_url('xg_all'))
-            squads = pd.read_csv(build_url('squads'))
-        except Exception as e:
-            st.error(f"❌ Failed to load data files for {league_name}: {e}")
-            return None
+    @st.cache_data(max_entries=32, show_spinner=False)
+    def profile_form(games):
+        # Rolling Total score and trend of every player of a profile, in one pass
+        series = form_series(games)
+        trends = form_trends(series)
+        return series, trends, form_leaderboard(series, trends)
 
-        # Fallback: Use df_possession_xa if df_pv is None
-        if df_pv is None:
-            required_cols = ['playerName', 'team_name', 'label']
-            for col in required_cols:
-                if col not in df_possession_xa.columns:
-                    df_possession_xa[col] = 'UNKNOWN'
-            if '318.0' not in df_possession_xa.columns:
-                st.error("No xA column in xA_all, cannot fallback to possession value data.")
-                return None
-            df_pv = df_possession_xa[required_cols + ['318.0']].copy()
-            df_pv['possessionValue.pvValue'] = df_pv['318.0'].astype(float)
-            df_pv['possessionValue.pvAdded'] = df_pv['318.0'].astype(float)
-            df_pv = df_pv.drop(columns=['318.0'])
-
-        return df_possession_xa, df_pv, df_matchstats, df_xg, squads
+    @st.cache_data(ttl=3600, show_spinner=False)
+    def load_league_data(league_name):
+        # Derived-feature table from the local store; rebuilt from the league files only
+        # when they changed. Errors are raised (and therefore not cached) and reported by the caller.
+        mark_miss()
+        return compact_frame(load_features(league_name))
 
     # --- Initialize session state ---
     if "checkbox_states" not in st.session_state:
@@ -1811,26 +938,74 @@ if view_mode == 'Scouting':
                 league for league, checked in st.session_state.checkbox_states.items() if checked
             ]
 
-    # Show checkboxes
+    # Show checkboxes; the list can grow during a session when the background refresh adds GitHub leagues
     for league in leagues:
         st.session_state.checkbox_states[league] = st.sidebar.checkbox(
-            league, value=st.session_state.checkbox_states[league], key=f"chk_{league}"
+            league, value=st.session_state.checkbox_states.setdefault(league, False), key=f"chk_{league}"
         )
 
+    @st.cache_resource
+    def scouting_frames():
+        # Combined df_scouting per confirmed league set, shared across reruns and sessions
+        return FrameCache()
+
+    def prepare_scouting_data(selected_leagues):
+        """Combined df_scouting for the confirmed leagues, or None when none loaded.
+
+        Served from the LRU cache for a league set that loaded cleanly before, so
+        widget changes only re-run the filtering and rendering in Process_data.
+        """
+        cache_key = frozenset(selected_leagues)
+        df_scouting = scouting_frames().get(cache_key)
+        if df_scouting is not None:
+            return df_scouting
+        mark_miss()
+
+        with st.spinner(f"Loading {len(selected_leagues)} leagues…"):
+            progress = st.progress(0.0)
+
+            def report_progress(done, total, league):
+                progress.progress(done / total, text=f"Loaded {league} ({done}/{total})")
+
+            loaded, failed = load_in_parallel(selected_leagues, timed_loader('load_league_data', load_league_data),
+                                              on_progress=report_progress)
+            progress.empty()
+        for league, e in failed.items():
+            st.error(f"❌ Failed to load data files for {league}: {e}")
+        if not loaded:
+            return None
+        with perf.stage('concat_frames', rows_in=len(loaded)) as record:
+            df_scouting = concat_frames(loaded.values())
+            record['rows_out'] = len(df_scouting)
+        # A partial load is not cached, so the failed leagues are retried next run
+        if not failed:
+            scouting_frames().put(cache_key, df_scouting)
+        return df_scouting
+
     # --- Main area ---
     if st.session_state.confirmed_leagues:
         selected_leagues = st.session_state.confirmed_leagues
         st.success(f"✅ Confirmed leagues: {', '.join(selected_leagues)}")
 
         # 🔽 Only load AFTER confirm
-        league_data = [load_league_data(league) for league in selected_leagues]
-        league_data = [d for d in league_data if d is not None]
-        if league_data:
-            df_possession_xa = pd.concat([d[0] for d in league_data], ignore_index=True)
-            df_pv = pd.concat([d[1] for d in league_data], ignore_index=True)
-            df_matchstats = pd.concat([d[2] for d in league_data], ignore_index=True)
-            df_xg = pd.concat([d[3] for d in league_data], ignore_index=True)
-            squads = pd.concat([d[4] for d in league_data], ignore_index=True)
-            Process_data(df_possession_xa, df_pv, df_matchstats, df_xg, squads)
+        with perf.stage('prepare_scouting_data', cached=True, detail=f'{len(selected_leagues)} leagues') as record:
+            df_scouting = prepare_scouting_data(selected_leagues)
+            record['rows_out'] = None if df_scouting is None else len(df_scouting)
+        if df_scouting is not None:
+            Process_data(df_scouting)
     else:
         st.info("Select leagues and press **Confirm selection**")
+
+# --- Performance panel ---
+if perf.enabled:
+    with perf_panel:
+        df_run = perf.run_table()
+        if df_run is None:
+            st.caption("No stages recorded in this run.")
+        else:
+            st.caption(f"Run {perf.run}")
+            st.dataframe(df_run.round(3), hide_index=True)
+        df_session = perf.session_summary()
+        if df_session is not None:
+            with st.expander("Session p50/p95"):
+                st.dataframe(df_session.round(3), hide_index=True)
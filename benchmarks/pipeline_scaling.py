@@ -0,0 +1,222 @@
+"""Scaling benchmark of the data pipeline on synthetic leagues.
+
+For every scale point (number of leagues x seasons per league) the synthetic
+league folders are generated with ``synthetic_leagues.py`` into their own data
+directory. The pipeline then runs headless in a fresh interpreter with
+``SCOUTING_DATA_DIR`` pointing there, one stage after the other:
+
+- ``convert``: CSV to Parquet store (league_store.build_store)
+- ``features``: derived feature tables (derived_features.build_all)
+- ``team_matches``, ``set_pieces``, ``summary``: the other derived tables
+- ``load``: the Scouting page's league load (load_features + compact_frame on
+  the loader pool, then concat_frames)
+- ``profiles``: every position profile scored on the loaded frame, sharing one
+  cache like a page run with the default filters
+- ``similarity``: the striker pool of Player comparison (ML), its index and
+  ``QUERIES`` nearest-neighbour lookups
+
+Each stage records its wall time, the peak of Python allocations inside the
+stage (tracemalloc) and the process max RSS after it. The report is written
+as JSON::
+
+    python benchmarks/pipeline_scaling.py [--leagues 1 10 70] [--seasons 1] [--out report.json] [--workdir DIR]
+
+The data directories are kept under ``--workdir`` and reused by later runs
+with the same scale point and seed; pass ``--fresh`` to regenerate them.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic_leagues import DEFAULT_TEMPLATE, write_leagues  # noqa: E402
+
+STAGES = ['convert', 'features', 'team_matches', 'set_pieces', 'summary', 'load', 'profiles', 'similarity']
+QUERIES = 20
+# Filters of a Scouting page run with the inputs left at their defaults
+MIN_MINUTES, MAX_AGE, MIN_TOTAL_MINUTES = 0, 25, 0
+STRIKER_FEATURES = [
+    'xg_per90', 'post_shot_xg_per90', 'touches_in_box_per90', 'Forward zone pass %', 'xA_per90',
+    'Possession value total per_90', 'Passing %', 'aerialWon_per90', 'Aerial duel %', 'duels won %',
+]
+
+# Runs in the fresh interpreter, with SCOUTING_DATA_DIR set: time each stage and report
+_CHILD = '''
+import json, resource, sys, time, tracemalloc
+sys.path.insert(0, sys.argv[1])
+sys.path.insert(0, sys.argv[2])
+stages, queries = json.loads(sys.argv[3]), int(sys.argv[4])
+import pipeline_scaling as bench
+from league_store import local_leagues
+
+leagues = local_leagues()
+state = {}
+results = {}
+tracemalloc.start()
+for stage in stages:
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    detail = bench.run_stage(stage, leagues, state, queries)
+    seconds = time.perf_counter() - start
+    results[stage] = {
+        'seconds': seconds,
+        'peak_mb': tracemalloc.get_traced_memory()[1] / 2**20,
+        'maxrss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        **detail,
+    }
+print(json.dumps({'leagues': len(leagues), 'stages': results}))
+'''
+
+
+def striker_pool(df_scouting, min_total_minutes=MIN_TOTAL_MINUTES):
+    """Per-player striker feature means, as Player comparison (ML) builds its pool."""
+    from position_profiles import POPULATIONS
+
+    feature_cols = [col for col in STRIKER_FEATURES if col in df_scouting.columns]
+    df_pos = df_scouting[POPULATIONS['striker'](df_scouting)]
+    pool = (
+        df_pos[['playerName', 'team_name', 'league_name', 'minsPlayed', 'age_today'] + feature_cols]
+        .groupby(['playerName', 'team_name', 'league_name'], observed=True)
+        .agg({**{col: 'mean' for col in feature_cols}, 'minsPlayed': 'sum', 'age_today': 'max'})
+        .reset_index()
+        .dropna()
+    )
+    pool = pool[pool['minsPlayed'].astype(float) >= min_total_minutes].reset_index(drop=True)
+    return pool, feature_cols
+
+
+def run_stage(stage, leagues, state, queries=QUERIES):
+    """Run one pipeline stage on ``leagues``; returns extra numbers for the report."""
+    if stage == 'convert':
+        from league_store import build_store
+        return {'files': build_store(leagues)}
+    if stage == 'features':
+        import derived_features
+        return {'built': derived_features.build_all(leagues)}
+    if stage == 'team_matches':
+        import team_matches
+        return {'built': team_matches.build_all(leagues)}
+    if stage == 'set_pieces':
+        import set_pieces
+        return {'built': set_pieces.build_all(leagues)}
+    if stage == 'summary':
+        import league_summary
+        return {'built': len(league_summary.build_summary(leagues))}
+    if stage == 'load':
+        from derived_features import load_features
+        from frame_schema import compact_frame, concat_frames
+        from parallel_loader import load_in_parallel
+        loaded, failed = load_in_parallel(leagues, lambda league: compact_frame(load_features(league)))
+        state['df_scouting'] = concat_frames(loaded.values())
+        return {'rows': len(state['df_scouting']), 'failed': len(failed)}
+    if stage == 'profiles':
+        from position_profiles import PROFILES, score_profile
+        cache = {}
+        rows = 0
+        for profile in PROFILES.values():
+            games, _ = score_profile(state['df_scouting'], profile, MIN_MINUTES, MAX_AGE, MIN_TOTAL_MINUTES, cache)
+            rows += len(games)
+        return {'profiles': len(PROFILES), 'rows': rows}
+    if stage == 'similarity':
+        from player_index import load_index, nearest
+        pool, feature_cols = striker_pool(state['df_scouting'])
+        if pool.empty:
+            return {'pool': 0}
+        vectors = load_index(pool, feature_cols)
+        candidates = pool.index.to_numpy()
+        for ref in candidates[:: max(1, len(candidates) // queries)][:queries]:
+            nearest(vectors, ref, candidates, 5)
+        return {'pool': len(pool)}
+    raise ValueError(f"unknown stage {stage}")
+
+
+def measure(data_dir, stages=STAGES, queries=QUERIES):
+    """Stage timings of the pipeline on the league folders in ``data_dir``, in a new interpreter."""
+    env = {**os.environ, 'SCOUTING_DATA_DIR': str(data_dir)}
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-c', _CHILD, str(REPO_DIR), str(BENCH_DIR), json.dumps(stages), str(queries)],
+        cwd=data_dir, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'pipeline run failed')
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['wall'] = wall
+    return result
+
+
+def source_rows(data_dir):
+    """Data rows per file type over all league folders of ``data_dir``."""
+    rows = {}
+    for path in Path(data_dir).glob('*/*.csv'):
+        file_type = path.name.split(' ', 1)[0]
+        with open(path, 'rb') as f:
+            rows[file_type] = rows.get(file_type, 0) + sum(1 for _ in f) - 1
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the pipeline stages on synthetic leagues at several scales.')
+    parser.add_argument('--leagues', type=int, nargs='+', default=[1, 10, 70], help='league counts to measure')
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1], help='seasons per league to measure')
+    parser.add_argument('--stage', action='append', choices=STAGES, help='stage to run (default: all)')
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE, help='league folder the synthetic data is modelled on')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', default=str(Path(tempfile.gettempdir()) / 'scouting_scaling'),
+                        help='where the synthetic data directories are kept')
+    parser.add_argument('--fresh', action='store_true', help='regenerate the synthetic data')
+    parser.add_argument('--out', default='pipeline_scaling.json', help='JSON report path')
+    args = parser.parse_args()
+    stages = [stage for stage in STAGES if stage in (args.stage or STAGES)]
+
+    import pandas as pd
+    report = {
+        'template': args.template, 'seed': args.seed, 'stages': stages, 'queries': QUERIES,
+        'python': platform.python_version(), 'pandas': pd.__version__, 'cpus': os.cpu_count(),
+        'points': [],
+    }
+    for seasons in args.seasons:
+        for n_leagues in args.leagues:
+            data_dir = Path(args.workdir) / f'{args.template}_{n_leagues}x{seasons}_seed{args.seed}'
+            generate_seconds = None
+            if args.fresh or not data_dir.exists():
+                shutil.rmtree(data_dir, ignore_errors=True)
+                started = time.perf_counter()
+                write_leagues(data_dir, n_leagues, seasons, args.template, args.seed)
+                generate_seconds = time.perf_counter() - started
+            else:
+                # The store and derived tables are rebuilt so every run measures the same work
+                shutil.rmtree(data_dir / 'league_store', ignore_errors=True)
+                for name in ['league comparison data.csv', 'league comparison summary.csv']:
+                    (data_dir / name).unlink(missing_ok=True)
+
+            result = measure(data_dir, stages)
+            report['points'].append({
+                'leagues': n_leagues, 'seasons': seasons, 'league_folders': result['leagues'],
+                'source_rows': source_rows(data_dir), 'generate_seconds': generate_seconds,
+                'wall': result['wall'], 'stages': result['stages'],
+            })
+            print(f"{n_leagues:>3} leagues x {seasons} season(s)  {result['wall']:7.2f}s wall")
+            for stage, numbers in result['stages'].items():
+                print(f"    {stage:<13} {numbers['seconds']:7.2f}s  {numbers['peak_mb']:8.1f} MB peak"
+                      f"  {numbers['maxrss_mb']:8.1f} MB rss")
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"report written to {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
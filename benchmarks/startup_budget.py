@@ -0,0 +1,96 @@
+"""Cold-start budget for the Streamlit app.
+
+Each mode is rendered in a fresh interpreter with streamlit's AppTest, the
+way a new worker renders its first page. The check fails (exit status 1)
+when that takes longer than the budget, or when a mode's landing page imports
+a module it does not need (umap/numba anywhere, sklearn and the plotting
+libraries on the Scouting page before any league is confirmed).
+
+    python benchmarks/startup_budget.py [--budget SECONDS] [--mode MODE ...]
+
+The budget defaults to ``SCOUTING_STARTUP_BUDGET`` (6 seconds when unset).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+APP = REPO_DIR / 'Scouting.py'
+DEFAULT_BUDGET = float(os.environ.get('SCOUTING_STARTUP_BUDGET', 6))
+
+MODES = ['Scouting', 'League Comparison', 'Team Comparison', 'Set Pieces']
+
+# Modules a mode must not load for its first page
+FORBIDDEN = {
+    'Scouting': ['umap', 'numba', 'sklearn', 'matplotlib.pyplot', 'scipy.stats', 'plotly.express'],
+    'League Comparison': ['umap', 'numba', 'matplotlib.pyplot'],
+    'Team Comparison': ['umap', 'numba', 'matplotlib.pyplot'],
+    'Set Pieces': ['umap', 'numba', 'sklearn', 'matplotlib.pyplot', 'scipy.stats'],
+}
+
+# Runs in the fresh interpreter: render the first page of one mode and report
+_CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app, mode, watched = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+at = AppTest.from_file(app, default_timeout=600)
+if mode != 'Scouting':
+    # The mode radio has no key, so its value is set in session state before the first run
+    at.session_state['mode'] = mode
+at.run()
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'exceptions': [str(e.value) for e in at.exception],
+    'loaded': [m for m in watched if m in sys.modules],
+}))
+'''
+
+
+def measure(mode):
+    """Seconds to render ``mode`` in a new interpreter, with exceptions and forbidden modules loaded."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-c', _CHILD, str(APP), mode, json.dumps(FORBIDDEN[mode])],
+        cwd=REPO_DIR, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'app run failed')
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['wall'] = wall
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the cold-start time of every app mode.')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='seconds per mode (wall clock)')
+    parser.add_argument('--mode', action='append', choices=MODES, help='mode to check (default: all)')
+    args = parser.parse_args()
+
+    failures = []
+    for mode in args.mode or MODES:
+        result = measure(mode)
+        status = 'ok'
+        if result['exceptions']:
+            status = 'error'
+            failures.append(f"{mode}: {result['exceptions'][0]}")
+        if result['wall'] > args.budget:
+            status = 'over budget'
+            failures.append(f"{mode}: {result['wall']:.2f}s > {args.budget:.2f}s")
+        if result['loaded']:
+            status = 'unneeded imports'
+            failures.append(f"{mode}: imported {', '.join(result['loaded'])}")
+        print(f"{mode:<18} {result['wall']:6.2f}s wall  {result['seconds']:6.2f}s render  {status}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Synthetic league folders with the schemas of the real ones.
+
+Each synthetic league is built from a template league folder of the checkout
+(``DNK_Superliga_2025_2026`` by default). Its teams and players are the
+template's, renamed and re-identified per league. Its season is a full double
+round robin. Every synthetic team-match copies the rows of a random match of
+the same template team, so ``matchstats_all``, ``pv_all``, ``xA_all``,
+``xg_all``, ``set_pieces_all`` and ``squads`` keep their columns, dtypes,
+value distributions and row counts per match, and still join on player, team,
+label and match id the way the real files do. Later seasons of a league reuse
+its teams and players.
+
+    python benchmarks/synthetic_leagues.py OUT_DIR [--leagues N] [--seasons S] [--template LEAGUE] [--seed SEED]
+
+The folders are written as ``OUT_DIR/<league>/<file_type> <league>.csv``, the
+layout league_store expects. Point ``SCOUTING_DATA_DIR`` at OUT_DIR to run the
+pipeline on them.
+"""
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from league_store import CSV_DTYPES, FILE_TYPES, csv_name  # noqa: E402
+
+DEFAULT_TEMPLATE = 'DNK_Superliga_2025_2026'
+FIRST_SEASON = 2021
+SEASON_START = pd.Timestamp('2021-07-16')
+
+# Per file: the columns that identify the template team-match a row belongs to
+BLOCK_KEYS = {
+    'matchstats_all': ['team_name', 'match_id'],
+    'xg_all': ['team_name', 'match_id'],
+    'set_pieces_all': ['team_name', 'match_id'],
+    'pv_all': ['team_name', 'label', 'date'],
+    'xA_all': ['team_name', 'label', 'date'],
+}
+PLAYER_NAME_COLUMNS = ['player_matchName', 'playerName', 'matchName']
+PLAYER_ID_COLUMNS = ['player_playerId', 'playerId', 'receiverId']
+# Text columns naming a team (or 'draw'), rewritten to the synthetic team or its opponent
+TEAM_TEXT_COLUMNS = ['match_state', 'set_piece_team']
+
+
+def _ids(values, salt):
+    """Stable 25-character ids for ``values``, different per ``salt``."""
+    return {v: hashlib.sha1(f'{salt}:{v}'.encode()).hexdigest()[:25] for v in pd.unique(values)}
+
+
+def read_template(template=DEFAULT_TEMPLATE):
+    """The template league's files, keyed by file type."""
+    files = {}
+    for file_type in FILE_TYPES:
+        path = REPO_DIR / template / csv_name(template, file_type)
+        if path.exists():
+            files[file_type] = pd.read_csv(path, dtype=CSV_DTYPES, low_memory=False)
+    missing = {'matchstats_all', 'squads'} - set(files)
+    if missing:
+        raise ValueError(f"template {template} lacks {', '.join(sorted(missing))}")
+    return files
+
+
+def fixtures(n_teams, season, rng):
+    """Double round robin of ``n_teams`` (circle method): round, date, home and away team index."""
+    teams = list(range(n_teams + n_teams % 2))
+    rounds = []
+    for r in range(len(teams) - 1):
+        pairs = [(teams[i], teams[-1 - i]) for i in range(len(teams) // 2)]
+        rounds.append([(a, b) if r % 2 else (b, a) for a, b in pairs])
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+    rounds += [[(b, a) for a, b in pairs] for pairs in rounds]
+
+    start = SEASON_START + pd.DateOffset(years=season)
+    rows = []
+    for r, pairs in enumerate(rounds):
+        for home, away in pairs:
+            if max(home, away) >= n_teams:
+                continue
+            day = start + pd.Timedelta(days=7 * r + int(rng.integers(0, 3)))
+            rows.append((r, day.strftime('%Y-%m-%d'), home, away))
+    return pd.DataFrame(rows, columns=['round', 'date', 'home', 'away'])
+
+
+def generate_league(template_files, league, league_no, season, seed=0):
+    """The files of one synthetic league season, keyed by file type."""
+    rng = np.random.default_rng([seed, league_no, season])
+    tag = f'L{league_no:02d}'
+    matchstats = template_files['matchstats_all']
+    teams = sorted(matchstats['team_name'].dropna().unique())
+    team_names = {team: f'{team} {tag}' for team in teams}
+    contestants = _ids(matchstats['contestantId'].dropna(), tag)
+    player_names = {}
+    player_ids = {}
+    for file_type, df in template_files.items():
+        for col in PLAYER_NAME_COLUMNS:
+            if col in df.columns:
+                player_names.update({name: f'{name} {tag}' for name in df[col].dropna().unique()})
+        # The squads file names its player id column plain 'id'
+        for col in PLAYER_ID_COLUMNS + (['id'] if file_type == 'squads' else []):
+            if col in df.columns:
+                player_ids.update(_ids(df[col].dropna(), tag))
+
+    # One slot per synthetic team-match: which template match of the same team it copies
+    template_matches = matchstats[['team_name', 'match_id', 'label', 'date']].drop_duplicates(['team_name', 'match_id'])
+    by_team = {team: rows for team, rows in template_matches.groupby('team_name')}
+    games = fixtures(len(teams), season - FIRST_SEASON, rng)
+    slots = []
+    for game in games.itertuples():
+        home, away = teams[game.home], teams[game.away]
+        label = f'{team_names[home]} vs {team_names[away]}'
+        match_id = hashlib.sha1(f'{tag}:{season}:{game.Index}'.encode()).hexdigest()[:25]
+        for team, opponent in [(home, away), (away, home)]:
+            source = by_team[team].iloc[int(rng.integers(0, len(by_team[team])))]
+            slots.append({
+                'template_team': team, 'template_match_id': source['match_id'],
+                'template_label': source['label'], 'template_date': source['date'],
+                'new_team': team_names[team], 'new_opponent': team_names[opponent],
+                'new_label': label, 'new_match_id': match_id, 'new_date': game.date,
+            })
+    slots = pd.DataFrame(slots)
+    slot_keys = {
+        'team_name': 'template_team', 'match_id': 'template_match_id',
+        'label': 'template_label', 'date': 'template_date',
+    }
+
+    league_name = f'Synthetic League {league_no:02d}'
+    files = {}
+    for file_type, keys in BLOCK_KEYS.items():
+        if file_type not in template_files:
+            continue
+        template = template_files[file_type]
+        columns = list(template.columns)
+        df = slots.merge(template, left_on=[slot_keys[k] for k in keys], right_on=keys, how='inner')
+        df['team_name'] = df['new_team']
+        for col, new in [('label', 'new_label'), ('date', 'new_date'), ('match_id', 'new_match_id')]:
+            if col in columns:
+                df[col] = df[new]
+        if 'contestantId' in columns:
+            df['contestantId'] = df['contestantId'].map(contestants)
+        for col in PLAYER_NAME_COLUMNS:
+            if col in columns:
+                df[col] = df[col].map(player_names)
+        for col in PLAYER_ID_COLUMNS:
+            if col in columns:
+                df[col] = df[col].map(player_ids)
+        for col in TEAM_TEXT_COLUMNS:
+            if col in columns:
+                text = df[col].astype(str)
+                df[col] = np.select(
+                    [df[col].isna() | (text == 'draw'), text == df['template_team']],
+                    [df[col], df['new_team']], default=df['new_opponent'],
+                )
+        if 'league_name' in columns:
+            df['league_name'] = league_name
+        if 'country' in columns:
+            df['country'] = 'Synthetic'
+        if 'season' in columns:
+            df['season'] = f'{season}/{season + 1}'
+        files[file_type] = df[columns]
+
+    squads = template_files['squads'].copy()
+    squads['matchName'] = squads['matchName'].map(player_names).fillna(squads['matchName'])
+    squads['id'] = squads['id'].map(player_ids)
+    files['squads'] = squads
+    return files
+
+
+def league_folder(league_no, season):
+    return f'SYN_League_{league_no:02d}_{season}_{season + 1}'
+
+
+def write_leagues(out_dir, n_leagues, n_seasons=1, template=DEFAULT_TEMPLATE, seed=0):
+    """Write ``n_leagues`` x ``n_seasons`` synthetic league folders to ``out_dir``; returns the folder names."""
+    out_dir = Path(out_dir)
+    template_files = read_template(template)
+    leagues = []
+    for league_no in range(1, n_leagues + 1):
+        for season in range(FIRST_SEASON, FIRST_SEASON + n_seasons):
+            league = league_folder(league_no, season)
+            folder = out_dir / league
+            folder.mkdir(parents=True, exist_ok=True)
+            for file_type, df in generate_league(template_files, league, league_no, season, seed).items():
+                df.to_csv(folder / csv_name(league, file_type), index=False)
+            leagues.append(league)
+    return leagues
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write synthetic league folders.')
+    parser.add_argument('out_dir', help='directory to write the league folders to')
+    parser.add_argument('--leagues', type=int, default=1, help='number of leagues')
+    parser.add_argument('--seasons', type=int, default=1, help='seasons per league')
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE, help='league folder the data is modelled on')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    leagues = write_leagues(args.out_dir, args.leagues, args.seasons, args.template, args.seed)
+    print(f"{len(leagues)} league folder(s) written to {args.out_dir}")
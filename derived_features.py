@@ -0,0 +1,471 @@
+"""Per-league derived-feature tables for the Scouting page.
+
+``prepare_features`` is the data half of ``Process_data``: the pv/xg/xA joins,
+the opponent aggregates, the squads merge and the ~45 per-90 and percentage
+columns. Each league is prepared on its own and the result is written to
+``league_store/<league>/features.parquet``, keyed on the sha1 of its source
+files (see league_store), so the app only concatenates ready tables and never
+repeats the feature engineering for a widget change. ``age_today`` is the only
+column that depends on the current date and is added when a table is loaded.
+When the files only gained matches, ``ingest`` updates a stored table with
+``update_features`` instead of rebuilding it.
+
+Build or refresh the tables ahead of time with::
+
+    python derived_features.py [league ...]
+"""
+import argparse
+import hashlib
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from league_store import (
+    REPO_DIR, STORE_DIR, _manifest_lock, _write_manifest, is_fresh,
+    load_manifest, local_leagues, read_league_file, source_path,
+)
+
+# Bump when prepare_features changes so existing tables are rebuilt
+FEATURES_VERSION = 1
+
+# The files prepare_features reads; the table's key covers exactly these
+FEATURE_FILE_TYPES = ['pv_all', 'xA_all', 'matchstats_all', 'xg_all', 'squads']
+
+# The columns prepare_features uses from each file; the others are never read
+FEATURE_COLUMNS = {
+    'pv_all': ['playerName', 'team_name', 'label', 'possessionValue.pvValue', 'possessionValue.pvAdded'],
+    # team_name lets xA stand in for a missing pv file
+    'xA_all': ['playerName', 'team_name', 'label', '318.0'],
+    'matchstats_all': [
+        'player_matchName', 'player_playerId', 'contestantId', 'duelLost', 'aerialLost',
+        'player_position', 'player_positionSide', 'successfulOpenPlayPass', 'totalContest',
+        'duelWon', 'penAreaEntries', 'accurateBackZonePass', 'possWonDef3rd', 'wonContest',
+        'accurateFwdZonePass', 'openPlayPass', 'totalBackZonePass', 'minsPlayed', 'fwdPass',
+        'finalThirdEntries', 'ballRecovery', 'totalFwdZonePass', 'successfulFinalThirdPasses',
+        'totalFinalThirdPasses', 'attAssistOpenplay', 'aerialWon', 'totalAttAssist',
+        'possWonMid3rd', 'interception', 'totalCrossNocorner', 'interceptionWon', 'attOpenplay',
+        'touchesInOppBox', 'attemptsIbox', 'totalThroughBall', 'possWonAtt3rd',
+        'accurateCrossNocorner', 'bigChanceCreated', 'accurateThroughBall', 'totalLayoffs',
+        'accurateLayoffs', 'totalFastbreak', 'shotFastbreak', 'formationUsed', 'goals', 'label',
+        'match_id', 'date', 'possLostAll', 'league_name',
+    ],
+    'xg_all': ['contestantId', 'team_name', 'playerName', 'playerId', '321', '322', '9', 'match_id', 'label', 'date'],
+    'squads': ['id', 'matchName', 'nationality', 'dateOfBirth'],
+}
+
+
+def features_path(league):
+    return STORE_DIR / league / 'features.parquet'
+
+
+def read_league_inputs(league):
+    """The columns prepare_features needs from the files of one league, with xA
+    standing in for a missing pv_all file."""
+    try:
+        df_pv = read_league_file(league, 'pv_all', FEATURE_COLUMNS['pv_all'])
+    except Exception:
+        df_pv = None
+
+    df_possession_xa = read_league_file(league, 'xA_all', FEATURE_COLUMNS['xA_all'])
+    df_matchstats = read_league_file(league, 'matchstats_all', FEATURE_COLUMNS['matchstats_all'])
+    df_xg = read_league_file(league, 'xg_all', FEATURE_COLUMNS['xg_all'])
+    squads = read_league_file(league, 'squads', FEATURE_COLUMNS['squads'])
+
+    # Fallback: Use df_possession_xa if df_pv is None
+    if df_pv is None:
+        required_cols = ['playerName', 'team_name', 'label']
+        for col in required_cols:
+            if col not in df_possession_xa.columns:
+                df_possession_xa[col] = 'UNKNOWN'
+        if '318.0' not in df_possession_xa.columns:
+            raise ValueError("No xA column in xA_all, cannot fallback to possession value data.")
+        df_pv = df_possession_xa[required_cols + ['318.0']].copy()
+        df_pv['possessionValue.pvValue'] = df_pv['318.0'].astype(float)
+        df_pv['possessionValue.pvAdded'] = df_pv['318.0'].astype(float)
+        df_pv = df_pv.drop(columns=['318.0'])
+
+    return df_possession_xa, df_pv, df_matchstats, df_xg, squads
+
+
+def match_features(df_possession_xa, df_pv, df_matchstats, df_xg):
+    """Per-match half of prepare_features: the pv/xg/xA joins and the match and opponent aggregates.
+
+    Every row depends only on the rows of its own match, so the matches of a
+    file can be prepared in separate batches.
+    """
+    df_possession_xa = df_possession_xa.rename(columns={'318.0': 'xA'})
+    df_possession_xa['xA'] = df_possession_xa['xA'].astype(float)
+    df_possession_xa_summed = df_possession_xa.groupby(['playerName','label'])['xA'].mean().reset_index()
+    df_possession_xa_summed = df_possession_xa_summed.fillna(0)
+
+    df_pv = df_pv[FEATURE_COLUMNS['pv_all']]
+    df_pv.loc[:, 'possessionValue.pvValue'] = df_pv['possessionValue.pvValue'].astype(float)
+    df_pv.loc[:, 'possessionValue.pvAdded'] = df_pv['possessionValue.pvAdded'].astype(float)
+    df_pv['possessionValue'] = df_pv['possessionValue.pvValue'] + df_pv['possessionValue.pvAdded']
+    df_kamp = df_pv.groupby(['playerName', 'label', 'team_name']).mean()
+
+    df_kamp = df_kamp.reset_index()
+    df_matchstats = df_matchstats[FEATURE_COLUMNS['matchstats_all']]
+    df_matchstats = df_matchstats.rename(columns={'player_matchName': 'playerName'})
+    df_scouting = df_matchstats.merge(df_kamp)
+    def calculate_match_pv(df_scouting):
+        # Calculate the total match_xg for each match_id
+        df_scouting['match_pv'] = df_scouting.groupby('match_id')['possessionValue.pvValue'].transform('sum')
+        
+        # Calculate the total team_xg for each team in each match
+        df_scouting['team_pv'] = df_scouting.groupby(['contestantId', 'match_id'])['possessionValue.pvValue'].transform('sum')
+        
+        # Calculate opponents_xg as match_xg - team_xg
+        df_scouting['opponents_pv'] = df_scouting['match_pv'] - df_scouting['team_pv']
+        df_scouting['opponents_pv'] = pd.to_numeric(df_scouting['opponents_pv'], errors='coerce')
+        return df_scouting
+    df_scouting = calculate_match_pv(df_scouting)
+    
+    df_xg = df_xg[FEATURE_COLUMNS['xg_all']]
+    df_xg = df_xg[df_xg['9']!= True]
+    df_xg = df_xg.rename(columns={'321': 'xg'})
+    df_xg = df_xg.rename(columns={'322': 'post shot xg'})
+    df_xg['xg'] = df_xg['xg'].astype(float)
+    df_xg['post shot xg'] = df_xg['post shot xg'].astype(float)
+    df_xg = df_xg.fillna(0)
+    df_xg = df_xg.groupby(['playerName','playerId','match_id','contestantId','team_name','label','date']).sum()
+    df_xg = df_xg.reset_index()
+
+    df_scouting = df_scouting.rename(columns={'player_playerId': 'playerId'})
+    df_scouting = df_scouting.merge(df_xg, how='left', on=['playerName', 'playerId', 'match_id', 'contestantId', 'team_name', 'label', 'date']).reset_index()
+    df_scouting = df_scouting.merge(df_possession_xa_summed,how='left')
+    df_scouting['label'] = df_scouting['label'] + ' ' + df_scouting['date']
+    def calculate_match_goals(df_scouting):
+        # Calculate the total match_xg for each match_id
+        df_scouting['match_goals'] = df_scouting.groupby('match_id')['goals'].transform('sum')
+        
+        # Calculate the total team_xg for each team in each match
+        df_scouting['team_goals'] = df_scouting.groupby(['contestantId', 'match_id'])['goals'].transform('sum')
+        
+        # Calculate opponents_xg as match_xg - team_xg
+        df_scouting['opponents_goals'] = df_scouting['match_goals'] - df_scouting['team_goals']
+        df_scouting['opponents_goals'] = pd.to_numeric(df_scouting['opponents_goals'], errors='coerce')
+    
+        return df_scouting
+
+    def calculate_match_xg(df_scouting):
+        # Calculate the total match_xg for each match_id
+        df_scouting['match_xg'] = df_scouting.groupby('match_id')['xg'].transform('sum')
+        
+        # Calculate the total team_xg for each team in each match
+        df_scouting['team_xg'] = df_scouting.groupby(['contestantId', 'match_id'])['xg'].transform('sum')
+        
+        # Calculate opponents_xg as match_xg - team_xg
+        df_scouting['opponents_xg'] = df_scouting['match_xg'] - df_scouting['team_xg']
+        df_scouting['opponents_xg'] = pd.to_numeric(df_scouting['opponents_xg'], errors='coerce')
+    
+        return df_scouting
+
+    def calculate_match_post_shot_xg(df_scouting):
+        # Calculate the total match_xg for each match_id
+        df_scouting['match_post_shot_xg'] = df_scouting.groupby('match_id')['post shot xg'].transform('sum')
+        
+        # Calculate the total team_xg for each team in each match
+        df_scouting['team_post_shot_xg'] = df_scouting.groupby(['contestantId', 'match_id'])['post shot xg'].transform('sum')
+        
+        # Calculate opponents_xg as match_xg - team_xg
+        df_scouting['opponents_post_shot_xg'] = df_scouting['match_post_shot_xg'] - df_scouting['team_post_shot_xg']
+        df_scouting['opponents_post_shot_xg'] = pd.to_numeric(df_scouting['opponents_post_shot_xg'], errors='coerce')
+    
+        return df_scouting
+
+
+    df_scouting = calculate_match_xg(df_scouting)
+    df_scouting = calculate_match_goals(df_scouting)
+    df_scouting = calculate_match_post_shot_xg(df_scouting)
+
+    df_scouting = df_scouting.merge(df_possession_xa_summed, how='left')
+    def calculate_match_xa(df_scouting):
+        # Calculate the total match_xg for each match_id
+        df_scouting['match_xA'] = df_scouting.groupby('match_id')['xA'].transform('sum')
+        
+        # Calculate the total team_xg for each team in each match
+        df_scouting['team_xA'] = df_scouting.groupby(['contestantId', 'match_id'])['xA'].transform('sum')
+        
+        # Calculate opponents_xg as match_xg - team_xg
+        df_scouting['opponents_xA'] = df_scouting['match_xA'] - df_scouting['team_xA']
+        df_scouting['opponents_xA'] = pd.to_numeric(df_scouting['opponents_xA'], errors='coerce')
+        
+        return df_scouting
+    df_scouting = calculate_match_xa(df_scouting)
+    
+    df_scouting.fillna(0, inplace=True)
+    return df_scouting
+
+
+def squad_table(squads):
+    """Player id, name, nationality and date of birth from a squads file."""
+    squads['dateOfBirth'] = pd.to_datetime(squads['dateOfBirth'])
+    squads = squads[FEATURE_COLUMNS['squads']]
+    squads = squads.rename(columns={'id': 'playerId'})
+    squads = squads.rename(columns={'matchName': 'playerName'})
+    # dateOfBirth stays a datetime (NaT when unknown) so age_today can be
+    # computed when the table is loaded instead of going stale on disk
+    squads = squads.fillna({col: 0 for col in squads.columns if col != 'dateOfBirth'})
+    return squads
+
+
+def finish_features(df_scouting, squads):
+    """Merge the squad table into match rows (squad players without a match get a row of
+    their own) and add the per-90 and percentage columns. All but the merge are row-wise."""
+    df_scouting = df_scouting.merge(squads,how='outer')
+    df_scouting = df_scouting.drop_duplicates(subset=['playerName', 'team_name', 'player_position', 'player_positionSide', 'label'])
+    df_scouting['post_shot_xg_per90'] = (df_scouting['post shot xg'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['xg_per90'] = (df_scouting['xg'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['xA_per90'] = (df_scouting['xA'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['Pv_added_stoppere'] = df_scouting['possessionValue.pvValue'].astype(float).loc[df_scouting['possessionValue.pvValue'].astype(float) < 0.1]
+    df_scouting['Pv_added_stoppere_per90'] = (df_scouting['Pv_added_stoppere'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['possessionValue.pvValue_per90'] = (df_scouting['possessionValue.pvValue'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['possessionValue.pvAdded_per90'] = (df_scouting['possessionValue.pvAdded'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['Possession value total per_90'] = df_scouting['possessionValue.pvAdded_per90'] + df_scouting['possessionValue.pvValue_per90']
+    df_scouting['penAreaEntries_per90&crosses%shotassists'] = ((df_scouting['penAreaEntries'].astype(float)+df_scouting['totalCrossNocorner'].astype(float) + df_scouting['attAssistOpenplay'].astype(float))/ df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['penAreaEntries_per90'] = (df_scouting['penAreaEntries'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90    
+    df_scouting['attAssistOpenplay_per90'] = (df_scouting['attAssistOpenplay'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['totalCrossNocorner_per90'] = (df_scouting['totalCrossNocorner'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['finalThird passes %'] = (df_scouting['successfulFinalThirdPasses'].astype(float) / df_scouting['totalFinalThirdPasses'].astype(float)) * 100
+    df_scouting['finalThirdEntries_per90'] = (df_scouting['finalThirdEntries'].astype(float) / df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['interception_per90'] = (df_scouting['interception'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['possWonDef3rd_possWonMid3rd'] = (df_scouting['possWonDef3rd'].astype(float) + df_scouting['possWonMid3rd'].astype(float))
+    df_scouting['possWonDef3rd_possWonMid3rd_per90'] =  (df_scouting['possWonDef3rd_possWonMid3rd'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['possWonDef3rd_possWonMid3rd_possWonAtt3rd'] = (df_scouting['possWonDef3rd'].astype(float) + df_scouting['possWonMid3rd'].astype(float) + df_scouting['possWonAtt3rd'].astype(float))
+    df_scouting['possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90'] =  (df_scouting['possWonDef3rd_possWonMid3rd_possWonAtt3rd'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['possWonDef3rd_possWonMid3rd_per90&interceptions_per90'] = ((df_scouting['interception_per90'].astype(float) + df_scouting['possWonDef3rd_possWonMid3rd_per90'].astype(float))/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['duels won %'] = (df_scouting['duelWon'].astype(float) / (df_scouting['duelWon'].astype(float) + df_scouting['duelLost'].astype(float)))*100
+    df_scouting['Forward zone pass %'] = (df_scouting['accurateFwdZonePass'].astype(float) / df_scouting['totalFwdZonePass'].astype(float)) * 100
+    df_scouting['Forward zone pass_per90'] = (df_scouting['accurateFwdZonePass'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['Back zone pass %'] = (df_scouting['accurateBackZonePass'].astype(float) / df_scouting['totalBackZonePass'].astype(float)) * 100
+    df_scouting['Back zone pass_per90'] = (df_scouting['accurateBackZonePass'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['Passing %'] = (df_scouting['successfulOpenPlayPass'].astype(float) / df_scouting['openPlayPass'].astype(float)) * 100
+    df_scouting['Passes_per90'] = (df_scouting['successfulOpenPlayPass'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['Duels_per90'] = (df_scouting['duelWon'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['Aerial duel %'] = (df_scouting['aerialWon'].astype(float) / (df_scouting['aerialWon'].astype(float) + df_scouting['aerialLost'].astype(float))) * 100
+    df_scouting['Ballrecovery_per90'] = (df_scouting['ballRecovery'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['fwdPass_per90'] = (df_scouting['fwdPass'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['fwdPass_share'] = (df_scouting['fwdPass'].astype(float)/df_scouting['openPlayPass'].astype(float)) * 100
+    df_scouting['finalthirdpass_per90'] = (df_scouting['successfulFinalThirdPasses'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['shotFastbreak_per90'] = (df_scouting['shotFastbreak'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['bigChanceCreated_per90'] = (df_scouting['bigChanceCreated'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['dribble %'] = (df_scouting['wonContest'].astype(float) / df_scouting['totalContest'].astype(float)) * 100
+    df_scouting['dribble_per90'] = (df_scouting['wonContest'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['touches_in_box_per90'] = (df_scouting['touchesInOppBox'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['totalThroughBall_per90'] = (df_scouting['totalThroughBall'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['attemptsIbox_per90'] = (df_scouting['attemptsIbox'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['aerialWon_per90'] = (df_scouting['aerialWon'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['possLost_per90'] = (df_scouting['possLostAll'].astype(float)/df_scouting['minsPlayed'].astype(float)) * 90
+    df_scouting['Goals saved'] = (df_scouting['opponents_post_shot_xg'].astype(float) - df_scouting['opponents_goals'].astype(float))
+    df_scouting = df_scouting.fillna({col: 0 for col in df_scouting.columns if col != 'dateOfBirth'})
+    return df_scouting
+
+
+def prepare_features(df_possession_xa, df_pv, df_matchstats, df_xg, squads):
+    """Join the raw files of one league and add the derived metric columns."""
+    df_scouting = match_features(df_possession_xa, df_pv, df_matchstats, df_xg)
+    return finish_features(df_scouting, squad_table(squads))
+
+
+def add_age(df_scouting):
+    """Add ``age_today`` (whole years) next to ``dateOfBirth``; 0 when unknown."""
+    today = datetime.today()
+    age_today = ((today - df_scouting['dateOfBirth']).dt.days / 365.25).apply(np.floor).fillna(0)
+    df_scouting = df_scouting.copy()
+    df_scouting.insert(df_scouting.columns.get_loc('dateOfBirth') + 1, 'age_today', age_today)
+    return df_scouting
+
+
+# ---------------------------------------------------------------------------
+# Persisted tables
+# ---------------------------------------------------------------------------
+def entries_key(league, entries):
+    """Hash of the given store entries of the league's source files, or None when
+    one of the files on disk has no entry."""
+    digest = hashlib.sha1(f'features v{FEATURES_VERSION}'.encode())
+    for file_type in FEATURE_FILE_TYPES:
+        if not source_path(league, file_type).exists():
+            digest.update(f'{file_type}:missing;'.encode())
+            continue
+        entry = entries.get(file_type)
+        if entry is None:
+            return None
+        digest.update(f"{file_type}:{entry['sha1']};".encode())
+    return digest.hexdigest()
+
+
+def source_key(league):
+    """Hash of the league's source files, or None when one of them is not in the
+    store yet (or the league folder is not on disk at all)."""
+    if not (REPO_DIR / league).is_dir():
+        return None
+    entries = load_manifest()['leagues'].get(league, {})
+    for file_type in FEATURE_FILE_TYPES:
+        source = source_path(league, file_type)
+        if source.exists() and not is_fresh(entries.get(file_type), source):
+            return None
+    return entries_key(league, entries)
+
+
+def _to_parquet_frame(df):
+    # fillna(0) leaves text columns holding both str and 0, which Arrow cannot
+    # store; the 0s go out as nulls and load_features puts them back.
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].map(lambda v: isinstance(v, str)), None)
+    return df
+
+
+def _save_features(league, df_scouting, key):
+    target = features_path(league)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_target = target.with_suffix('.parquet.tmp')
+        _to_parquet_frame(df_scouting).to_parquet(tmp_target, index=False)
+        os.replace(tmp_target, target)
+    except OSError:
+        return
+
+    with _manifest_lock:
+        manifest = load_manifest()
+        manifest.setdefault('features', {})[league] = {
+            'key': key,
+            'path': str(target.relative_to(REPO_DIR)),
+            'rows': len(df_scouting),
+        }
+        try:
+            _write_manifest(manifest)
+        except OSError:
+            pass
+
+
+def build_features(league):
+    """Prepare one league from its raw files and persist the table when possible."""
+    df_scouting = prepare_features(*read_league_inputs(league))
+    key = source_key(league)
+    if key is not None:
+        _save_features(league, df_scouting, key)
+    return df_scouting
+
+
+# Identify a match row of the features table; with the occurrence number this is its matchstats row
+ROW_ID_COLUMNS = ['match_id', 'playerId', 'playerName', 'team_name', 'contestantId', 'player_position', 'player_positionSide']
+
+
+def _row_ids(df):
+    ids = df[ROW_ID_COLUMNS].fillna(0).astype(str)
+    return pd.MultiIndex.from_frame(ids.assign(occurrence=ids.groupby(ROW_ID_COLUMNS).cumcount()))
+
+
+def source_positions(df_matchstats, df_pv):
+    """Row ids of the first join of match_features over whole files, in order. The
+    position of a row is its 'index' in the table a full build gives."""
+    rows = df_matchstats.rename(columns={'player_matchName': 'playerName', 'player_playerId': 'playerId'})
+    # The pv groups of match_features: sorted, without missing keys
+    pv_keys = df_pv[['playerName', 'label', 'team_name']].dropna().drop_duplicates().sort_values(
+        ['playerName', 'label', 'team_name'])
+    return _row_ids(rows.merge(pv_keys))
+
+
+def update_features(league, match_ids=(), labels=()):
+    """Re-prepare only some matches of a stored table and persist the result.
+
+    ``match_ids`` are new or changed matches; ``labels`` are match labels
+    whose pv or xA rows changed. Every match sharing one of those labels is
+    prepared again too, since pv and xA are joined on the label. The stored
+    rows of those matches are replaced and the squad-only rows are redone for
+    players who now have a match. Every match row gets the 'index' of its
+    source row in a full build, which also orders the rows as a full build
+    does. The table must have been current before the match files changed and
+    the squads file must be unchanged (ingest checks both); the result is then
+    the table a full build would give. When a row cannot be placed, the league
+    is built from scratch instead.
+    """
+    stored = pd.read_parquet(features_path(league))
+    df_possession_xa, df_pv, df_matchstats, df_xg, squads = read_league_inputs(league)
+    positions = source_positions(df_matchstats, df_pv)
+
+    labels = set(labels) | set(df_matchstats.loc[df_matchstats['match_id'].isin(set(match_ids)), 'label'])
+    df_matchstats = df_matchstats[df_matchstats['label'].isin(labels)]
+    match_ids = set(df_matchstats['match_id'])
+
+    kept = stored[stored['match_id'].notna() & ~stored['match_id'].isin(match_ids)]
+    kept = kept.fillna({col: 0 for col in kept.columns if col != 'dateOfBirth'})
+    df_matches = match_features(
+        df_possession_xa[df_possession_xa['label'].isin(labels)],
+        df_pv[df_pv['label'].isin(labels)],
+        df_matchstats,
+        df_xg[df_xg['match_id'].isin(match_ids)],
+    )
+
+    squads = squad_table(squads)
+    new_rows = finish_features(df_matches, squads)
+    # Kept rows are in their old order and new rows in file order, so occurrences count alike
+    match_rows = pd.concat([
+        kept.sort_values('index', kind='stable'),
+        new_rows[new_rows['match_id'] != 0].sort_values('index', kind='stable'),
+    ], ignore_index=True)
+    index = positions.get_indexer(_row_ids(match_rows))
+    if (index < 0).any():
+        return build_features(league)
+    match_rows['index'] = index
+    match_rows = match_rows.sort_values('index', kind='stable')
+
+    merge_keys = [col for col in df_matches.columns if col in squads.columns]
+    played = pd.MultiIndex.from_frame(match_rows[merge_keys])
+    unmatched = squads[~pd.MultiIndex.from_frame(squads[merge_keys]).isin(played)]
+    squad_rows = finish_features(df_matches.iloc[:0], unmatched)
+
+    # A full build gets its row order from the outer squads merge, which sorts on the merge keys
+    df_scouting = pd.concat([match_rows, squad_rows], ignore_index=True)
+    df_scouting = df_scouting.sort_values(
+        merge_keys, kind='stable', key=lambda col: col.astype(str)
+    ).reset_index(drop=True)
+
+    key = source_key(league)
+    if key is not None:
+        _save_features(league, df_scouting, key)
+    return df_scouting
+
+
+def load_features(league):
+    """Derived-feature table of one league, from disk when its sources are unchanged."""
+    key = source_key(league)
+    entry = load_manifest().get('features', {}).get(league)
+    if key is not None and entry and entry['key'] == key and (REPO_DIR / entry['path']).exists():
+        df_scouting = pd.read_parquet(REPO_DIR / entry['path'])
+        df_scouting = df_scouting.fillna({col: 0 for col in df_scouting.columns if col != 'dateOfBirth'})
+    else:
+        df_scouting = build_features(league)
+    return add_age(df_scouting)
+
+
+def build_all(leagues=None):
+    """Build every missing or stale feature table of ``leagues`` (default: all local leagues)."""
+    leagues = leagues or local_leagues()
+    manifest = load_manifest()
+    built = 0
+    for league in leagues:
+        key = source_key(league)
+        entry = manifest.get('features', {}).get(league)
+        if key is not None and entry and entry['key'] == key:
+            continue
+        try:
+            build_features(league)
+        except Exception as e:
+            print(f"skipped {league}: {e}")
+            continue
+        built += 1
+        print(f"built features for {league}")
+    return built
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the per-league derived-feature tables.')
+    parser.add_argument('leagues', nargs='*', help='league folders to build (default: all)')
+    args = parser.parse_args()
+    count = build_all(args.leagues or None)
+    print(f"{count} feature table(s) built in {STORE_DIR}")
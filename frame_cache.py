@@ -0,0 +1,61 @@
+"""Small in-process LRU cache for prepared DataFrames.
+
+``st.cache_data`` pickles a copy of the value on every hit and can only be
+bounded by entry count, which is costly for the combined Scouting frame of
+many leagues. ``FrameCache`` hands out the cached frame itself (callers must
+not modify it) and evicts the least recently used entries once either the
+entry count or the total memory of the cached frames goes over its limit.
+The memory limit defaults to ``SCOUTING_CACHE_MB`` (2048 when unset).
+"""
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 4
+DEFAULT_MAX_BYTES = int(os.environ.get('SCOUTING_CACHE_MB', 2048)) * 1024 * 1024
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class FrameCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(size for _, size in self._entries.values())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        """Cached frame for ``key`` (marked as most recently used), or None."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, df):
+        """Cache ``df`` under ``key``; a frame larger than the memory limit is not kept."""
+        size = frame_nbytes(df)
+        with self._lock:
+            self._entries.pop(key, None)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (df, size)
+            total = sum(s for _, s in self._entries.values())
+            while len(self._entries) > self.max_entries or total > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                total -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
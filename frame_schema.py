@@ -0,0 +1,105 @@
+"""Compact dtypes for the loaded league frames.
+
+pandas reads every text column as Python strings and every stat as float64.
+``compact_frame`` applies an explicit schema instead:
+
+- repeated text (names, teams, positions, labels, ids) becomes ``category``
+- counting stats become int16 (minsPlayed int32, it is summed over seasons)
+  when they have no gaps, and float32 otherwise, which still holds every
+  whole number a match sum can reach exactly
+- raw model values (xG, xA, possession value) become float32
+
+Derived ratio columns stay float64: they are ranked into deciles and float32
+would merge near-equal values. Groupbys on the category columns must pass
+``observed=True``, and frames are combined with ``concat_frames`` so the
+categories of different leagues are merged instead of falling back to object.
+"""
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = [
+    'playerName', 'player_matchName', 'playerId', 'player_playerId', 'team_name',
+    'contestantId', 'player_position', 'player_positionSide', 'player_subPosition',
+    'label', 'match_id', 'league_name', 'country', 'nationality',
+]
+
+COUNT_COLUMNS = {
+    'minsPlayed': 'int32',
+    **{col: 'int16' for col in [
+        'duelLost', 'aerialLost', 'successfulOpenPlayPass', 'totalContest', 'duelWon',
+        'penAreaEntries', 'accurateBackZonePass', 'possWonDef3rd', 'wonContest',
+        'accurateFwdZonePass', 'openPlayPass', 'totalBackZonePass', 'fwdPass',
+        'finalThirdEntries', 'ballRecovery', 'totalFwdZonePass', 'successfulFinalThirdPasses',
+        'totalFinalThirdPasses', 'attAssistOpenplay', 'aerialWon', 'totalAttAssist',
+        'possWonMid3rd', 'interception', 'totalCrossNocorner', 'interceptionWon',
+        'attOpenplay', 'touchesInOppBox', 'attemptsIbox', 'totalThroughBall',
+        'possWonAtt3rd', 'accurateCrossNocorner', 'bigChanceCreated', 'accurateThroughBall',
+        'totalLayoffs', 'accurateLayoffs', 'totalFastbreak', 'shotFastbreak', 'goals',
+        'possLostAll', 'totalLongBalls',
+    ]},
+}
+
+FLOAT32_COLUMNS = [
+    'xg', 'post shot xg', 'xA', 'possessionValue.pvValue', 'possessionValue.pvAdded',
+    'possessionValue', 'match_pv', 'team_pv', 'match_xg', 'team_xg',
+    'match_post_shot_xg', 'team_post_shot_xg', 'match_xA', 'team_xA',
+]
+
+
+def _compact_count(s, dtype):
+    if s.dtype.kind not in 'iuf':
+        return s
+    values = s.to_numpy(dtype=float)
+    info = np.iinfo(dtype)
+    if (not np.isnan(values).any() and np.array_equal(values, np.floor(values))
+            and (values.size == 0 or (values.min() >= info.min and values.max() <= info.max))):
+        return s.astype(dtype)
+    return s.astype('float32')
+
+
+def _text_fill(s):
+    # Squad-only rows carry a 0 fill in the text columns. Mixed str/int columns
+    # cannot be converted to Arrow (st.dataframe, IPC), and as categories not even
+    # when no row uses the 0, so the fill is stored as the string '0'
+    mixed = s.notna() & ~s.map(type).eq(str)
+    if mixed.any() and not mixed.all():
+        s = s.where(~mixed, s.astype(str))
+    return s
+
+
+def compact_frame(df):
+    """Return ``df`` with the compact schema applied to the columns it has."""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = _text_fill(df[col])
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    for col, dtype in COUNT_COLUMNS.items():
+        if col in df.columns:
+            df[col] = _compact_count(df[col], dtype)
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns and df[col].dtype.kind == 'f':
+            df[col] = df[col].astype('float32')
+    return df
+
+
+def concat_frames(frames):
+    """``pd.concat(frames, ignore_index=True)`` keeping category columns categorical.
+
+    Categories are merged (and sorted, as ``astype('category')`` does) before
+    concatenating, because pandas turns differing categoricals back into object.
+    """
+    frames = list(frames)
+    if len(frames) > 1:
+        category_columns = [
+            col for col in frames[0].columns
+            if all(col in f.columns and isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames)
+        ]
+        frames = [f.copy() for f in frames]
+        for col in category_columns:
+            values = pd.concat([pd.Series(f[col].cat.categories) for f in frames]).unique()
+            dtype = pd.CategoricalDtype(pd.Categorical(values).categories)
+            for f in frames:
+                f[col] = f[col].astype(dtype)
+    return pd.concat(frames, ignore_index=True)
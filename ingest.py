@@ -0,0 +1,210 @@
+"""Incremental ingestion of updated league files.
+
+The league CSVs of a running season are full dumps that are rewritten every
+time matches are added. ``ingest_league`` converts a changed file once and
+compares it with the copy in the store match by match (``match_id``; the pv
+and xA files only carry the match ``label``). When the file only gained
+matches, the new matches alone go through the tables built from it:
+
+- ``features`` (derived_features): the joins and match aggregates run on the
+  new matches only
+- ``team_matches``: the new team rows are appended
+- ``set_pieces``: the new shots are added to the team and player totals and
+  the pitch grids
+- ``league comparison data.csv`` (league_summary): the new match rows are
+  appended and the league rollup is redone from the match rows
+
+A match that changed or disappeared, a changed squads file, or a table that
+was not current before the update means that table is built from scratch as
+before. Either way each table ends up under the key a full build would give
+it, so the loaders cannot tell the difference.
+
+Run it after pulling new data::
+
+    python ingest.py [league ...]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+import derived_features
+import league_summary
+import set_pieces
+import team_matches
+from league_store import (
+    REPO_DIR, STORE_DIR, FILE_TYPES, convert_file, is_fresh, load_manifest, local_leagues, source_path,
+)
+
+# Column identifying the match of each row; files not listed (squads) are converted as a whole
+MATCH_KEYS = {
+    'matchstats_all': 'match_id',
+    'xg_all': 'match_id',
+    'set_pieces_all': 'match_id',
+    # pv and xA rows carry the match label but no match id
+    'pv_all': 'label',
+    'xA_all': 'label',
+}
+
+
+def match_hashes(df, key):
+    """One hash per match over its rows, independent of row order and of int/float storage."""
+    values = df.apply(lambda col: col.astype(float) if is_numeric_dtype(col) else col)
+    rows = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    codes, matches = pd.factorize(df[key])
+    hashes = np.zeros(len(matches), dtype=np.uint64)
+    np.add.at(hashes, codes, rows)
+    return pd.Series(hashes, index=matches)
+
+
+def new_match_rows(old, new, key):
+    """Rows of ``new`` for the matches ``old`` does not have.
+
+    None when the files cannot be compared that way: a match of ``old``
+    changed or is gone, the columns differ, or a row has no ``key``.
+    """
+    if list(old.columns) != list(new.columns) or old[key].isna().any() or new[key].isna().any():
+        return None
+    old_hashes = match_hashes(old, key)
+    seen = new[key].isin(old_hashes.index)
+    if not match_hashes(new[seen], key).reindex(old_hashes.index).equals(old_hashes):
+        return None
+    return new[~seen]
+
+
+def update_file(league, file_type):
+    """Bring one store file up to date.
+
+    Returns ``('fresh', None)`` when it already was, ``('appended', rows)``
+    with the rows of the matches the file gained, or ``('converted', None)``
+    when anything else about the file changed.
+    """
+    source = source_path(league, file_type)
+    entry = load_manifest()['leagues'].get(league, {}).get(file_type)
+    if is_fresh(entry, source):
+        return 'fresh', None
+    if file_type not in MATCH_KEYS or entry is None or not (REPO_DIR / entry['path']).exists():
+        convert_file(league, file_type)
+        # Rewritten with the same content (a new checkout, a copied dump)
+        if entry and load_manifest()['leagues'][league][file_type]['sha1'] == entry['sha1']:
+            return 'fresh', None
+        return 'converted', None
+
+    old = pd.read_parquet(REPO_DIR / entry['path'])
+    rows = new_match_rows(old, convert_file(league, file_type), MATCH_KEYS[file_type])
+    if rows is None:
+        return 'converted', None
+    return 'appended', rows
+
+
+def _current_tables(league, manifest):
+    """Which derived tables of ``league`` were built from the store files as they are now."""
+    entries = manifest['leagues'].get(league, {})
+    matchstats = entries.get('matchstats_all')
+    set_piece_file = entries.get('set_pieces_all')
+    features = manifest.get('features', {}).get(league)
+    teams = manifest.get('team_matches', {}).get(league)
+    shots = manifest.get('set_pieces', {}).get(league)
+    summary = manifest.get('summary', {}).get(league)
+    return {
+        'features': bool(
+            features and features['key'] == derived_features.entries_key(league, entries)
+            and derived_features.features_path(league).exists()
+        ),
+        'team_matches': bool(
+            matchstats and teams and teams['key'] == team_matches.entry_key(matchstats)
+            and team_matches.team_matches_path(league).exists()
+        ),
+        'set_pieces': bool(
+            set_piece_file and shots and shots['key'] == set_pieces.entry_key(set_piece_file)
+            and set_pieces.grid_path(league).exists()
+            and all(set_pieces.table_path(league, table).exists() for table in set_pieces.TABLES)
+        ),
+        'summary': bool(
+            matchstats and summary and summary['sha1'] == matchstats['sha1']
+            and summary.get('version') == league_summary.SUMMARY_VERSION
+        ),
+    }
+
+
+def _status(files, file_types, current):
+    """'fresh', 'appended' or 'rebuilt': what to do with a table built from ``file_types``."""
+    statuses = [files[file_type][0] for file_type in file_types if file_type in files]
+    if not current or 'converted' in statuses:
+        return 'rebuilt'
+    if 'appended' in statuses:
+        return 'appended'
+    return 'fresh'
+
+
+def ingest_league(league):
+    """Update the store files and derived tables of one league.
+
+    Returns ``{table: 'fresh' | 'appended' | 'rebuilt'}``.
+    """
+    current = _current_tables(league, load_manifest())
+    files = {
+        file_type: update_file(league, file_type)
+        for file_type in FILE_TYPES if source_path(league, file_type).exists()
+    }
+    new_rows = {file_type: rows for file_type, (_, rows) in files.items() if rows is not None}
+
+    report = {}
+    status = _status(files, derived_features.FEATURE_FILE_TYPES, current['features'])
+    if status == 'appended':
+        match_ids = set().union(*(new_rows[ft]['match_id'] for ft in ['matchstats_all', 'xg_all'] if ft in new_rows))
+        labels = set().union(*(new_rows[ft]['label'] for ft in ['pv_all', 'xA_all'] if ft in new_rows))
+        derived_features.update_features(league, match_ids, labels)
+    elif status == 'rebuilt':
+        derived_features.build_features(league)
+    report['features'] = status
+
+    if 'matchstats_all' in files:
+        status = _status(files, ['matchstats_all'], current['team_matches'])
+        if status == 'appended':
+            team_matches.append_team_matches(league, new_rows['matchstats_all'])
+        elif status == 'rebuilt':
+            team_matches.build_team_matches(league)
+        report['team_matches'] = status
+
+        status = _status(files, ['matchstats_all'], current['summary'])
+        if status == 'appended':
+            entry = load_manifest()['leagues'][league]['matchstats_all']
+            league_summary.append_matches(league, new_rows['matchstats_all'], entry['sha1'])
+        elif status == 'rebuilt':
+            league_summary.build_summary([league])
+        report['summary'] = status
+
+    if 'set_pieces_all' in files:
+        status = _status(files, ['set_pieces_all'], current['set_pieces'])
+        if status == 'appended':
+            set_pieces.add_set_pieces(league, new_rows['set_pieces_all'])
+        elif status == 'rebuilt':
+            set_pieces.build_set_pieces(league)
+        report['set_pieces'] = status
+
+    return report
+
+
+def ingest_all(leagues=None):
+    """Ingest every league of ``leagues`` (default: all local leagues); returns the reports of changed ones."""
+    reports = {}
+    for league in leagues or local_leagues():
+        try:
+            report = ingest_league(league)
+        except Exception as e:
+            print(f"skipped {league}: {e}")
+            continue
+        if any(status != 'fresh' for status in report.values()):
+            reports[league] = report
+            print(f"{league}: " + ', '.join(f"{table} {status}" for table, status in report.items()))
+    return reports
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bring the store and derived tables up to date, appending new matches.')
+    parser.add_argument('leagues', nargs='*', help='league folders to ingest (default: all)')
+    args = parser.parse_args()
+    reports = ingest_all(args.leagues or None)
+    print(f"{len(reports)} league(s) updated in {STORE_DIR}")
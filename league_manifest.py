@@ -0,0 +1,198 @@
+"""League listing shared by every view.
+
+``league_store/leagues.json`` describes the league folders found in the
+checkout (size, mtime, sha1 and row count of every league CSV) together with
+the folder list of the GitHub repository, which covers leagues that are not
+on disk. Views call ``league_names()``, which answers from that file (kept in
+memory between reruns) instead of calling the GitHub contents API. When the
+file is older than ``SCOUTING_MANIFEST_REFRESH`` seconds (900 when unset) a
+background thread rescans the folders and revalidates the GitHub listing with
+an ETag conditional request, so an unchanged repository costs one 304.
+
+Build or refresh the file ahead of time with::
+
+    python league_manifest.py [--remote]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+
+from league_store import FILE_TYPES, STORE_DIR, csv_name, local_leagues, source_path
+
+API_URL = "https://api.github.com/repos/AC-Horsens/AC-Horsens-scouting/contents"
+LEAGUES_PATH = STORE_DIR / 'leagues.json'
+LEAGUES_VERSION = 1
+REFRESH_SECONDS = int(os.environ.get('SCOUTING_MANIFEST_REFRESH', 900))
+# <country code>_<league>_<season>, e.g. DNK_Superliga_2025_2026 or SWE_Allsvenskan_2025;
+# the repository also has folders that are not leagues (benchmarks)
+LEAGUE_FOLDER = re.compile(r'[A-Z]{3}_\w+_\d{4}(_\d{4})?')
+
+_lock = threading.Lock()
+_state = {'manifest': None, 'refreshing': False}
+
+
+def _empty_manifest():
+    return {
+        'version': LEAGUES_VERSION,
+        'scanned_at': 0,
+        'local': {},
+        'remote': {'etag': None, 'leagues': [], 'checked_at': 0},
+    }
+
+
+def _read_manifest():
+    try:
+        with open(LEAGUES_PATH, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return _empty_manifest()
+    if manifest.get('version') != LEAGUES_VERSION:
+        return _empty_manifest()
+    return manifest
+
+
+def _write_manifest(manifest):
+    try:
+        STORE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = LEAGUES_PATH.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, LEAGUES_PATH)
+    except OSError:
+        pass
+
+
+def _scan_file(path):
+    """sha1 and data row count of a CSV in one pass."""
+    digest = hashlib.sha1()
+    newlines = 0
+    last = b''
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+            newlines += block.count(b'\n')
+            last = block
+    lines = newlines + (1 if last and not last.endswith(b'\n') else 0)
+    return digest.hexdigest(), max(lines - 1, 0)
+
+
+def scan_local(previous=None):
+    """Describe every league folder on disk, reusing entries of unchanged files."""
+    previous = previous or {}
+    local = {}
+    for league in local_leagues():
+        files = {}
+        for file_type in FILE_TYPES:
+            path = source_path(league, file_type)
+            if not path.exists():
+                continue
+            stat = path.stat()
+            old = previous.get(league, {}).get(file_type)
+            if old and old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns:
+                files[file_type] = old
+                continue
+            sha1, rows = _scan_file(path)
+            files[file_type] = {
+                'file': csv_name(league, file_type),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha1': sha1,
+                'rows': rows,
+            }
+        local[league] = files
+    return local
+
+
+def refresh_remote(remote, token=None, timeout=10):
+    """Revalidate the GitHub folder list; returns the (possibly unchanged) remote entry."""
+    headers = {}
+    if remote.get('etag'):
+        headers['If-None-Match'] = remote['etag']
+    if token:
+        headers['Authorization'] = f"token {token}"
+    remote = dict(remote)
+    # Set on failures too, so an unreachable GitHub is retried after REFRESH_SECONDS, not every rerun
+    remote['checked_at'] = time.time()
+    try:
+        response = requests.get(API_URL, headers=headers, timeout=timeout)
+    except requests.RequestException:
+        return remote
+    if response.status_code == 304:
+        return remote
+    if response.status_code != 200:
+        return remote
+    try:
+        contents = response.json()
+    except ValueError:
+        return remote
+    if isinstance(contents, list):
+        remote['leagues'] = sorted(
+            item['name'] for item in contents
+            if item.get('type') == 'dir' and LEAGUE_FOLDER.fullmatch(item['name'])
+        )
+        remote['etag'] = response.headers.get('ETag')
+    return remote
+
+
+def build_league_manifest(remote=False, token=None):
+    """Rescan the league folders (and optionally GitHub) and write leagues.json."""
+    manifest = _read_manifest()
+    manifest['local'] = scan_local(manifest['local'])
+    manifest['scanned_at'] = time.time()
+    if remote:
+        manifest['remote'] = refresh_remote(manifest['remote'], token=token)
+    _write_manifest(manifest)
+    with _lock:
+        _state['manifest'] = manifest
+    return manifest
+
+
+def _refresh_in_background(token):
+    try:
+        build_league_manifest(remote=True, token=token)
+    finally:
+        with _lock:
+            _state['refreshing'] = False
+
+
+def league_manifest(token=None):
+    """The current manifest; starts a background refresh when it is stale."""
+    with _lock:
+        manifest = _state['manifest']
+    if manifest is None:
+        manifest = _read_manifest()
+        if not manifest['scanned_at']:
+            # First run in this checkout: the folder scan is needed before anything can be listed
+            manifest = build_league_manifest()
+        with _lock:
+            _state['manifest'] = manifest
+
+    stale = time.time() - min(manifest['scanned_at'], manifest['remote']['checked_at']) > REFRESH_SECONDS
+    with _lock:
+        if stale and not _state['refreshing']:
+            _state['refreshing'] = True
+            threading.Thread(target=_refresh_in_background, args=(token,),
+                             name='league-manifest-refresh', daemon=True).start()
+    return manifest
+
+
+def league_names(token=None):
+    """Sorted names of the leagues on disk and in the GitHub repository."""
+    manifest = league_manifest(token)
+    # Filtered here too, for lists written before the remote filter existed
+    remote = [name for name in manifest['remote']['leagues'] if LEAGUE_FOLDER.fullmatch(name)]
+    return sorted(set(manifest['local']) | set(remote))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write the league manifest (league_store/leagues.json).')
+    parser.add_argument('--remote', action='store_true', help='also revalidate the GitHub folder list')
+    args = parser.parse_args()
+    manifest = build_league_manifest(remote=args.remote, token=os.environ.get('GITHUB_TOKEN'))
+    print(f"{len(manifest['local'])} local league(s), {len(manifest['remote']['leagues'])} on GitHub -> {LEAGUES_PATH}")
@@ -0,0 +1,317 @@
+"""Local columnar store for the league folders.
+
+Every league folder ships the same set of CSVs. The first time one of them is
+needed it is parsed once and written to ``league_store/<league>/<file_type>.parquet``,
+and ``league_store/manifest.json`` records which source file (size, mtime, sha1)
+each Parquet file was built from. Later reads come straight from Parquet, a
+changed CSV is picked up and converted again, and GitHub is only used when the
+league folder is not on disk at all.
+
+Readers name the columns they use (``read_league_file(..., columns=...)``)
+and only those are read. Consumers that only need group sums use
+``sum_league_file``, which streams the file in chunks of ``CHUNK_ROWS`` rows
+(the Parquet row-group size) and keeps only the running sums.
+
+The league folders are read from the checkout, or from ``SCOUTING_DATA_DIR``
+when that is set (the store and the derived tables then live there too).
+
+Build or refresh the whole store ahead of time with::
+
+    python league_store.py [league ...]
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import urllib.parse
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the threads of one process are serialised
+    fcntl = None
+
+REPO_DIR = Path(os.environ.get('SCOUTING_DATA_DIR') or Path(__file__).resolve().parent)
+STORE_DIR = REPO_DIR / 'league_store'
+MANIFEST_PATH = STORE_DIR / 'manifest.json'
+MANIFEST_LOCK_PATH = STORE_DIR / 'manifest.lock'
+MANIFEST_VERSION = 1
+
+BASE_URL = "https://raw.githubusercontent.com/AC-Horsens/AC-Horsens-scouting/main/"
+
+FILE_TYPES = ['pv_all', 'xA_all', 'matchstats_all', 'xg_all', 'squads', 'set_pieces_all']
+
+# Text key columns are pinned to str so a league where a column happens to be
+# empty or all-numeric still merges against the other leagues.
+TEXT_COLUMNS = [
+    'player_matchName', 'player_playerId', 'playerName', 'playerId', 'matchName',
+    'team_name', 'contestantId', 'player_position', 'player_positionSide',
+    'label', 'date', 'match_id', 'league_name', 'country', 'dateOfBirth',
+]
+CSV_DTYPES = {col: str for col in TEXT_COLUMNS}
+
+# Rows per Parquet row group and per chunk of iter_league_file
+CHUNK_ROWS = 50_000
+
+
+class _ManifestLock:
+    """Context manager serialising manifest updates across threads and processes."""
+
+    def __init__(self):
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            try:
+                STORE_DIR.mkdir(parents=True, exist_ok=True)
+                self._file = open(MANIFEST_LOCK_PATH, 'a')
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except OSError:
+                # Read-only checkout: the manifest is not written either
+                self._close()
+        return self
+
+    def __exit__(self, *exc):
+        self._close()
+        self._thread_lock.release()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()  # releases the flock
+            self._file = None
+
+
+_manifest_lock = _ManifestLock()
+
+
+def csv_name(league, file_type):
+    return f"{file_type} {league}.csv"
+
+
+def source_path(league, file_type):
+    return REPO_DIR / league / csv_name(league, file_type)
+
+
+def remote_url(league, file_type):
+    return f"{BASE_URL}{league}/{urllib.parse.quote(csv_name(league, file_type))}"
+
+
+def store_path(league, file_type):
+    return STORE_DIR / league / f"{file_type}.parquet"
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'version': MANIFEST_VERSION, 'leagues': {}}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {'version': MANIFEST_VERSION, 'leagues': {}}
+    return manifest
+
+
+def _write_manifest(manifest):
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    # One tmp file per writer, so a writer never replaces the manifest with another's half-written file
+    tmp_path = MANIFEST_PATH.with_name(f'manifest.json.{os.getpid()}.{threading.get_ident()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_fresh(entry, source):
+    """True when a manifest entry was built from the current version of ``source``."""
+    if not entry:
+        return False
+    stat = source.stat()
+    return (
+        entry.get('size') == stat.st_size
+        and entry.get('mtime_ns') == stat.st_mtime_ns
+        and (REPO_DIR / entry['path']).exists()
+    )
+
+
+def convert_file(league, file_type):
+    """Parse one league CSV, write it to the store and return the frame."""
+    source = source_path(league, file_type)
+    stat = source.stat()
+    df = pd.read_csv(source, dtype=CSV_DTYPES, low_memory=False)
+
+    target = store_path(league, file_type)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_target = target.with_suffix('.parquet.tmp')
+        df.to_parquet(tmp_target, index=False, row_group_size=CHUNK_ROWS)
+        os.replace(tmp_target, target)
+    except OSError:
+        # Read-only checkout: serve the parsed CSV without caching it.
+        return df
+
+    entry = {
+        'source': str(source.relative_to(REPO_DIR)),
+        'path': str(target.relative_to(REPO_DIR)),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha1': _file_sha1(source),
+        'rows': len(df),
+        'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+    }
+    with _manifest_lock:
+        manifest = load_manifest()
+        manifest['leagues'].setdefault(league, {})[file_type] = entry
+        try:
+            _write_manifest(manifest)
+        except OSError:
+            pass
+    return df
+
+
+def _usecols(columns):
+    return None if columns is None else set(columns).__contains__
+
+
+def _fresh_entry(league, file_type):
+    """Manifest entry of an up-to-date store file, converting the CSV first when needed."""
+    source = source_path(league, file_type)
+    entry = load_manifest()['leagues'].get(league, {}).get(file_type)
+    if not is_fresh(entry, source):
+        convert_file(league, file_type)
+        entry = load_manifest()['leagues'].get(league, {}).get(file_type)
+    return entry if is_fresh(entry, source) else None
+
+
+def read_league_file(league, file_type, columns=None, dtype=None):
+    """Return one league file as a DataFrame, preferring the local store.
+
+    ``columns`` limits the read to those columns (the ones the file has, in
+    that order) and ``dtype`` maps columns to the dtype they are returned as.
+    Raises whatever ``pd.read_csv`` raises when the folder is not on disk and
+    the file cannot be fetched from GitHub either.
+    """
+    source = source_path(league, file_type)
+    if not source.exists():
+        return pd.read_csv(remote_url(league, file_type), dtype={**CSV_DTYPES, **(dtype or {})},
+                           usecols=_usecols(columns), low_memory=False)
+
+    entry = load_manifest()['leagues'].get(league, {}).get(file_type)
+    if is_fresh(entry, source):
+        if columns is not None:
+            columns = [col for col in columns if col in entry['dtypes']]
+        df = pd.read_parquet(REPO_DIR / entry['path'], columns=columns)
+    else:
+        df = convert_file(league, file_type)
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+    if dtype:
+        df = df.astype({col: dt for col, dt in dtype.items() if col in df.columns})
+    return df
+
+
+def numeric_columns(league, file_type):
+    """Numeric columns of a store file in file order, read from its schema only."""
+    import pyarrow.parquet as pq
+
+    entry = _fresh_entry(league, file_type)
+    if entry is None:
+        df = read_league_file(league, file_type)
+    else:
+        df = pq.read_schema(REPO_DIR / entry['path']).empty_table().to_pandas()
+    return [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+
+
+def iter_league_file(league, file_type, columns=None, chunk_rows=CHUNK_ROWS):
+    """Yield one league file as DataFrames of at most ``chunk_rows`` rows, reading only ``columns``."""
+    source = source_path(league, file_type)
+    if not source.exists():
+        yield from pd.read_csv(remote_url(league, file_type), dtype=CSV_DTYPES,
+                               usecols=_usecols(columns), chunksize=chunk_rows)
+        return
+
+    entry = _fresh_entry(league, file_type)
+    if entry is None:
+        # Read-only checkout: nothing to stream from
+        df = read_league_file(league, file_type, columns)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+        return
+    import pyarrow.parquet as pq
+
+    if columns is not None:
+        columns = [col for col in columns if col in entry['dtypes']]
+    parquet_file = pq.ParquetFile(REPO_DIR / entry['path'])
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def sum_league_file(league, file_type, keys, columns=None, notna=None, chunk_rows=CHUNK_ROWS):
+    """Group sums of one league file, computed a chunk at a time.
+
+    ``columns`` are summed per ``keys`` (default: every numeric column) over
+    the rows where ``notna`` has a value. Only those columns are read and only
+    the running sums are kept, so memory follows the number of groups rather
+    than the size of the file.
+    """
+    if columns is None and source_path(league, file_type).exists():
+        columns = [col for col in numeric_columns(league, file_type) if col not in keys]
+    read = None if columns is None else list(dict.fromkeys(keys + columns + ([notna] if notna else [])))
+
+    total = None
+    for chunk in iter_league_file(league, file_type, read, chunk_rows):
+        if notna is not None:
+            chunk = chunk[chunk[notna].notna()]
+        summed = chunk.groupby(keys, observed=True)[
+            columns if columns is not None else chunk.columns.difference(keys)
+        ].sum(numeric_only=True)
+        total = summed if total is None else pd.concat([total, summed]).groupby(level=keys).sum()
+    if total is None:
+        return pd.DataFrame(columns=keys + (columns or [])).set_index(keys)
+    return total
+
+
+def local_leagues():
+    """League folders present in the checkout, sorted by name."""
+    leagues = []
+    for path in sorted(REPO_DIR.iterdir()):
+        if path.is_dir() and any((path / csv_name(path.name, t)).exists() for t in FILE_TYPES):
+            leagues.append(path.name)
+    return leagues
+
+
+def build_store(leagues=None, file_types=FILE_TYPES):
+    """Convert every stale or missing file of ``leagues`` (default: all local leagues)."""
+    leagues = leagues or local_leagues()
+    manifest = load_manifest()
+    converted = 0
+    for league in leagues:
+        for file_type in file_types:
+            source = source_path(league, file_type)
+            if not source.exists():
+                continue
+            if is_fresh(manifest['leagues'].get(league, {}).get(file_type), source):
+                continue
+            convert_file(league, file_type)
+            converted += 1
+            print(f"converted {csv_name(league, file_type)}")
+    return converted
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert league CSVs to the local Parquet store.')
+    parser.add_argument('leagues', nargs='*', help='league folders to convert (default: all)')
+    args = parser.parse_args()
+    count = build_store(args.leagues or None)
+    print(f"{count} file(s) converted into {STORE_DIR}")
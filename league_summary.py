@@ -0,0 +1,167 @@
+"""Precomputed tables behind the League Comparison page.
+
+``league comparison data.csv`` holds one row per match: the player rows of a
+league's ``matchstats_all`` file summed per league, country, label and date.
+The ``schema`` column names the league folder each row came from. ``league
+comparison summary.csv`` rolls those rows up to one row per league, the
+average match. The page reads only the summary.
+
+The build is incremental. Each league folder's rows are replaced only when its
+matchstats file changed since the last build, going by the sha1 in
+league_store/leagues.json. The ``summary`` section of the store manifest
+records the sha1 each folder was built from. Leagues that are not on disk keep
+their rows until ``--remote`` fetches them from GitHub again. ``append_matches``
+adds the rows of new matches of one folder (see ingest).
+
+The rollup averages ``STAT_COLUMNS``: the count columns of matchstats but
+``minsPlayed``. That is the set the page summed when it loaded every league
+itself. ``formationUsed`` (formation codes such as '4231') and ``season``
+('2023_2024') are text in some league files, so in the combined frame they
+were never numeric, and a sum of formation codes would mean nothing anyway.
+The match table keeps the same columns (``MATCH_COLUMNS``), so rows of folders
+kept from the shipped snapshot, which also had pv columns, look like rebuilt
+ones.
+
+Build or refresh the tables with::
+
+    python league_summary.py [--remote] [league ...]
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from frame_schema import COUNT_COLUMNS
+from league_manifest import build_league_manifest
+from league_store import REPO_DIR, _manifest_lock, _write_manifest, load_manifest, sum_league_file
+
+MATCHES_PATH = REPO_DIR / 'league comparison data.csv'
+SUMMARY_PATH = REPO_DIR / 'league comparison summary.csv'
+
+# Bump when match_table or league_rollup changes so every folder is rebuilt
+SUMMARY_VERSION = 1
+
+KEY_COLUMNS = ['league_name', 'country', 'label', 'date']
+# minsPlayed sums to ~990 per team for every match and says nothing about a league
+STAT_COLUMNS = [col for col in COUNT_COLUMNS if col != 'minsPlayed']
+MATCH_COLUMNS = KEY_COLUMNS + ['minsPlayed'] + STAT_COLUMNS + ['schema']
+
+
+def match_table(df_matchstats, schema):
+    """Match-level sums of matchstats rows of one league folder."""
+    df = df_matchstats[df_matchstats['successfulOpenPlayPass'].notna()]
+    df = df.groupby(KEY_COLUMNS, observed=True).sum(numeric_only=True).astype(float).reset_index()
+    df['schema'] = schema
+    return df
+
+
+def league_match_table(league):
+    """match_table of one league's matchstats file, summed a chunk at a time."""
+    df = sum_league_file(league, 'matchstats_all', KEY_COLUMNS, notna='successfulOpenPlayPass')
+    df = df.astype(float).reset_index()
+    df['schema'] = league
+    return df
+
+
+def league_rollup(matches):
+    """One row per league and country: the average match, rounded to 2 decimals."""
+    stats = [col for col in matches.columns if col in STAT_COLUMNS]
+    df = matches.groupby(KEY_COLUMNS)[stats].sum().round(2)
+    return df.groupby(['league_name', 'country']).mean().round(2).reset_index()
+
+
+def read_matches():
+    if not MATCHES_PATH.exists():
+        return pd.DataFrame(columns=KEY_COLUMNS + ['schema'])
+    return pd.read_csv(MATCHES_PATH, dtype={col: str for col in KEY_COLUMNS + ['schema']})
+
+
+def read_summary():
+    """The league rollup read by the League Comparison page, or None before the first build."""
+    if not SUMMARY_PATH.exists():
+        return None
+    return pd.read_csv(SUMMARY_PATH, dtype={'league_name': str, 'country': str})
+
+
+def _write_csv(df, path):
+    tmp_path = path.with_name(path.name + '.tmp')
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def build_summary(leagues=None, remote=False, token=None):
+    """Rebuild the rows of every changed league and rewrite both tables.
+
+    Returns the list of leagues whose rows were replaced.
+    """
+    league_manifest = build_league_manifest(remote=remote, token=token)
+    local = league_manifest['local']
+    if leagues is None:
+        leagues = sorted(set(local) | (set(league_manifest['remote']['leagues']) if remote else set()))
+
+    built = load_manifest().get('summary', {})
+    matches = read_matches()
+    rebuilt = {}
+    for league in leagues:
+        entry = local.get(league, {}).get('matchstats_all')
+        if league in local and entry is None:
+            continue
+        sha1 = entry['sha1'] if entry else None
+        done = built.get(league, {})
+        if (sha1 is not None and done.get('sha1') == sha1 and done.get('version') == SUMMARY_VERSION
+                and (matches['schema'] == league).any()):
+            continue
+        try:
+            df = league_match_table(league)
+        except Exception as e:
+            print(f"skipped {league}: {e}")
+            continue
+        rebuilt[league] = (df, sha1)
+        print(f"summarised {league}: {len(df)} matches")
+
+    if not rebuilt and SUMMARY_PATH.exists():
+        return []
+
+    kept = matches[~matches['schema'].isin(rebuilt)]
+    matches = pd.concat([df for df, _ in rebuilt.values()] + [kept], ignore_index=True)
+    _write_tables(matches, {league: sha1 for league, (_, sha1) in rebuilt.items()})
+    return list(rebuilt)
+
+
+def append_matches(league, df_matchstats, sha1):
+    """Add the rows of new matches of one league folder and redo the rollup.
+
+    ``df_matchstats`` holds only the player rows of the new matches and
+    ``sha1`` is the matchstats file they now belong to.
+    """
+    matches = pd.concat([read_matches(), match_table(df_matchstats, league)], ignore_index=True)
+    _write_tables(matches, {league: sha1})
+    return matches
+
+
+def _write_tables(matches, built):
+    # built: {league folder: sha1 of the matchstats file its rows now come from}
+    matches = matches[[col for col in matches.columns if col in MATCH_COLUMNS]]
+    matches = matches.sort_values(['schema', 'date', 'label'], kind='stable').reset_index(drop=True)
+    _write_csv(matches, MATCHES_PATH)
+    _write_csv(league_rollup(matches), SUMMARY_PATH)
+
+    with _manifest_lock:
+        manifest = load_manifest()
+        summary = manifest.setdefault('summary', {})
+        for league, sha1 in built.items():
+            rows = int((matches['schema'] == league).sum())
+            summary[league] = {'sha1': sha1, 'version': SUMMARY_VERSION, 'rows': rows}
+        try:
+            _write_manifest(manifest)
+        except OSError:
+            pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the League Comparison tables.')
+    parser.add_argument('leagues', nargs='*', help='league folders to rebuild (default: all changed)')
+    parser.add_argument('--remote', action='store_true', help='also refetch leagues that are only on GitHub')
+    args = parser.parse_args()
+    rebuilt = build_summary(args.leagues or None, remote=args.remote, token=os.environ.get('GITHUB_TOKEN'))
+    print(f"{len(rebuilt)} league(s) rebuilt -> {MATCHES_PATH.name}, {SUMMARY_PATH.name}")
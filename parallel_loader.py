@@ -0,0 +1,56 @@
+"""Load several leagues at once on a bounded thread pool.
+
+League loads are dominated by disk and network reads, so threads overlap them
+well and the total wait is roughly the slowest league instead of the sum of
+all of them. The worker count defaults to ``SCOUTING_LOAD_WORKERS`` (8 when
+unset).
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_WORKERS = int(os.environ.get('SCOUTING_LOAD_WORKERS', 8))
+
+
+def _streamlit_ctx_initializer():
+    """Let worker threads use st.cache_data without missing-context warnings."""
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None
+    return lambda: add_script_run_ctx(threading.current_thread(), ctx)
+
+
+def load_in_parallel(leagues, load_fn, max_workers=None, on_progress=None):
+    """Run ``load_fn(league)`` for every league on a thread pool.
+
+    Returns ``(results, errors)``. ``results`` maps league -> return value in the
+    order of ``leagues`` and only holds the leagues that loaded; ``errors`` maps
+    league -> the exception its load raised, so one broken folder never takes
+    the others down. ``on_progress(done, total, league)`` is called from the
+    calling thread each time a league finishes.
+    """
+    leagues = list(dict.fromkeys(leagues))
+    if not leagues:
+        return {}, {}
+    workers = max(1, min(max_workers or DEFAULT_WORKERS, len(leagues)))
+
+    loaded = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='league-loader',
+                            initializer=_streamlit_ctx_initializer()) as pool:
+        futures = {pool.submit(load_fn, league): league for league in leagues}
+        for done, future in enumerate(as_completed(futures), start=1):
+            league = futures[future]
+            try:
+                loaded[league] = future.result()
+            except Exception as e:
+                errors[league] = e
+            if on_progress is not None:
+                on_progress(done, len(leagues), league)
+
+    results = {league: loaded[league] for league in leagues if league in loaded}
+    return results, errors
@@ -0,0 +1,64 @@
+"""Form of every player of a position profile.
+
+The performance chart of a profile shows one player's Total score game by
+game, its rolling mean over the last ``WINDOW`` games and the least-squares
+trend of that rolling mean (the line linregress fits against the game
+number). ``form_series`` computes the rolling means for all players of the
+profile in one grouped pass, and ``form_trends`` fits all their trend lines
+at once from grouped sums. The chart reads the selected player's rows from
+them, and ``form_leaderboard`` ranks the players by their trend ("in form").
+"""
+import pandas as pd
+
+WINDOW = 3
+
+
+def form_series(games, value='Total score', window=WINDOW):
+    """``games`` ordered by player and date, with ``game`` (0, 1, ... per player) and
+    ``rolling_avg``, the mean of ``value`` over the player's last ``window`` games."""
+    df = games.sort_values('date', kind='stable').sort_values('playerName', kind='stable')
+    grouped = df.groupby('playerName', observed=True, sort=False)
+    rolling = grouped[value].rolling(window, min_periods=1).mean().droplevel(0)
+    return df.assign(game=grouped.cumcount(), rolling_avg=rolling)
+
+
+def form_trends(series):
+    """Per player: ``slope`` and ``intercept`` of the rolling mean against the game number,
+    and ``games`` used in the fit; the slope is NaN with fewer than two games."""
+    df = series[series['rolling_avg'].notna()]
+    grouped = df.groupby('playerName', observed=True, sort=False)
+    x_mean = grouped['game'].transform('mean')
+    y_mean = grouped['rolling_avg'].transform('mean')
+    dx = df['game'] - x_mean
+    sums = pd.DataFrame({
+        'playerName': df['playerName'],
+        'sxx': dx * dx,
+        'sxy': dx * (df['rolling_avg'] - y_mean),
+    }).groupby('playerName', observed=True, sort=False).sum()
+    means = pd.DataFrame({'playerName': df['playerName'], 'x': x_mean, 'y': y_mean}).groupby(
+        'playerName', observed=True, sort=False).first()
+    games = grouped.size()
+    slope = (sums['sxy'] / sums['sxx']).where(games >= 2)
+    return pd.DataFrame({
+        'games': games,
+        'slope': slope,
+        'intercept': means['y'] - slope * means['x'],
+    })
+
+
+def form_leaderboard(series, trends, value='Total score', window=WINDOW, min_games=2 * WINDOW):
+    """One row per player with at least ``min_games`` games, steepest upward trend first.
+
+    Two or three games make for steep but meaningless trends, hence the minimum.
+    """
+    grouped = series.groupby('playerName', observed=True, sort=False)
+    last = grouped.tail(1).set_index('playerName')
+    board = pd.DataFrame({
+        'team_name': last['team_name'],
+        'Games': grouped.size(),
+        value: grouped[value].mean(),
+        f'Form (last {window})': last['rolling_avg'],
+        'Trend per game': trends['slope'],
+    })
+    board = board[board['Trend per game'].notna() & (board['Games'] >= min_games)]
+    return board.sort_values('Trend per game', ascending=False, kind='stable').reset_index()
@@ -0,0 +1,152 @@
+"""Similarity index behind Player comparison (ML).
+
+The page compares players on the standardised per-position feature vectors of
+the whole pool (all players over the minutes limit). ``load_index`` scales
+those vectors once and normalises them to unit length, so a cosine query is a
+single matrix-vector product. The result is keyed on a hash of the pool and
+the feature columns. It is kept in memory and written to
+``league_store/player_index/<key>.npz``, so it is reused across reruns,
+sessions and restarts. The age and league filters do not change the scaling,
+so ``nearest`` applies them as a mask on the query and never refits.
+
+The 2-D projections for the plots (``embedding``) are cached the same way,
+keyed on the plotted players and the method's parameters. t-SNE has no
+``transform``, so the page can instead embed the whole pool once
+(``pool_embedding``) and pick the rows of the filtered players.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from league_store import STORE_DIR
+from stage_profiler import mark_miss
+
+INDEX_DIR = STORE_DIR / 'player_index'
+INDEX_VERSION = 1
+# Perplexity for a whole-pool t-SNE; the per-plot one uses the number of players
+POOL_PERPLEXITY = 30
+MAX_MEMORY_ARRAYS = 16
+MAX_DISK_ARRAYS = 64
+
+_lock = threading.Lock()
+_memory = OrderedDict()
+
+
+def index_key(df_features, feature_cols):
+    """Hash of the pool (player, team, league and feature values) and the feature set."""
+    digest = hashlib.sha1(f"player index v{INDEX_VERSION};{'|'.join(feature_cols)}".encode())
+    columns = ['playerName', 'team_name', 'league_name'] + list(feature_cols)
+    digest.update(pd.util.hash_pandas_object(df_features[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def build_index(df_features, feature_cols):
+    """Unit-length standardised feature vectors, one row per row of ``df_features``."""
+    # sklearn is imported on first use so that importing this module stays cheap
+    from sklearn.preprocessing import StandardScaler
+
+    X_scaled = StandardScaler().fit_transform(df_features[feature_cols])
+    norms = np.linalg.norm(X_scaled, axis=1, keepdims=True)
+    # A player exactly at the pool mean has no direction; cosine distance 1 to everyone
+    return np.divide(X_scaled, norms, out=np.zeros_like(X_scaled), where=norms > 0)
+
+
+def _prune_disk():
+    files = sorted(INDEX_DIR.glob('*.npz'), key=lambda p: p.stat().st_mtime)
+    for path in files[:-MAX_DISK_ARRAYS]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _save(key, values):
+    try:
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = INDEX_DIR / f"{key}.tmp.npz"
+        np.savez(tmp_path, values=values)
+        os.replace(tmp_path, INDEX_DIR / f"{key}.npz")
+        _prune_disk()
+    except OSError:
+        pass
+
+
+def _cached(key, n_rows, build):
+    """Array stored under ``key``: from memory, from disk, or built and stored."""
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+
+    values = None
+    try:
+        with np.load(INDEX_DIR / f"{key}.npz") as data:
+            values = data['values']
+    except (OSError, KeyError, ValueError):
+        pass
+    if values is None or len(values) != n_rows:
+        mark_miss()
+        values = build()
+        _save(key, values)
+
+    with _lock:
+        _memory[key] = values
+        while len(_memory) > MAX_MEMORY_ARRAYS:
+            _memory.popitem(last=False)
+    return values
+
+
+def load_index(df_features, feature_cols):
+    """Unit vectors for ``df_features``, built at most once per pool."""
+    key = index_key(df_features, feature_cols)
+    return _cached(key, len(df_features), lambda: build_index(df_features, feature_cols))
+
+
+# ---------------------------------------------------------------------------
+# 2-D projections for the plots
+# ---------------------------------------------------------------------------
+def _project(df_features, feature_cols, method, perplexity):
+    from sklearn.decomposition import PCA
+    from sklearn.manifold import TSNE
+    from sklearn.preprocessing import StandardScaler
+
+    X_scaled = StandardScaler().fit_transform(df_features[feature_cols])
+    if method == 'pca':
+        return PCA(n_components=2).fit_transform(X_scaled)
+    tsne = TSNE(n_components=2, random_state=42, perplexity=perplexity, max_iter=2000)
+    return tsne.fit_transform(X_scaled)
+
+
+def embedding(df_features, feature_cols, method, perplexity=None):
+    """2-D coordinates ('pca' or 'tsne') of the rows of ``df_features``, computed once per set of rows."""
+    key = hashlib.sha1(f"{index_key(df_features, feature_cols)};{method};{perplexity}".encode()).hexdigest()
+    return _cached(key, len(df_features), lambda: _project(df_features, feature_cols, method, perplexity))
+
+
+def pool_embedding(df_features, feature_cols, method):
+    """Coordinates of the whole pool, so any filtered subset is a row lookup instead of a refit."""
+    perplexity = min(POOL_PERPLEXITY, len(df_features) - 1) if method == 'tsne' else None
+    return embedding(df_features, feature_cols, method, perplexity)
+
+
+def nearest(vectors, ref, candidates, k):
+    """The ``k`` candidates closest to row ``ref`` by cosine distance.
+
+    ``candidates`` is a boolean mask or an array of row positions. Returns the
+    row positions (closest first) and their distances. The search is exact:
+    one matrix-vector product over all candidates, then ``argpartition`` for
+    the ``k`` smallest distances.
+    """
+    candidates = np.flatnonzero(candidates) if np.asarray(candidates).dtype == bool else np.asarray(candidates)
+    distances = np.clip(1.0 - vectors[candidates] @ vectors[ref], 0.0, 2.0)
+    k = min(k, len(candidates))
+    if k < len(candidates):
+        top = np.argpartition(distances, k - 1)[:k]
+    else:
+        top = np.arange(len(candidates))
+    top = top[np.argsort(distances[top], kind='stable')]
+    return candidates[top], distances[top]
@@ -0,0 +1,540 @@
+"""Position profiles as data, plus the engine that scores them.
+
+A profile is a dict:
+
+- ``population``: key into ``POPULATIONS`` (which rows of df_scouting it covers)
+- ``metrics``: ``(column, score_column, 'high'|'low')`` decile scores
+- ``categories``: category -> score columns averaged into it (repeat a column to weigh it)
+- ``category_scores``: optional second decile pass over the categories
+- ``total_rules``: ``weighted_total`` rules for the Total score, or
+  ``total_columns``: columns averaged into the Total score
+- ``columns``: game-by-game output, ``group_keys``: keys of the 'Total' table
+- ``missing``: ``'dropna'``, ``'fill'`` (NaN -> 1) or None
+- ``sort``: game-by-game sort column (descending), ``round``: decimals or None
+- ``performance_title``: title for player_performance_profile, or None to skip it
+
+Profiles that share a population share the filtered frame and every metric
+decile through the ``cache`` dict passed to ``score_profile``, so the three
+centre-back profiles (or the three number 6 profiles) rank each column once.
+"""
+from scoring import decile_ranks, decile_scores, weighted_total
+
+POPULATIONS = {
+    'central_defender': lambda df: (
+        (df['player_position'] == 'Defender') &
+        (df['player_positionSide'].str.contains('Centre'))),
+    'fullback': lambda df: (
+        (df['player_position'] == 'Defender') &
+        (df['player_positionSide'].isin(['Right', 'Left']))),
+    'wingback': lambda df: (
+        ((df['formationUsed'].isin([532, 541])) &
+        (df['player_position'] == 'Defender') &
+        (df['player_positionSide'].isin(['Right', 'Left'])))
+        |
+        ((df['formationUsed'].isin([352, 343, 3421])) &
+        (df['player_position'] == 'Midfielder') &
+        (df['player_positionSide'].isin(['Right', 'Left'])))
+        |
+        (df['player_position'] == 'Wing Back') &
+        (df['player_positionSide'].isin(['Right', 'Left']))),
+    'central_midfielder': lambda df: (
+        ((df['player_position'] == 'Defensive Midfielder') | (df['player_position'] == 'Midfielder')) &
+        df['player_positionSide'].str.contains('Centre')),
+    'number8': lambda df: (
+        (df['player_position'] == 'Midfielder') &
+        df['player_positionSide'].str.contains('Centre')),
+    'number10': lambda df: (
+        (
+            (df['formationUsed'].isin([343, 3421, 541, 4231, 4321])) &
+            (df['player_position'].isin(['Attacking Midfielder', 'Striker'])) &
+            (df['player_positionSide'].isin(['Centre/Right', 'Left/Centre']))
+        )
+        |
+        (
+            (df['player_position'] == 'Attacking Midfielder') &
+            (df['player_positionSide'].isin(['Centre', 'Centre/Right', 'Left/Centre']))
+        )),
+    'winger': lambda df: (
+        ((df['formationUsed'].isin([442, 541, 451, 4141])) &
+        (df['player_position'] == 'Midfielder') &
+        (df['player_positionSide'].isin(['Right', 'Left'])))
+        |
+        ((df['formationUsed'].isin([433])) &
+        (df['player_position'] == 'Striker') &
+        (df['player_positionSide'].isin(['Left/Centre', 'Centre/Right'])))
+        |
+        (df['player_position'].isin(['Attacking Midfielder', 'Striker'])) &
+        (df['player_positionSide'].isin(['Right', 'Left']))),
+    'striker': lambda df: (
+        ((df['formationUsed'].isin([532, 442, 352, 3142, 3412])) &
+        (df['player_position'] == 'Striker') &
+        (df['player_positionSide'].str.contains('Centre')))
+        |
+        (df['player_position'] == 'Striker') &
+        (df['player_positionSide'] == 'Centre')),
+}
+
+# Name of the decile score column of each category
+_CATEGORY_RANKS = {
+    'Defending': 'Defending_',
+    'Passing': 'Passing_',
+    'Chance creation': 'Chance_creation',
+    'Progressive ball movement': 'Progressive_ball_movement',
+    'Possession value added': 'Possession_value_added',
+    'Possession value': 'Possession_value',
+    'Goalscoring': 'Goalscoring_',
+}
+
+
+def _category_scores(*categories):
+    return [(category, _CATEGORY_RANKS[category], 'high') for category in categories]
+
+
+# ---------------------------------------------------------------------------
+# Profiles
+# ---------------------------------------------------------------------------
+_BACK_METRICS = [
+    ('opponents_pv', 'opponents pv score', 'low'),
+    ('opponents_xg', 'opponents xg score', 'low'),
+    ('opponents_xA', 'opponents xA score', 'low'),
+    ('possessionValue.pvAdded_per90', 'Possession value added score', 'high'),
+    ('duels won %', 'duels won % score', 'high'),
+    ('Duels_per90', 'Duels per 90 score', 'high'),
+    ('Forward zone pass %', 'Forward zone pass % score', 'high'),
+    ('Forward zone pass_per90', 'Forward zone pass per 90 score', 'high'),
+    ('penAreaEntries_per90&crosses%shotassists', 'Penalty area entries & crosses & shot assists score', 'high'),
+    ('attAssistOpenplay_per90', 'attAssistOpenplay_per90 score', 'high'),
+    ('finalThird passes %', 'finalThird passes % score', 'high'),
+    ('finalThirdEntries_per90', 'finalThirdEntries_per90 score', 'high'),
+    ('interception_per90', 'interception_per90 score', 'high'),
+    ('possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'high'),
+    ('Back zone pass %', 'Back zone pass % score', 'high'),
+    ('Back zone pass_per90', 'Back zone pass_per90 score', 'high'),
+    ('totalCrossNocorner_per90', 'totalCrossNocorner_per90 score', 'high'),
+    ('xA_per90', 'xA per90 score', 'high'),
+    ('possLost_per90', 'possLost_per90 score', 'low'),
+]
+
+_BACK_CATEGORIES = {
+    'Defending': ['opponents pv score','opponents xg score','opponents xA score','duels won % score','Duels per 90 score','Duels per 90 score','duels won % score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score'],
+    'Passing': ['Forward zone pass % score','Forward zone pass per 90 score','finalThird passes % score','finalThirdEntries_per90 score','Back zone pass % score','Back zone pass_per90 score','Possession value added score','possLost_per90 score','possLost_per90 score'],
+    'Chance creation': ['Penalty area entries & crosses & shot assists score','totalCrossNocorner_per90 score','xA per90 score','xA per90 score','finalThirdEntries_per90 score','finalThirdEntries_per90 score','Forward zone pass % score','Forward zone pass per 90 score','Forward zone pass per 90 score','Forward zone pass % score','Possession value added score','Possession value added score'],
+    'Possession value added': ['Possession value added score','possLost_per90 score'],
+}
+
+_NUMBER6_METRICS = [
+    ('possessionValue.pvAdded_per90', 'Possession value added score', 'high'),
+    ('duels won %', 'duels won % score', 'high'),
+    ('Passing %', 'Passing % score', 'high'),
+    ('Back zone pass %', 'Back zone pass % score', 'high'),
+    ('finalThirdEntries_per90', 'finalThirdEntries_per90 score', 'high'),
+    ('possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'high'),
+    ('possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90', 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90 score', 'high'),
+    ('Forward zone pass %', 'Forward zone pass % score', 'high'),
+    ('Ballrecovery_per90', 'ballRecovery score', 'high'),
+]
+
+_NUMBER6_CATEGORIES = {
+    'Defending': ['duels won % score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','ballRecovery score'],
+    'Passing': ['Back zone pass % score','Passing % score'],
+    'Progressive ball movement': ['Possession value added score','Possession value added score','Forward zone pass % score'],
+    'Possession value added': ['Possession value added score'],
+}
+
+_NUMBER6_COLUMNS = ['playerName','team_name','player_position','label','date','minsPlayed','age_today','Defending_','Passing_','Progressive_ball_movement','Possession_value_added','Total score']
+
+_ATTACKING_METRICS = [
+    ('Possession value total per_90', 'Possession value total score', 'high'),
+    ('possessionValue.pvValue_per90', 'Possession value score', 'high'),
+    ('possessionValue.pvAdded_per90', 'Possession value added score', 'high'),
+    ('Passing %', 'Passing % score', 'high'),
+    ('Passes_per90', 'Passing score', 'high'),
+    ('finalThirdEntries_per90', 'finalThirdEntries_per90 score', 'high'),
+    ('Forward zone pass %', 'Forward zone pass % score', 'high'),
+    ('Forward zone pass_per90', 'Forward zone pass score', 'high'),
+    ('fwdPass_per90', 'fwd_Pass_per90 score', 'high'),
+    ('attAssistOpenplay_per90', 'attAssistOpenplay_per90 score', 'high'),
+    ('penAreaEntries_per90', 'penAreaEntries_per90 score', 'high'),
+    ('finalThird passes %', 'finalThird passes % score', 'high'),
+]
+
+PROFILES = {
+    'Ball playing central defender': {
+        'population': 'central_defender',
+        'metrics': [
+            ('possessionValue.pvAdded_per90', 'Possession value added score', 'high'),
+            ('duels won %', 'duels won % score', 'high'),
+            ('Forward zone pass %', 'Forward zone pass % score', 'high'),
+            ('Passing %', 'Open play passing % score', 'high'),
+            ('Back zone pass %', 'Back zone pass % score', 'high'),
+            ('possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'high'),
+            ('Ballrecovery_per90', 'Ballrecovery_per90 score', 'high'),
+        ],
+        'categories': {
+            'Passing': ['Open play passing % score', 'Back zone pass % score'],
+            'Forward passing': ['Forward zone pass % score', 'Possession value added score', 'Possession value added score'],
+            'Defending': ['duels won % score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'Ballrecovery_per90 score'],
+            'Possession value added': ['Possession value added score'],
+        },
+        'total_columns': ['Passing','Passing','Forward passing','Forward passing','Forward passing','Defending','Defending','Possession value added','Possession value added','Possession value added'],
+        'columns': ['playerName','team_name','player_position','label','date','minsPlayed','age_today','Passing','Forward passing','Defending','Possession value added score','Total score'],
+        'group_keys': ['playerName','team_name','player_position','age_today'],
+        'missing': None,
+        'sort': 'Total score',
+        'performance_title': None,
+    },
+    'Defending central defender': {
+        'population': 'central_defender',
+        'metrics': [
+            ('duels won %', 'duels won % score', 'high'),
+            ('possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'high'),
+            ('Ballrecovery_per90', 'ballRecovery score', 'high'),
+            ('Aerial duel %', 'Aerial duel score', 'high'),
+            ('possessionValue.pvAdded_per90', 'Possession value added score', 'high'),
+            ('Passing %', 'Open play passing % score', 'high'),
+            ('Back zone pass %', 'Back zone pass % score', 'high'),
+        ],
+        'categories': {
+            'Defending': ['duels won % score','Aerial duel score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'ballRecovery score'],
+            'Duels': ['duels won % score','duels won % score','Aerial duel score'],
+            'Intercepting': ['possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','ballRecovery score'],
+            'Passing': ['Open play passing % score', 'Back zone pass % score','Possession value added score','Possession value added score'],
+        },
+        'total_columns': ['Defending','Defending','Defending','Defending','Duels','Duels','Duels','Intercepting','Intercepting','Intercepting','Passing','Passing'],
+        'columns': ['playerName','team_name','player_position','label','minsPlayed','age_today','Defending','Duels','Intercepting','Passing','Total score'],
+        'group_keys': ['playerName','team_name','player_position','age_today'],
+        'missing': None,
+        'sort': 'Total score',
+        'performance_title': None,
+    },
+    'Balanced central defender': {
+        'population': 'central_defender',
+        'metrics': [
+            ('opponents_pv', 'opponents pv score', 'low'),
+            ('opponents_xg', 'opponents xg score', 'low'),
+            ('opponents_xA', 'opponents xA score', 'low'),
+            ('duels won %', 'duels won % score', 'high'),
+            ('Duels_per90', 'duelWon score', 'high'),
+            ('possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'high'),
+            ('Ballrecovery_per90', 'ballRecovery score', 'high'),
+            ('Aerial duel %', 'Aerial duel % score', 'high'),
+            ('aerialWon_per90', 'Aerial duel score', 'high'),
+            ('Pv_added_stoppere_per90', 'Possession value added score', 'high'),
+            ('Passing %', 'Open play passing % score', 'high'),
+            ('Passes_per90', 'Passing score', 'high'),
+            ('Back zone pass %', 'Back zone pass % score', 'high'),
+            ('Back zone pass_per90', 'Back zone pass score', 'high'),
+            ('Forward zone pass %', 'Forward zone pass % score', 'high'),
+            ('Forward zone pass_per90', 'Forward zone pass score', 'high'),
+            ('possLost_per90', 'possLost per90 score', 'low'),
+        ],
+        'categories': {
+            'Defending': ['duels won % score','duels won % score','duelWon score','opponents pv score','opponents xg score','opponents xA score','opponents pv score','opponents xg score','opponents xA score','Aerial duel % score','Aerial duel % score','Aerial duel score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'ballRecovery score'],
+            'Possession value added': ['Possession value added score','possLost per90 score'],
+            'Passing': ['Open play passing % score','Passing score', 'Back zone pass % score','Back zone pass score','Back zone pass % score','Back zone pass score','Back zone pass % score','Back zone pass score','possLost per90 score','possLost per90 score'],
+        },
+        'category_scores': _category_scores('Defending', 'Passing', 'Possession value added'),
+        'total_rules': [('Defending_', '<', 3, 7, 5), ('Passing_', '<', 3, 4, 3), ('Possession_value_added', '<', 3, 1, 1)],
+        'columns': ['playerName','team_name','player_position','label','date','minsPlayed','age_today','Defending_','Possession_value_added','Passing_','Total score'],
+        'group_keys': ['playerName','team_name','player_position','age_today'],
+        'missing': None,
+        'sort': 'date',
+        'performance_title': 'Central defender',
+    },
+    'Fullbacks': {
+        'population': 'fullback',
+        'metrics': _BACK_METRICS,
+        'categories': _BACK_CATEGORIES,
+        'category_scores': _category_scores('Defending', 'Passing', 'Chance creation', 'Possession value added'),
+        'total_rules': [('Defending_', '<', 3, 3, 3), ('Passing_', '<', 2, 3, 1), ('Chance_creation', '>', 3, 6, 2), ('Possession_value_added', '<', 3, 3, 2)],
+        'columns': ['playerName','team_name','player_position','player_positionSide','label','date','minsPlayed','age_today','Defending_','Passing_','Chance_creation','Possession_value_added','Total score'],
+        'group_keys': ['playerName','team_name','player_position','player_positionSide','age_today'],
+        'missing': 'dropna',
+        'sort': 'date',
+        'performance_title': 'Fullback',
+    },
+    'Wingbacks': {
+        'population': 'wingback',
+        'metrics': _BACK_METRICS,
+        'categories': _BACK_CATEGORIES,
+        'category_scores': _category_scores('Defending', 'Passing', 'Chance creation', 'Possession value added'),
+        'total_rules': [('Defending_', '<', 3, 3, 5), ('Passing_', '<', 2, 1, 1), ('Chance_creation', '>', 3, 6, 2), ('Possession_value_added', '<', 3, 3, 2)],
+        'columns': ['playerName','team_name','label','date','minsPlayed','age_today','Defending_','Passing_','Chance_creation','Possession_value_added','Total score'],
+        'group_keys': ['playerName','team_name','age_today'],
+        'missing': 'dropna',
+        'sort': 'date',
+        'performance_title': 'Fullback',
+    },
+    'Number 6': {
+        'population': 'central_midfielder',
+        'metrics': [
+            ('possessionValue.pvAdded_per90', 'Possession value added score', 'high'),
+            ('duels won %', 'duels won % score', 'high'),
+            ('Duels_per90', 'Duels per 90 score', 'high'),
+            ('Passing %', 'Passing % score', 'high'),
+            ('Passes_per90', 'Passing score', 'high'),
+            ('Back zone pass %', 'Back zone pass % score', 'high'),
+            ('Back zone pass_per90', 'Back zone pass_per90 score', 'high'),
+            ('finalThirdEntries_per90', 'finalThirdEntries_per90 score', 'high'),
+            ('possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'high'),
+            ('possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90', 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90 score', 'high'),
+            ('Forward zone pass %', 'Forward zone pass % score', 'high'),
+            ('Forward zone pass_per90', 'Forward zone pass_per90 score', 'high'),
+            ('Ballrecovery_per90', 'ballRecovery score', 'high'),
+            ('possLost_per90', 'possLost_per90 score', 'low'),
+        ],
+        'categories': {
+            'Defending': ['duels won % score','Duels per 90 score','Duels per 90 score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score','ballRecovery score'],
+            'Passing': ['Back zone pass % score','Back zone pass_per90 score','Passing % score','Passing score','possLost_per90 score','possLost_per90 score'],
+            'Progressive ball movement': ['Possession value added score','Possession value added score','Forward zone pass % score','Forward zone pass_per90 score','finalThirdEntries_per90 score'],
+            'Possession value added': ['Possession value added score','possLost_per90 score'],
+        },
+        'category_scores': _category_scores('Defending', 'Passing', 'Progressive ball movement', 'Possession value added'),
+        'total_rules': [('Defending_', '<', 5, 3, 5), ('Passing_', '<', 5, 3, 4), ('Progressive_ball_movement', '<', 5, 3, 2), ('Possession_value_added', '<', 5, 1, 1)],
+        'columns': _NUMBER6_COLUMNS,
+        'group_keys': ['playerName','team_name','player_position','age_today'],
+        'missing': 'dropna',
+        'sort': 'date',
+        'performance_title': 'Number 6',
+    },
+    'Number 6 (destroyer)': {
+        'population': 'central_midfielder',
+        'metrics': _NUMBER6_METRICS,
+        'categories': _NUMBER6_CATEGORIES,
+        'category_scores': _category_scores('Defending', 'Passing', 'Progressive ball movement', 'Possession value added'),
+        'total_columns': ['Defending_','Defending_','Defending_','Passing_','Passing_','Progressive_ball_movement','Possession_value_added'],
+        'columns': _NUMBER6_COLUMNS,
+        'group_keys': ['playerName','team_name','player_position','age_today'],
+        'missing': 'dropna',
+        'sort': 'Total score',
+        'performance_title': 'Number 6 (destroyer)',
+    },
+    'Number 6 (double 6 forward)': {
+        'population': 'central_midfielder',
+        'metrics': _NUMBER6_METRICS,
+        'categories': _NUMBER6_CATEGORIES,
+        'category_scores': _category_scores('Defending', 'Passing', 'Progressive ball movement', 'Possession value added'),
+        'total_columns': ['Defending_','Defending_','Passing_','Passing_','Progressive_ball_movement','Progressive_ball_movement','Possession_value_added','Possession_value_added'],
+        'columns': _NUMBER6_COLUMNS,
+        'group_keys': ['playerName','team_name','player_position','age_today'],
+        'missing': 'dropna',
+        'sort': 'Total score',
+        'performance_title': None,
+    },
+    'Number 8': {
+        'population': 'number8',
+        'metrics': [
+            ('Possession value total per_90', 'Possession value total score', 'high'),
+            ('possessionValue.pvValue_per90', 'Possession value score', 'high'),
+            ('possessionValue.pvAdded_per90', 'Possession value added score', 'high'),
+            ('duels won %', 'duels won % score', 'high'),
+            ('Duels_per90', 'Duels per 90 score', 'high'),
+            ('Passing %', 'Passing % score', 'high'),
+            ('Passes_per90', 'Passing score', 'high'),
+            ('Back zone pass %', 'Back zone pass % score', 'high'),
+            ('Back zone pass_per90', 'Back zone pass score', 'high'),
+            ('finalThirdEntries_per90', 'finalThirdEntries_per90 score', 'high'),
+            ('possWonDef3rd_possWonMid3rd_per90&interceptions_per90', 'possWonDef3rd_possWonMid3rd_per90&interceptions_per90 score', 'high'),
+            ('possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90', 'possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90 score', 'high'),
+            ('Forward zone pass %', 'Forward zone pass % score', 'high'),
+            ('Forward zone pass_per90', 'Forward zone pass score', 'high'),
+            ('fwdPass_per90', 'fwd_Pass_per90 score', 'high'),
+            ('attAssistOpenplay_per90', 'attAssistOpenplay_per90 score', 'high'),
+            ('penAreaEntries_per90', 'penAreaEntries_per90 score', 'high'),
+            ('possLost_per90', 'possLost_per90 score', 'low'),
+            ('xA_per90', 'xA_per90 score', 'high'),
+        ],
+        'categories': {
+            'Defending': ['duels won % score','Duels per 90 score','possWonDef3rd_possWonMid3rd_possWonAtt3rd_per90 score'],
+            'Passing': ['Forward zone pass % score','Forward zone pass score','Passing % score','Passing score','possLost_per90 score'],
+            'Progressive ball movement': ['xA_per90 score','fwd_Pass_per90 score','penAreaEntries_per90 score','Forward zone pass % score','Forward zone pass score','finalThirdEntries_per90 score','Possession value total score','possLost_per90 score'],
+            'Possession value': ['Possession value added score','Possession value total score','possLost_per90 score'],
+        },
+        'category_scores': _category_scores('Defending', 'Passing', 'Progressive ball movement', 'Possession value'),
+        'total_rules': [('Defending_', '>', 5, 5, 1), ('Passing_', '>', 5, 5, 1), ('Progressive_ball_movement', '<', 5, 1, 3), ('Possession_value', '<', 5, 1, 3)],
+        'columns': ['playerName','team_name','player_position','label','date','minsPlayed','age_today','Defending_','Passing_','Progressive_ball_movement','Possession_value','Total score'],
+        'group_keys': ['playerName','team_name','player_position','age_today'],
+        'missing': 'dropna',
+        'sort': 'date',
+        'performance_title': 'Number 8',
+    },
+    'Number 10': {
+        'population': 'number10',
+        'metrics': _ATTACKING_METRICS + [
+            ('finalthirdpass_per90', 'finalthirdpass per 90 score', 'high'),
+            ('dribble %', 'dribble % score', 'high'),
+            ('dribble_per90', 'dribble score', 'high'),
+            ('touches_in_box_per90', 'touches_in_box_per90 score', 'high'),
+            ('xA_per90', 'xA_per90 score', 'high'),
+            ('xg_per90', 'xg_per90 score', 'high'),
+            ('possLost_per90', 'possLost_per90 score', 'low'),
+            ('post_shot_xg_per90', 'post_shot_xg_per90 score', 'high'),
+        ],
+        'categories': {
+            'Passing': ['Forward zone pass % score','Forward zone pass score','Passing % score','Passing score'],
+            'Chance creation': ['attAssistOpenplay_per90 score','penAreaEntries_per90 score','Forward zone pass % score','Forward zone pass score','finalThird passes % score','finalthirdpass per 90 score','Possession value total score','Possession value score','dribble % score','touches_in_box_per90 score','xA_per90 score'],
+            'Goalscoring': ['xg_per90 score','xg_per90 score','xg_per90 score','post_shot_xg_per90 score','touches_in_box_per90 score'],
+            'Possession value': ['Possession value total score','Possession value total score','Possession value added score','Possession value score','possLost_per90 score'],
+        },
+        'category_scores': _category_scores('Passing', 'Chance creation', 'Goalscoring', 'Possession value'),
+        'total_rules': [('Passing_', '>', 5, 3, 1), ('Chance_creation', '>', 5, 5, 1), ('Goalscoring_', '>', 5, 5, 1), ('Possession_value', '<', 5, 3, 1)],
+        'columns': ['playerName','team_name','label','date','minsPlayed','age_today','Passing_','Chance_creation','Goalscoring_','Possession_value','Total score'],
+        'group_keys': ['playerName','team_name','age_today'],
+        'missing': 'fill',
+        'sort': 'date',
+        'performance_title': 'Number 10',
+    },
+    'Winger': {
+        'population': 'winger',
+        'metrics': _ATTACKING_METRICS + [
+            ('finalthirdpass_per90', 'finalthirdpass per 90 score', 'high'),
+            ('dribble %', 'dribble % score', 'high'),
+            ('dribble_per90', 'dribble score', 'high'),
+            ('touches_in_box_per90', 'touches_in_box_per90 score', 'high'),
+            ('xA_per90', 'xA_per90 score', 'high'),
+            ('attemptsIbox_per90', 'attemptsIbox_per90 score', 'high'),
+            ('xg_per90', 'xg_per90 score', 'high'),
+            ('post_shot_xg_per90', 'post_shot_xg_per90 score', 'high'),
+        ],
+        'categories': {
+            'Passing': ['Forward zone pass % score','Forward zone pass score','Passing % score','Passing score'],
+            'Chance creation': ['attAssistOpenplay_per90 score','penAreaEntries_per90 score','Forward zone pass % score','Forward zone pass score','finalThird passes % score','finalthirdpass per 90 score','Possession value total score','Possession value score','dribble % score','dribble score','touches_in_box_per90 score','xA_per90 score'],
+            'Goalscoring': ['xg_per90 score','xg_per90 score','xg_per90 score','touches_in_box_per90 score','post_shot_xg_per90 score'],
+            'Possession value': ['Possession value total score','Possession value total score','Possession value added score','Possession value score','Possession value score','Possession value score'],
+        },
+        'category_scores': _category_scores('Passing', 'Chance creation', 'Goalscoring', 'Possession value'),
+        'total_rules': [('Passing_', '>', 5, 3, 1), ('Chance_creation', '>', 5, 5, 1), ('Goalscoring_', '>', 5, 5, 1), ('Possession_value', '>', 5, 3, 1)],
+        'columns': ['playerName','team_name','label','date','minsPlayed','age_today','Passing_','Chance_creation','Goalscoring_','Possession_value','Total score'],
+        'group_keys': ['playerName','team_name','age_today'],
+        'missing': 'dropna',
+        'sort': 'Total score',
+        'performance_title': 'Winger',
+    },
+    'Classic striker': {
+        'population': 'striker',
+        'metrics': _ATTACKING_METRICS + [
+            ('finalthirdpass_per90', 'finalThird passes per90 score', 'high'),
+            ('shotFastbreak_per90', 'shotFastbreak_per90 score', 'high'),
+            ('dribble %', 'dribble % score', 'high'),
+            ('dribble_per90', 'dribble_per90 score', 'high'),
+            ('touches_in_box_per90', 'touches_in_box_per90 score', 'high'),
+            ('xA_per90', 'xA_per90 score', 'high'),
+            ('attemptsIbox_per90', 'attemptsIbox_per90 score', 'high'),
+            ('xg_per90', 'xg_per90 score', 'high'),
+            ('post_shot_xg_per90', 'post_shot_xg_per90 score', 'high'),
+        ],
+        'categories': {
+            'Linkup_play': ['Forward zone pass % score','Forward zone pass score','Passing % score','Passing score','Possession value score','penAreaEntries_per90 score','finalThirdEntries_per90 score'],
+            'Chance_creation': ['penAreaEntries_per90 score','Possession value total score','touches_in_box_per90 score','finalThirdEntries_per90 score'],
+            # Raw post-shot xG, not its score, as the striker profile always had it
+            'Goalscoring_': ['post_shot_xg_per90','xg_per90 score','xg_per90 score','xg_per90 score'],
+            'Possession_value': ['Possession value total score','Possession value score','Possession value score','Possession value score'],
+        },
+        'category_scores': [
+            ('Linkup_play', 'Linkup play', 'high'),
+            ('Chance_creation', 'Chance creation', 'high'),
+            ('Goalscoring_', 'Goalscoring', 'high'),
+            ('Possession_value', 'Possession value', 'high'),
+        ],
+        'total_rules': [('Linkup play', '>', 5, 3, 1), ('Chance creation', '>', 5, 3, 1), ('Goalscoring', '>', 5, 5, 2), ('Possession value', '<', 5, 3, 1)],
+        'columns': ['playerName','team_name','label','date','minsPlayed','age_today','Linkup play','Chance creation','Goalscoring','Possession value','Total score'],
+        'group_keys': ['playerName','team_name','age_today'],
+        'missing': 'fill',
+        'sort': 'date',
+        'round': 2,
+        'performance_title': 'Striker',
+    },
+}
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+def goalkeeper_table(df_scouting, min_minutes, min_age, min_total_minutes):
+    """Per-keeper totals of the Goalkeeper tab (minutes and goals saved summed, pass % averaged).
+
+    Unlike the profiles, the tab keeps keepers at or above the age input.
+    """
+    df = df_scouting[df_scouting['player_position'] == 'Goalkeeper']
+    df = df[['playerName', 'team_name', 'minsPlayed', 'age_today', 'Back zone pass %', 'Goals saved']].copy()
+    df['minsPlayed'] = df['minsPlayed'].astype(int)
+    df = df[df['minsPlayed'] >= min_minutes]
+    df = df[df['age_today'].astype(int) >= min_age]
+    df = df.groupby(['playerName', 'team_name', 'age_today'], observed=True).agg({
+        'minsPlayed': 'sum',
+        'Back zone pass %': 'mean',
+        'Goals saved': 'sum',
+    }).reset_index()
+    return df[df['minsPlayed'].astype(int) >= min_total_minutes]
+
+
+def population_frame(df_scouting, population, min_minutes, max_age):
+    """Rows of ``population`` that pass the per-match minutes and max age filters."""
+    df = df_scouting[POPULATIONS[population](df_scouting)].copy()
+    df['minsPlayed'] = df['minsPlayed'].astype(int)
+    df = df[df['minsPlayed'] >= min_minutes]
+    df = df[df['age_today'].astype(int) <= max_age]
+    return df.reset_index(drop=True)
+
+
+def _shared_population(df_scouting, population, min_minutes, max_age, cache):
+    key = (population, min_minutes, max_age)
+    if key not in cache:
+        cache[key] = {
+            'frame': population_frame(df_scouting, population, min_minutes, max_age),
+            'ranks': {},
+        }
+    return cache[key]
+
+
+def score_profile(df_scouting, profile, min_minutes, max_age, min_total_minutes, cache=None):
+    """Score one profile and return ``(games, totals)``.
+
+    ``games`` is the game-by-game table and ``totals`` the per-player table
+    (minutes summed, scores averaged) filtered on ``min_total_minutes``, both
+    sorted for display. Pass the same ``cache`` dict for every profile scored
+    on the same ``df_scouting`` to share populations and metric deciles.
+    """
+    if cache is None:
+        cache = {}
+    shared = _shared_population(df_scouting, profile['population'], min_minutes, max_age, cache)
+    df = shared['frame']
+
+    scores = {}
+    for column, score_column, direction in profile['metrics']:
+        if (column, direction) not in shared['ranks']:
+            shared['ranks'][(column, direction)] = decile_ranks(df[column].to_numpy(dtype=float), direction)
+        scores[score_column] = shared['ranks'][(column, direction)]
+    df = df.assign(**scores)
+
+    df = df.assign(**{category: df[columns].mean(axis=1)
+                      for category, columns in profile['categories'].items()})
+    if profile.get('category_scores'):
+        df = decile_scores(df, profile['category_scores'])
+
+    if 'total_rules' in profile:
+        df['Total score'] = weighted_total(df, profile['total_rules'])
+    else:
+        df['Total score'] = df[profile['total_columns']].mean(axis=1)
+
+    games = df[profile['columns']]
+    if profile['missing'] == 'dropna':
+        games = games.dropna()
+    elif profile['missing'] == 'fill':
+        # Text columns may be categorical and cannot take 1 as a value
+        games = games.fillna({col: 1 for col in games.columns if games[col].dtype.kind in 'iuf'})
+
+    keys = profile['group_keys']
+    values = [col for col in profile['columns'] if col not in keys + ['label', 'date', 'minsPlayed']]
+    totals = games[keys + ['minsPlayed'] + values].groupby(keys, observed=True).mean().reset_index()
+    minutter = games.groupby(keys, observed=True)['minsPlayed'].sum().astype(float).reset_index()
+    totals['minsPlayed total'] = minutter['minsPlayed']
+    totals = totals[keys + ['minsPlayed total'] + values]
+    totals = totals[totals['minsPlayed total'].astype(int) >= min_total_minutes]
+
+    games = games.sort_values(profile['sort'], ascending=False)
+    totals = totals.sort_values('Total score', ascending=False)
+    if profile.get('round') is not None:
+        games = games.round(profile['round'])
+        totals = totals.round(profile['round'])
+    return games, totals
@@ -0,0 +1,195 @@
+"""Score several position profiles at once on worker processes.
+
+Choosing several position profiles on the Scouting page used to score them
+one after the other on the script thread. ``score_profiles`` splits them into
+groups by population, because profiles of the same population share the
+filtered frame and the metric deciles (see position_profiles). The groups are
+scored concurrently on a process pool, and the script thread only renders.
+
+The frame is not pickled to the workers. The columns the profiles read are
+written once per frame to an Arrow IPC file (in ``/dev/shm`` when there is
+one), which every worker memory-maps and keeps until it gets another frame.
+The file is removed when the frame is garbage collected. Object columns that
+mix text and numbers (``formationUsed`` is a float in some leagues and text in
+others) are written as a number and a text column and put back together in
+the workers, so the profile filters see the same values as inline.
+
+The pool is started once with ``SCOUTING_PROFILE_WORKERS`` processes (the
+number of CPUs when unset) and gets one task per group. With one worker, or
+only one group, profiles are scored inline as before, and so they are when
+the frame cannot be shared or a worker dies.
+"""
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pandas as pd
+
+from position_profiles import PROFILES, score_profile
+
+DEFAULT_WORKERS = int(os.environ.get('SCOUTING_PROFILE_WORKERS', os.cpu_count() or 1))
+SHARED_DIR = Path('/dev/shm') if Path('/dev/shm').is_dir() else Path(tempfile.gettempdir())
+# Read by every population filter and by score_profile itself
+BASE_COLUMNS = ['player_position', 'player_positionSide', 'formationUsed', 'minsPlayed', 'age_today']
+MAX_WORKER_FRAMES = 2
+# Schema metadata listing the mixed text/number columns of a shared frame
+MIXED_KEY = b'scouting_mixed_columns'
+
+_lock = threading.Lock()
+_pool = None
+_pool_workers = 0
+# (id of the frame, columns) -> (weak reference to the frame, path of its IPC file)
+_shared = {}
+# In the workers: path -> frame read from it
+_frames = {}
+
+
+def _strings(spec):
+    if isinstance(spec, str):
+        yield spec
+    elif isinstance(spec, dict):
+        for value in spec.values():
+            yield from _strings(value)
+    elif isinstance(spec, (list, tuple)):
+        for value in spec:
+            yield from _strings(value)
+
+
+def profile_columns(df_scouting, names):
+    """Columns of ``df_scouting`` the profiles ``names`` read, in frame order."""
+    used = set(BASE_COLUMNS)
+    for name in names:
+        used.update(_strings(PROFILES[name]))
+    return [col for col in df_scouting.columns if col in used]
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _split_mixed(df):
+    # Arrow columns hold one type: a text/number column goes out as two
+    mixed = []
+    for col in df.columns[df.dtypes == object]:
+        is_text = df[col].map(type).eq(str)
+        if is_text.any() and not is_text.all():
+            mixed.append(col)
+    if not mixed:
+        return df, mixed
+    df = df.copy()
+    for col in mixed:
+        is_text = df[col].map(type).eq(str)
+        df[f'{col}:text'] = df[col].where(is_text, None)
+        df[col] = pd.to_numeric(df[col].where(~is_text), errors='raise')
+    return df, mixed
+
+
+def _join_mixed(df, mixed):
+    for col in mixed:
+        text = df.pop(f'{col}:text')
+        df[col] = df[col].astype(object).where(text.isna(), text)
+    return df
+
+
+def share_frame(df, columns):
+    """Path of an Arrow IPC file holding ``df[columns]``, written once per frame and column set."""
+    import pyarrow as pa
+
+    key = (id(df), tuple(columns))
+    with _lock:
+        if key in _shared:
+            ref, path = _shared[key]
+            if ref() is df and os.path.exists(path):
+                return path
+        path = str(SHARED_DIR / f'scouting-profiles-{os.getpid()}-{uuid.uuid4().hex}.arrow')
+        shared, mixed = _split_mixed(df[columns])
+        table = pa.Table.from_pandas(shared, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), MIXED_KEY: json.dumps(mixed).encode()})
+        with pa.OSFile(path + '.tmp', 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(path + '.tmp', path)
+        weakref.finalize(df, _remove, path)
+        weakref.finalize(df, _shared.pop, key, None)
+        _shared[key] = (weakref.ref(df), path)
+        return path
+
+
+def _read_shared(path):
+    import pyarrow as pa
+
+    if path not in _frames:
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        _frames[path] = _join_mixed(table.to_pandas(), json.loads(table.schema.metadata[MIXED_KEY]))
+        while len(_frames) > MAX_WORKER_FRAMES:
+            _frames.pop(next(iter(_frames)))
+    return _frames[path]
+
+
+def _score_group(path, names, filters):
+    # Runs in a worker: one population's profiles, sharing their deciles
+    df_scouting = _read_shared(path)
+    cache = {}
+    return {name: score_profile(df_scouting, PROFILES[name], *filters, cache) for name in names}
+
+
+def _get_pool(workers):
+    # Started once: a spawn pool takes seconds to come up, longer than scoring a few profiles inline
+    global _pool, _pool_workers
+    with _lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn: the app server is multi-threaded, so workers are not forked from it
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def score_profiles(df_scouting, names, min_minutes, max_age, min_total_minutes, cache=None, workers=None):
+    """``{name: (games, totals)}`` of ``score_profile`` for every profile in ``names``.
+
+    ``cache`` is used for the profiles scored inline, as with score_profile.
+    """
+    if cache is None:
+        cache = {}
+    filters = (min_minutes, max_age, min_total_minutes)
+    groups = {}
+    for name in dict.fromkeys(names):
+        groups.setdefault(PROFILES[name]['population'], []).append(name)
+    workers = workers or DEFAULT_WORKERS
+
+    if workers > 1 and len(groups) > 1:
+        import pyarrow as pa
+
+        try:
+            path = share_frame(df_scouting, profile_columns(df_scouting, names))
+            pool = _get_pool(workers)
+            futures = [pool.submit(_score_group, path, group, filters) for group in groups.values()]
+            results = {}
+            for future in futures:
+                results.update(future.result())
+            return {name: results[name] for name in dict.fromkeys(names)}
+        except (BrokenProcessPool, OSError, ValueError, pa.ArrowException):
+            # A worker died or the frame could not be shared: score inline instead
+            _reset_pool()
+
+    return {name: score_profile(df_scouting, PROFILES[name], *filters, cache) for name in dict.fromkeys(names)}
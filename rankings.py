@@ -0,0 +1,230 @@
+"""Position rankings of every league, computed ahead of time.
+
+The Scouting page scores the position profiles on whatever leagues a user
+confirms. ``build_all`` runs the same scoring (position_profiles) headless on
+each league's feature table, one league per worker process, with fixed
+filters (the page's defaults unless given). Each league gets:
+
+- ``league_store/<league>/rankings/<profile>_games.parquet``: the
+  game-by-game table, sorted as on the page
+- ``league_store/<league>/rankings/<profile>_totals.parquet``: the
+  per-player totals (the Goalkeeper tab only has these)
+
+and every profile gets a shortlist of the top ``SHORTLIST_SIZE`` players of
+each league by Total score (``league_store/rankings/<profile>_shortlist.parquet``,
+optionally also as CSV for spreadsheets). ``age_today`` is relative to the
+day of the build, so the tables are keyed on the league's features, the
+filters and that day. The page uses them when a single league is confirmed
+with the same filters (``load_rankings``). Run it nightly::
+
+    python rankings.py [league ...] [--workers N] [--min-minutes M] [--max-age A]
+                       [--min-total-minutes T] [--top N] [--csv DIR]
+"""
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import pandas as pd
+
+import derived_features
+from derived_features import load_features
+from derived_features import source_key as features_key
+from frame_schema import compact_frame
+from league_store import (
+    REPO_DIR, STORE_DIR, _manifest_lock, _write_manifest, build_store, load_manifest, local_leagues,
+)
+from position_profiles import PROFILES, goalkeeper_table, score_profile
+
+# Bump when the scoring changes so stored rankings are rebuilt
+RANKINGS_VERSION = 1
+SHORTLIST_SIZE = 25
+# The Scouting page's filter inputs before anyone touches them
+DEFAULT_FILTERS = {'min_minutes': 0, 'max_age': 25, 'min_total_minutes': 0}
+GOALKEEPER = 'Goalkeeper'
+RANKINGS = [GOALKEEPER] + list(PROFILES)
+
+
+def slug(name):
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def rankings_dir(league):
+    return STORE_DIR / league / 'rankings'
+
+
+def shortlist_path(name):
+    return STORE_DIR / 'rankings' / f'{slug(name)}_shortlist.parquet'
+
+
+def rankings_key(league, filters, day=None):
+    """Key of the rankings of ``league`` with ``filters`` on ``day`` (default today), or None
+    when its feature table is not current."""
+    key = features_key(league)
+    if key is None:
+        return None
+    filters = {name: float(value) for name, value in sorted(filters.items())}
+    return f"v{RANKINGS_VERSION}:{key}:{filters}:{(day or date.today()).isoformat()}"
+
+
+def rank_league(df_scouting, filters):
+    """``{name: (games, totals)}`` for every ranking of one league's frame; games is None for the keepers."""
+    min_minutes, max_age, min_total = filters['min_minutes'], filters['max_age'], filters['min_total_minutes']
+    tables = {GOALKEEPER: (None, goalkeeper_table(df_scouting, min_minutes, max_age, min_total))}
+    # The profiles share populations and metric deciles, so they are scored together
+    cache = {}
+    for name, profile in PROFILES.items():
+        tables[name] = score_profile(df_scouting, profile, min_minutes, max_age, min_total, cache)
+    return tables
+
+
+def _write_parquet(df, target):
+    tmp_target = target.with_suffix('.parquet.tmp')
+    df.to_parquet(tmp_target, index=False)
+    os.replace(tmp_target, target)
+
+
+def rank_and_write(league, filters):
+    """Score one league and write its tables; returns its manifest entry.
+
+    Runs in the worker processes. ``build_all`` brings the league's store files
+    and feature table up to date first, so here they are only read, and the
+    returned entry is recorded by the parent.
+    """
+    df_scouting = compact_frame(load_features(league))
+    key = rankings_key(league, filters)
+    target_dir = rankings_dir(league)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    tables = {}
+    for name, (games, totals) in rank_league(df_scouting, filters).items():
+        paths = {}
+        for kind, df in [('games', games), ('totals', totals)]:
+            if df is None:
+                continue
+            target = target_dir / f'{slug(name)}_{kind}.parquet'
+            _write_parquet(df, target)
+            paths[kind] = str(target.relative_to(REPO_DIR))
+        tables[name] = {**paths, 'rows': len(totals)}
+    return {'key': key, 'filters': filters, 'tables': tables}
+
+
+def _record(entries):
+    with _manifest_lock:
+        manifest = load_manifest()
+        manifest.setdefault('rankings', {}).update(entries)
+        try:
+            _write_manifest(manifest)
+        except OSError:
+            pass
+
+
+def build_rankings(league, filters=None):
+    """Score and store one league in this process; returns its manifest entry."""
+    entry = rank_and_write(league, {**DEFAULT_FILTERS, **(filters or {})})
+    if entry['key'] is not None:
+        _record({league: entry})
+    return entry
+
+
+def load_rankings(league, name, min_minutes, max_age, min_total_minutes):
+    """Stored ``(games, totals)`` of one ranking, or None unless built today from the
+    league's current features with the same filters."""
+    filters = {'min_minutes': min_minutes, 'max_age': max_age, 'min_total_minutes': min_total_minutes}
+    entry = load_manifest().get('rankings', {}).get(league)
+    if not entry or name not in entry['tables'] or entry['key'] != rankings_key(league, filters):
+        return None
+    paths = entry['tables'][name]
+    try:
+        games = pd.read_parquet(REPO_DIR / paths['games']) if 'games' in paths else None
+        return games, pd.read_parquet(REPO_DIR / paths['totals'])
+    except OSError:
+        return None
+
+
+def write_shortlists(leagues, top=SHORTLIST_SIZE, csv_dir=None):
+    """Top ``top`` players per league of every ranking, from the stored totals."""
+    entries = load_manifest().get('rankings', {})
+    for name in RANKINGS:
+        frames = []
+        for league in leagues:
+            paths = entries.get(league, {}).get('tables', {}).get(name)
+            if paths is None:
+                continue
+            totals = pd.read_parquet(REPO_DIR / paths['totals'])
+            if 'Total score' in totals.columns:
+                totals = totals.sort_values('Total score', ascending=False, kind='stable')
+            frames.append(totals.head(top).assign(league=league))
+        if not frames:
+            continue
+        shortlist = pd.concat(frames, ignore_index=True)
+        shortlist = shortlist[['league'] + [col for col in shortlist.columns if col != 'league']]
+        target = shortlist_path(name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _write_parquet(shortlist, target)
+        if csv_dir is not None:
+            os.makedirs(csv_dir, exist_ok=True)
+            shortlist.to_csv(os.path.join(csv_dir, f'{slug(name)}_shortlist.csv'), index=False)
+
+
+def build_all(leagues=None, filters=None, workers=None, top=SHORTLIST_SIZE, csv_dir=None):
+    """Rank every league of ``leagues`` (default: all local leagues) whose stored rankings are stale."""
+    leagues = leagues or local_leagues()
+    filters = {**DEFAULT_FILTERS, **(filters or {})}
+    manifest = load_manifest().get('rankings', {})
+    stale = []
+    for league in leagues:
+        entry = manifest.get(league)
+        key = rankings_key(league, filters)
+        if key is None or not entry or entry['key'] != key:
+            stale.append(league)
+
+    ready = []
+    if stale:
+        # Convert and build in this process, so the workers find everything current and write no manifest entries
+        build_store(stale)
+        derived_features.build_all(stale)
+        features = load_manifest().get('features', {})
+        for league in stale:
+            key = features_key(league)
+            if key is None:
+                print(f"skipped {league}: its source files are not all in the store")
+            elif features.get(league, {}).get('key') != key:
+                print(f"skipped {league}: no current feature table")
+            else:
+                ready.append(league)
+
+    built = {}
+    if ready:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(ready))) as pool:
+            futures = {pool.submit(rank_and_write, league, filters): league for league in ready}
+            for future in as_completed(futures):
+                league = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    print(f"skipped {league}: {e}")
+                    continue
+                if entry['key'] is None:
+                    print(f"skipped {league}: its source files changed while it was ranked")
+                    continue
+                built[league] = entry
+                print(f"ranked {league}")
+        _record(built)
+    write_shortlists(leagues, top, csv_dir)
+    return len(built)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Score every position profile of every league and store the tables.')
+    parser.add_argument('leagues', nargs='*', help='league folders to rank (default: all)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--min-minutes', type=float, default=DEFAULT_FILTERS['min_minutes'], help='minutes per match')
+    parser.add_argument('--max-age', type=float, default=DEFAULT_FILTERS['max_age'], help='max age (min age for keepers, as on the page)')
+    parser.add_argument('--min-total-minutes', type=float, default=DEFAULT_FILTERS['min_total_minutes'], help='minutes total')
+    parser.add_argument('--top', type=int, default=SHORTLIST_SIZE, help='shortlist size per league')
+    parser.add_argument('--csv', help='also write the shortlists as CSV to this directory')
+    args = parser.parse_args()
+    filters = {'min_minutes': args.min_minutes, 'max_age': args.max_age, 'min_total_minutes': args.min_total_minutes}
+    count = build_all(args.leagues or None, filters, args.workers, args.top, args.csv)
+    print(f"{count} league(s) ranked in {STORE_DIR}")
@@ -0,0 +1,67 @@
+"""Ratio features of aggregated team (or league) stats.
+
+Each entry of ``RATIO_FEATURES`` is one line: the columns summed for the
+numerator, the columns summed for the denominator, the scale (100 for a
+percentage) and the value used when the denominator is not positive.
+``add_ratio_features`` computes all of them in one pass over a matrix of the
+columns involved. It works on any frame with those columns, so the Team and
+League Comparison pages share the definitions.
+"""
+import numpy as np
+import pandas as pd
+
+RATIO_FEATURES = {
+    'duel_win_%': {'num': ['duelWon'], 'den': ['duelWon', 'duelLost']},
+    'pass_%': {'num': ['successfulOpenPlayPass'], 'den': ['openPlayPass']},
+    # Zone shares
+    'own_half_pass_share_%': {'num': ['totalBackZonePass'], 'den': ['openPlayPass']},
+    'opponent_half_pass_share_%': {'num': ['totalFwdZonePass'], 'den': ['openPlayPass']},
+    'final_third_pass_share_%': {'num': ['totalFinalThirdPasses'], 'den': ['openPlayPass']},
+    # Accuracy for hver zone
+    'back_zone_pass_accuracy_%': {'num': ['accurateBackZonePass'], 'den': ['totalBackZonePass']},
+    'fwd_zone_pass_accuracy_%': {'num': ['accurateFwdZonePass'], 'den': ['totalFwdZonePass']},
+    'final_third_pass_accuracy_%': {'num': ['successfulFinalThirdPasses'], 'den': ['totalFinalThirdPasses']},
+    'forward_pass_share_%': {'num': ['fwdPass'], 'den': ['openPlayPass']},
+    'cross_per_final_third_pass_%': {'num': ['totalCrossNocorner'], 'den': ['totalFinalThirdPasses']},
+    # Crosses pr. entries i final third
+    'cross_per_final_third_entry_%': {'num': ['totalCrossNocorner'], 'den': ['finalThirdEntries']},
+    # Andel af erobringer pr. tredjedel
+    'poss_won_def3rd_%': {'num': ['possWonDef3rd'], 'den': ['possWonDef3rd', 'possWonMid3rd', 'possWonAtt3rd']},
+    'poss_won_mid3rd_%': {'num': ['possWonMid3rd'], 'den': ['possWonDef3rd', 'possWonMid3rd', 'possWonAtt3rd']},
+    'poss_won_att3rd_%': {'num': ['possWonAtt3rd'], 'den': ['possWonDef3rd', 'possWonMid3rd', 'possWonAtt3rd']},
+    'long_pass_share_%': {'num': ['totalLongBalls'], 'den': ['openPlayPass']},
+}
+
+
+def _column_sums(values, positions):
+    # Terms are added left to right, as a + b + c on the columns would, and padded
+    # with a zero column so every feature is summed in the same vectorised steps
+    width = max(len(p) for p in positions)
+    padded = np.array([p + [values.shape[1] - 1] * (width - len(p)) for p in positions])
+    total = values[:, padded[:, 0]]
+    for term in range(1, width):
+        total = total + values[:, padded[:, term]]
+    return total
+
+
+def ratio_matrix(df, features=None):
+    """The ratio features of ``df`` as a DataFrame (same index), one column per feature."""
+    features = features or RATIO_FEATURES
+    columns = list(dict.fromkeys(col for spec in features.values() for col in spec['num'] + spec['den']))
+    position = {col: i for i, col in enumerate(columns)}
+    values = np.column_stack([df[columns].to_numpy(dtype=float), np.zeros(len(df))])
+
+    numerators = _column_sums(values, [[position[c] for c in spec['num']] for spec in features.values()])
+    denominators = _column_sums(values, [[position[c] for c in spec['den']] for spec in features.values()])
+    scale = np.array([spec.get('scale', 100) for spec in features.values()], dtype=float)
+    fill = np.array([spec.get('fill', 0) for spec in features.values()], dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(denominators > 0, scale * numerators / denominators, fill)
+    return pd.DataFrame(ratios, index=df.index, columns=list(features))
+
+
+def add_ratio_features(df, features=None):
+    """``df`` with the ratio features appended (existing columns of the same name are replaced)."""
+    ratios = ratio_matrix(df, features)
+    return pd.concat([df.drop(columns=ratios.columns, errors='ignore'), ratios], axis=1)
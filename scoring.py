@@ -0,0 +1,70 @@
+"""Vectorised scoring helpers shared by the position profiles."""
+import numpy as np
+import pandas as pd
+
+_COMPARISONS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+
+def weighted_total(df, weight_rules):
+    """Weighted mean of score columns where each weight depends on the score itself.
+
+    ``weight_rules`` is a list of ``(column, op, threshold, weight_if_true, weight_if_false)``:
+    a row weighs ``column`` with ``weight_if_true`` when ``df[column] <op> threshold``
+    and with ``weight_if_false`` otherwise (NaN scores take ``weight_if_false`` and
+    give a NaN total). Equivalent to repeating every score ``weight`` times and
+    averaging, computed for the whole frame at once.
+    """
+    scores = df[[rule[0] for rule in weight_rules]].to_numpy(dtype=float)
+    weights = np.empty_like(scores)
+    for i, (_, op, threshold, if_true, if_false) in enumerate(weight_rules):
+        weights[:, i] = np.where(_COMPARISONS[op](scores[:, i], threshold), if_true, if_false)
+    return pd.Series((scores * weights).sum(axis=1) / weights.sum(axis=1), index=df.index)
+
+
+def _decile_ranks(values):
+    """1-10 decile of every value, binned on the distinct values like
+    ``pd.qcut(unique_values, 10, labels=False, duplicates='drop') + 1``."""
+    distinct = np.unique(values[~np.isnan(values)])
+    ranks = np.full(values.shape, np.nan)
+    if distinct.size == 0:
+        return ranks
+    # Same edges as qcut: Series.quantile goes through np.percentile with q * 100.
+    edges = np.unique(np.percentile(distinct, np.linspace(0, 1, 11) * 100.0))
+    ids = np.searchsorted(edges, values, side='left')
+    ids[values == edges[0]] = 1
+    valid = ~np.isnan(values) & (ids > 0) & (ids < len(edges))
+    ranks[valid] = ids[valid]
+    return ranks
+
+
+def decile_ranks(values, direction='high'):
+    """Decile scores (1-10) of one column as a numpy array.
+
+    ``direction`` is ``'high'`` when a higher value is better and ``'low'`` when
+    a lower value is better. Integer when every row got a score, float with NaN
+    otherwise, matching the dtype the merge-based helpers produced.
+    """
+    values = np.asarray(values, dtype=float)
+    ranks = _decile_ranks(-values if direction == 'low' else values)
+    return ranks if np.isnan(ranks).any() else ranks.astype(np.int64)
+
+
+def decile_scores(df, specs):
+    """Add decile score columns for several metrics in one pass.
+
+    ``specs`` is a list of ``(column, score_column, direction)`` where direction
+    is ``'high'`` when a higher value is better and ``'low'`` when a lower value
+    is better. Scores run 1-10 and are binned on each column's distinct values,
+    the same semantics as the old drop_duplicates + qcut + merge helpers, but
+    computed with searchsorted on the existing rows instead of merging back.
+    Returns a copy with a fresh RangeIndex, as the merge did.
+    """
+    scores = {score_column: decile_ranks(df[column].to_numpy(dtype=float), direction)
+              for column, score_column, direction in specs}
+    df = df.reset_index(drop=True)
+    return df.assign(**scores)
@@ -0,0 +1,349 @@
+"""Set-piece aggregates for the Set Pieces page.
+
+Each league folder ships ``set_pieces_all <league>.csv``: one row per shot
+that came from a set-piece sequence, with the shot location (``x``/``y``, Opta
+0-100 pitch), its xG (qualifier ``321.0``), the kind of set piece and the
+score state. ``build_set_pieces`` turns a league's file into small tables,
+written to ``league_store/<league>/set_pieces_*`` and keyed on the sha1 of the
+source file:
+
+- ``teams``: shots, goals and xG per team and set-piece type, with the
+  number of matches so the page can show per-match values
+- ``players``: the same per shooter, i.e. the players the deliveries find
+- ``grid``: a 2-D histogram of shots, goals and xG per team and set-piece
+  type (``set_pieces_grid.npz``)
+
+The grid's bin edges include the zone boundaries (six-yard box, penalty
+area), so a zone is an exact sum of cells. Grids of any number of teams,
+leagues or seasons add up cell by cell (``sum_grid``), and heatmaps and zone
+summaries (``zone_summary``) take the same time however many matches are
+behind them. ``set_piece_events`` (the event rows) is only read for the shot
+map drill-down. For the same reason ``add_set_pieces`` can add a batch of
+new matches to stored tables without reading the old shots (see ingest).
+
+Build or refresh the tables ahead of time with::
+
+    python set_pieces.py [league ...]
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from league_store import (
+    STORE_DIR, _manifest_lock, _write_manifest, is_fresh, load_manifest,
+    local_leagues, read_league_file, source_path,
+)
+
+# Bump when the aggregation changes so existing tables are rebuilt
+SET_PIECES_VERSION = 2
+
+TABLES = ['teams', 'players']
+
+SET_PIECE_TYPES = ['corner', 'freekick', 'freekick_shot', 'throw_in', 'penalty']
+ZONES = ['Six-yard box', 'Penalty area (central)', 'Penalty area (wide)', 'Outside the box']
+
+# The columns set_piece_events reads from the file
+EVENT_COLUMNS = [
+    'team_name', 'playerName', 'match_id', 'label', 'date', 'set_piece_type', 'match_state',
+    'x', 'y', '321.0', 'sequence_xG', 'typeId',
+]
+
+# Opta typeIds of the shot events in the file
+GOAL = 16
+ON_TARGET = [15, 16]
+
+
+# Grid over the Opta pitch: 5-unit cells plus the box lines, so every zone is a set of cells
+X_EDGES = np.unique(np.concatenate([np.linspace(0, 100, 21), [83.0, 94.2]]))
+Y_EDGES = np.unique(np.concatenate([np.linspace(0, 100, 21), [21.1, 36.8, 63.2, 78.9]]))
+GRID_SHAPE = (len(X_EDGES) - 1, len(Y_EDGES) - 1)
+
+
+def _cell_zones():
+    x, y = np.meshgrid(X_EDGES[:-1], Y_EDGES[:-1], indexing='ij')
+    central = (y >= 36.8) & (y < 63.2)
+    in_box = (x >= 83.0) & (y >= 21.1) & (y < 78.9)
+    return np.select([(x >= 94.2) & central, in_box & central, in_box], [0, 1, 2], default=3)
+
+
+# Zone index (into ZONES) of every grid cell
+CELL_ZONES = _cell_zones()
+
+
+def grid_cells(x, y):
+    """Row and column of the grid cell of each location (clipped to the pitch)."""
+    ix = np.clip(np.searchsorted(X_EDGES, np.asarray(x, dtype=float), side='right') - 1, 0, GRID_SHAPE[0] - 1)
+    iy = np.clip(np.searchsorted(Y_EDGES, np.asarray(y, dtype=float), side='right') - 1, 0, GRID_SHAPE[1] - 1)
+    return ix, iy
+
+
+def shot_zone(x, y):
+    """Zone name of each shot location, as given by its grid cell."""
+    ix, iy = grid_cells(x, y)
+    return np.asarray(ZONES)[CELL_ZONES[ix, iy]]
+
+
+def set_piece_events(df_set_pieces):
+    """Event rows with shot xG, outcome flags, zone and the score state seen from the shooting team."""
+    df = df_set_pieces
+    xg = df['321.0'] if '321.0' in df.columns else df['sequence_xG']
+    state = df['match_state'].fillna('draw').astype(str).str.casefold()
+    team = df['team_name'].astype(str).str.casefold()
+    return pd.DataFrame({
+        'team_name': df['team_name'],
+        'playerName': df['playerName'],
+        'match_id': df['match_id'],
+        'label': df['label'],
+        'date': df['date'],
+        'set_piece_type': df['set_piece_type'],
+        'state': np.select([state == 'draw', state == team], ['drawing', 'leading'], default='trailing'),
+        'x': df['x'],
+        'y': df['y'],
+        'zone': shot_zone(df['x'], df['y']),
+        'xg': xg.fillna(df['sequence_xG']).fillna(0).astype(float),
+        'goal': (df['typeId'] == GOAL).astype(int),
+        'on_target': df['typeId'].isin(ON_TARGET).astype(int),
+    })
+
+
+def team_match_counts(df_set_pieces):
+    """Matches per team, counted from the match labels ("Home vs Away") in the file."""
+    matches = df_set_pieces[['match_id', 'label']].drop_duplicates('match_id')
+    sides = matches['label'].astype(str).str.split(' vs ', n=1, expand=True)
+    teams = pd.concat([sides[0], sides[1]]).str.strip().str.casefold()
+    return teams.value_counts()
+
+
+def _totals(events, keys):
+    df = events.groupby(keys, observed=True).agg(
+        shots=('xg', 'size'),
+        goals=('goal', 'sum'),
+        on_target=('on_target', 'sum'),
+        xg=('xg', 'sum'),
+    ).reset_index()
+    df['xg_per_shot'] = df['xg'] / df['shots']
+    return df
+
+
+def set_piece_grid(events):
+    """Per (team, set-piece type) histograms of shots, goals and xG over the pitch grid."""
+    events = events.dropna(subset=['team_name', 'set_piece_type', 'x', 'y'])
+    groups, keys = pd.MultiIndex.from_frame(events[['team_name', 'set_piece_type']]).factorize()
+    ix, iy = grid_cells(events['x'], events['y'])
+    flat = (groups * GRID_SHAPE[0] + ix) * GRID_SHAPE[1] + iy
+    size = len(keys) * GRID_SHAPE[0] * GRID_SHAPE[1]
+    shape = (len(keys),) + GRID_SHAPE
+    return {
+        'team_name': keys.get_level_values(0).to_numpy(dtype=str),
+        'set_piece_type': keys.get_level_values(1).to_numpy(dtype=str),
+        'shots': np.bincount(flat, minlength=size).reshape(shape).astype(np.uint16),
+        'goals': np.bincount(flat, weights=events['goal'], minlength=size).reshape(shape).astype(np.uint16),
+        'xg': np.bincount(flat, weights=events['xg'], minlength=size).reshape(shape).astype(np.float32),
+    }
+
+
+def sum_grid(grids, teams=None, set_piece_types=None):
+    """Cell-wise sum of shots, goals and xG over one or more grids.
+
+    ``teams`` limits the sum to those team names and ``set_piece_types`` to
+    those types (None: all). Returns a dict of (x, y) arrays.
+    """
+    total = {name: np.zeros(GRID_SHAPE, dtype=float) for name in ['shots', 'goals', 'xg']}
+    for grid in grids:
+        mask = np.ones(len(grid['team_name']), dtype=bool)
+        if teams is not None:
+            mask &= np.isin(grid['team_name'], list(teams))
+        if set_piece_types is not None:
+            mask &= np.isin(grid['set_piece_type'], list(set_piece_types))
+        for name in total:
+            total[name] += grid[name][mask].sum(axis=0, dtype=float)
+    return total
+
+
+def zone_summary(grid_total):
+    """Shots, goals, xG and share of xG per zone of a summed grid."""
+    zones = CELL_ZONES.ravel()
+    df = pd.DataFrame(
+        {name: np.bincount(zones, weights=grid_total[name].ravel(), minlength=len(ZONES))
+         for name in ['shots', 'goals', 'xg']},
+        index=pd.Index(ZONES, name='zone'),
+    )
+    total_xg = df['xg'].sum()
+    df['share_of_xg_%'] = 100 * df['xg'] / total_xg if total_xg > 0 else 0.0
+    return df
+
+
+def add_grids(grid, other):
+    """Cell-wise sum of two grids, matched on (team, set-piece type)."""
+    position = {key: i for i, key in enumerate(zip(grid['team_name'], grid['set_piece_type']))}
+    stored = len(position)
+    rows = np.array([position.setdefault(key, len(position))
+                     for key in zip(other['team_name'], other['set_piece_type'])], dtype=int)
+    total = {
+        'team_name': np.array([team for team, _ in position], dtype=str),
+        'set_piece_type': np.array([kind for _, kind in position], dtype=str),
+    }
+    for name in ['shots', 'goals', 'xg']:
+        values = np.zeros((len(position),) + GRID_SHAPE, dtype=grid[name].dtype)
+        values[:stored] = grid[name]
+        values[rows] += other[name].astype(values.dtype)
+        total[name] = values
+    return total
+
+
+def _add_totals(df, other, keys):
+    df = pd.concat([df, other], ignore_index=True)
+    df = df.groupby(keys, observed=True)[['shots', 'goals', 'on_target', 'xg']].sum().reset_index()
+    df['xg_per_shot'] = df['xg'] / df['shots']
+    return df
+
+
+def set_piece_tables(df_set_pieces):
+    """The ``teams`` and ``players`` aggregates and the ``grid`` of one league."""
+    events = set_piece_events(df_set_pieces)
+    teams = _totals(events, ['team_name', 'set_piece_type'])
+    matches = team_match_counts(df_set_pieces)
+    teams['matches'] = teams['team_name'].astype(str).str.casefold().map(matches).fillna(0).astype(int)
+    return {
+        'teams': teams,
+        'players': _totals(events, ['team_name', 'playerName', 'set_piece_type']),
+        'grid': set_piece_grid(events),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Persisted tables
+# ---------------------------------------------------------------------------
+def table_path(league, table):
+    return STORE_DIR / league / f'set_pieces_{table}.parquet'
+
+
+def grid_path(league):
+    return STORE_DIR / league / 'set_pieces_grid.npz'
+
+
+def entry_key(entry):
+    """Table key for a store entry of the set-piece file."""
+    return f"v{SET_PIECES_VERSION}:{entry['sha1']}"
+
+
+def source_key(league):
+    """sha1 of the league's set-piece file when the store has it, else None."""
+    source = source_path(league, 'set_pieces_all')
+    if not source.exists():
+        return None
+    entry = load_manifest()['leagues'].get(league, {}).get('set_pieces_all')
+    if not is_fresh(entry, source):
+        return None
+    return entry_key(entry)
+
+
+def _save_set_pieces(league, tables, key):
+    try:
+        for table in TABLES:
+            target = table_path(league, table)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_target = target.with_suffix('.parquet.tmp')
+            tables[table].to_parquet(tmp_target, index=False)
+            os.replace(tmp_target, target)
+        tmp_target = grid_path(league).with_suffix('.tmp.npz')
+        np.savez_compressed(tmp_target, **tables['grid'])
+        os.replace(tmp_target, grid_path(league))
+    except OSError:
+        return
+
+    with _manifest_lock:
+        manifest = load_manifest()
+        manifest.setdefault('set_pieces', {})[league] = {
+            'key': key,
+            'rows': {table: len(tables[table]) for table in TABLES},
+        }
+        try:
+            _write_manifest(manifest)
+        except OSError:
+            pass
+
+
+def _read_tables(league):
+    tables = {table: pd.read_parquet(table_path(league, table)) for table in TABLES}
+    with np.load(grid_path(league)) as grid:
+        tables['grid'] = {name: grid[name] for name in grid.files}
+    return tables
+
+
+def build_set_pieces(league):
+    """Aggregate one league's set-piece file and persist the tables when possible."""
+    tables = set_piece_tables(read_league_file(league, 'set_pieces_all', EVENT_COLUMNS))
+    key = source_key(league)
+    if key is not None:
+        _save_set_pieces(league, tables, key)
+    return tables
+
+
+def add_set_pieces(league, df_set_pieces):
+    """Add the shots of new matches to the stored tables; ``df_set_pieces`` holds only their rows.
+
+    Totals and grids are sums, so the stored ones are added to. The match
+    counts come from the labels of the whole file.
+    """
+    tables = _read_tables(league)
+    added = set_piece_tables(df_set_pieces)
+    teams = _add_totals(tables['teams'].drop(columns='matches'), added['teams'], ['team_name', 'set_piece_type'])
+    matches = team_match_counts(read_league_file(league, 'set_pieces_all', ['match_id', 'label']))
+    teams['matches'] = teams['team_name'].astype(str).str.casefold().map(matches).fillna(0).astype(int)
+    tables = {
+        'teams': teams,
+        'players': _add_totals(tables['players'], added['players'], ['team_name', 'playerName', 'set_piece_type']),
+        'grid': add_grids(tables['grid'], added['grid']),
+    }
+    key = source_key(league)
+    if key is not None:
+        _save_set_pieces(league, tables, key)
+    return tables
+
+
+def load_set_pieces(league):
+    """Aggregates of one league, from disk when the set-piece file is unchanged."""
+    key = source_key(league)
+    entry = load_manifest().get('set_pieces', {}).get(league)
+    if (key is not None and entry and entry['key'] == key and grid_path(league).exists()
+            and all(table_path(league, table).exists() for table in TABLES)):
+        return _read_tables(league)
+    return build_set_pieces(league)
+
+
+def load_events(league):
+    """Event rows of one league, for the drill-down."""
+    return set_piece_events(read_league_file(league, 'set_pieces_all', EVENT_COLUMNS))
+
+
+def build_all(leagues=None):
+    """Build every missing or stale set-piece table of ``leagues`` (default: all local leagues)."""
+    leagues = leagues or local_leagues()
+    manifest = load_manifest()
+    built = 0
+    for league in leagues:
+        if not source_path(league, 'set_pieces_all').exists():
+            continue
+        entry = manifest.get('set_pieces', {}).get(league)
+        key = source_key(league)
+        if key is not None and entry and entry['key'] == key:
+            continue
+        try:
+            build_set_pieces(league)
+        except Exception as e:
+            print(f"skipped {league}: {e}")
+            continue
+        built += 1
+        print(f"built set pieces for {league}")
+    return built
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the per-league set-piece tables.')
+    parser.add_argument('leagues', nargs='*', help='league folders to build (default: all)')
+    args = parser.parse_args()
+    count = build_all(args.leagues or None)
+    print(f"{count} set-piece table set(s) built in {STORE_DIR}")
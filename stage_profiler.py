@@ -0,0 +1,208 @@
+"""Stage timings of the app, per session.
+
+Each session keeps a ``StageLog``. The expensive steps of a run (league loads,
+the combined Scouting frame, every selected position tab, profile scoring,
+the similarity index and the 2-D embeddings) are wrapped in
+``log.stage(name, ...)``, which records:
+
+- the wall time
+- the rows going in and coming out
+- the peak of Python allocations during the stage (tracemalloc), over what
+  was allocated when it started
+- for cached steps, whether the result was a cache hit. The cached body calls
+  ``mark_miss()``, so a stage that never ran it was served from the cache.
+
+Recording only happens while the session's performance panel is on, and
+tracemalloc only runs while some session records. Otherwise a stage costs one
+attribute check. Every record is appended to
+``league_store/perf_logs/<session>.jsonl`` as it finishes, so the timings
+survive the session. Print the p50/p95 per stage over all logs with::
+
+    python stage_profiler.py [--days N]
+"""
+import argparse
+import json
+import threading
+import time
+import tracemalloc
+import uuid
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from league_store import STORE_DIR
+
+LOG_DIR = STORE_DIR / 'perf_logs'
+
+_lock = threading.Lock()
+_local = threading.local()
+# Records of every session's open stages, across threads, for the tracemalloc peaks
+_open = []
+_tracing_logs = 0
+
+
+def _fold_peak():
+    # The traced peak since the last fold happened while all of _open were running
+    current, peak = tracemalloc.get_traced_memory()
+    for record in _open:
+        record['_peak'] = max(record['_peak'], peak)
+    tracemalloc.reset_peak()
+    return current
+
+
+def _release_tracing():
+    global _tracing_logs
+    with _lock:
+        _tracing_logs -= 1
+        if not _tracing_logs and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def mark_miss():
+    """Mark the innermost open cached stage of this thread as a cache miss."""
+    for record in reversed(getattr(_local, 'stack', [])):
+        if record.get('cache') is not None:
+            record['cache'] = 'miss'
+            return
+
+
+class StageLog:
+    def __init__(self, session_id=None, log_dir=LOG_DIR):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.log_dir = log_dir
+        self.enabled = False
+        self.run = 0
+        self.records = []
+        self.history = []
+        self._lock = threading.Lock()
+        self._release = None
+
+    def enable(self, on=True):
+        """Turn recording on or off; tracemalloc runs while any log records."""
+        global _tracing_logs
+        on = bool(on)
+        if on == self.enabled:
+            return
+        self.enabled = on
+        if not on:
+            self._release()
+            return
+        with _lock:
+            _tracing_logs += 1
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        # A session that ends with the panel on still releases its share of the tracing
+        self._release = weakref.finalize(self, _release_tracing)
+
+    def start_run(self):
+        """Start the records of a new script run."""
+        with self._lock:
+            self.run += 1
+            self.records = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None, cached=False, **fields):
+        """Record one stage; set ``rows_out`` on the yielded dict to log the rows produced.
+
+        With ``cached=True`` the stage counts as a cache hit unless its body
+        calls ``mark_miss()``. Extra ``fields`` (e.g. ``detail``: the league or
+        profile) go into the record as they are.
+        """
+        record = {'stage': name, 'rows_in': rows_in, 'rows_out': None,
+                  'cache': 'hit' if cached else None, **fields}
+        if not self.enabled:
+            yield record
+            return
+
+        stack = _local.__dict__.setdefault('stack', [])
+        with _lock:
+            tracing = tracemalloc.is_tracing()
+            record['_start'] = _fold_peak() if tracing else 0
+            record['_peak'] = record['_start']
+            _open.append(record)
+        stack.append(record)
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - started
+            stack.remove(record)
+            with _lock:
+                if tracing and tracemalloc.is_tracing():
+                    _fold_peak()
+                _open.remove(record)
+            peak = (record.pop('_peak') - record.pop('_start')) / 2**20 if tracing else None
+            record.update({'seconds': seconds, 'peak_mb': peak})
+            self._add(record)
+
+    def _add(self, record):
+        record = {'session': self.session_id, 'run': self.run,
+                  'time': datetime.now().isoformat(timespec='seconds'), **record}
+        with self._lock:
+            self.records.append(record)
+            self.history.append(record)
+        try:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.log_dir / f'{self.session_id}.jsonl', 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+        except OSError:
+            pass
+
+    def run_table(self):
+        """The stages of the current run, in the order they finished."""
+        with self._lock:
+            return pd.DataFrame(self.records, columns=RUN_COLUMNS) if self.records else None
+
+    def session_summary(self):
+        """p50/p95 per stage over the whole session."""
+        with self._lock:
+            return percentiles(pd.DataFrame(self.history)) if self.history else None
+
+
+RUN_COLUMNS = ['stage', 'detail', 'seconds', 'rows_in', 'rows_out', 'peak_mb', 'cache']
+
+
+def percentiles(df):
+    """Count, p50 and p95 of the seconds and peak memory per stage, plus the cache hit rate."""
+    df = df.reindex(columns=list(dict.fromkeys(['stage', 'seconds', 'peak_mb', 'cache'] + list(df.columns))))
+    df = df.assign(
+        seconds=pd.to_numeric(df['seconds'], errors='coerce'),
+        peak_mb=pd.to_numeric(df['peak_mb'], errors='coerce'),
+        hit=df['cache'].eq('hit').astype(float).where(df['cache'].notna()),
+    )
+    grouped = df.groupby('stage')
+    summary = pd.DataFrame({
+        'count': grouped.size(),
+        'p50_s': grouped['seconds'].quantile(0.5),
+        'p95_s': grouped['seconds'].quantile(0.95),
+        'p95_peak_mb': grouped['peak_mb'].quantile(0.95),
+        'hit_rate': grouped['hit'].mean(),
+    })
+    return summary.sort_values('p95_s', ascending=False).reset_index()
+
+
+def read_logs(log_dir=LOG_DIR, since=None):
+    """All records of the session logs in ``log_dir``, optionally only those after ``since``."""
+    records = []
+    for path in sorted(log_dir.glob('*.jsonl')):
+        with open(path, encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    df = pd.DataFrame(records)
+    if since is not None and not df.empty:
+        df = df[pd.to_datetime(df['time']) >= since]
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='p50/p95 stage timings over the session logs.')
+    parser.add_argument('--days', type=float, help='only records of the last N days')
+    args = parser.parse_args()
+    since = datetime.now() - timedelta(days=args.days) if args.days else None
+    df = read_logs(since=since)
+    if df.empty:
+        print(f"no records in {LOG_DIR}")
+    else:
+        print(f"{df['session'].nunique()} session(s), {len(df)} record(s)")
+        print(percentiles(df).round(3).to_string(index=False))
@@ -0,0 +1,163 @@
+"""Per-team match rows for the Team Comparison page.
+
+``team_match_table`` sums a league's ``matchstats_all`` player rows to one row
+per team and match date. That table is a few hundred rows a season, and it is
+written to ``league_store/<league>/team_matches.parquet``, keyed on the sha1
+of the matchstats file (see league_store). The page reads only these rows and
+picks its window (last three months, a date range or each team's last N
+matches) with ``in_window`` before averaging, so the player-level file is
+parsed once per change instead of on every visit. ``append_team_matches``
+adds the rows of new matches to a stored table (see ingest).
+
+Build or refresh the tables ahead of time with::
+
+    python team_matches.py [league ...]
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from league_store import (
+    REPO_DIR, STORE_DIR, _manifest_lock, _write_manifest, is_fresh, load_manifest,
+    local_leagues, numeric_columns, source_path, sum_league_file,
+)
+
+# Bump when team_match_table changes so existing tables are rebuilt
+TEAM_MATCHES_VERSION = 1
+
+
+def team_matches_path(league):
+    return STORE_DIR / league / 'team_matches.parquet'
+
+
+def _by_team_and_day(df):
+    # Sums per team and date string -> sums per team and day
+    df = df.assign(date=pd.to_datetime(df['date'], errors='coerce'))
+    df = df[df['date'].notna()]
+    return df.groupby(['team_name', 'date'], observed=True).sum(numeric_only=True).astype(float).reset_index()
+
+
+def team_match_table(df_matchstats):
+    """Unrounded per-team, per-date sums of the matchstats counts (minsPlayed and formation left out)."""
+    df = df_matchstats[df_matchstats['successfulOpenPlayPass'].notna()]
+    df = df.drop(columns=['formationUsed', 'minsPlayed'], errors='ignore')
+    return _by_team_and_day(df)
+
+
+def league_team_match_table(league):
+    """team_match_table of one league's matchstats file, summed a chunk at a time."""
+    columns = [col for col in numeric_columns(league, 'matchstats_all') if col not in ('formationUsed', 'minsPlayed')]
+    df = sum_league_file(league, 'matchstats_all', ['team_name', 'date'], columns, notna='successfulOpenPlayPass')
+    return _by_team_and_day(df.reset_index())
+
+
+def entry_key(entry):
+    """Table key for a store entry of the matchstats file."""
+    return f"v{TEAM_MATCHES_VERSION}:{entry['sha1']}"
+
+
+def source_key(league):
+    """sha1 of the league's matchstats file when the store has it, else None."""
+    source = source_path(league, 'matchstats_all')
+    if not source.exists():
+        return None
+    entry = load_manifest()['leagues'].get(league, {}).get('matchstats_all')
+    if not is_fresh(entry, source):
+        return None
+    return entry_key(entry)
+
+
+def _save_team_matches(league, df, key):
+    target = team_matches_path(league)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_target = target.with_suffix('.parquet.tmp')
+        df.to_parquet(tmp_target, index=False)
+        os.replace(tmp_target, target)
+    except OSError:
+        return
+
+    with _manifest_lock:
+        manifest = load_manifest()
+        manifest.setdefault('team_matches', {})[league] = {
+            'key': key,
+            'path': str(target.relative_to(REPO_DIR)),
+            'rows': len(df),
+        }
+        try:
+            _write_manifest(manifest)
+        except OSError:
+            pass
+
+
+def build_team_matches(league):
+    """Aggregate one league from its matchstats file and persist the table when possible."""
+    df = league_team_match_table(league)
+    key = source_key(league)
+    if key is not None:
+        _save_team_matches(league, df, key)
+    return df
+
+
+def append_team_matches(league, df_matchstats):
+    """Add the rows of new matches to the stored table; ``df_matchstats`` holds only their player rows."""
+    df = pd.concat([pd.read_parquet(team_matches_path(league)), team_match_table(df_matchstats)], ignore_index=True)
+    df = df.groupby(['team_name', 'date'], observed=True).sum().reset_index()
+    key = source_key(league)
+    if key is not None:
+        _save_team_matches(league, df, key)
+    return df
+
+
+def load_team_matches(league):
+    """Team match rows of one league, from disk when the matchstats file is unchanged."""
+    key = source_key(league)
+    entry = load_manifest().get('team_matches', {}).get(league)
+    if key is not None and entry and entry['key'] == key and (REPO_DIR / entry['path']).exists():
+        return pd.read_parquet(REPO_DIR / entry['path'])
+    return build_team_matches(league)
+
+
+def in_window(df, start=None, end=None, last_n=None):
+    """Rows with ``start <= date <= end`` (either bound optional), then each team's last ``last_n``.
+
+    Teams are told apart by ``source_folder`` and ``team_name``.
+    """
+    if start is not None:
+        df = df[df['date'] >= start]
+    if end is not None:
+        df = df[df['date'] <= end]
+    if last_n is not None:
+        df = df.sort_values('date', kind='stable').groupby(['source_folder', 'team_name'], observed=True).tail(last_n)
+    return df
+
+
+def build_all(leagues=None):
+    """Build every missing or stale team table of ``leagues`` (default: all local leagues)."""
+    leagues = leagues or local_leagues()
+    manifest = load_manifest()
+    built = 0
+    for league in leagues:
+        if not source_path(league, 'matchstats_all').exists():
+            continue
+        entry = manifest.get('team_matches', {}).get(league)
+        key = source_key(league)
+        if key is not None and entry and entry['key'] == key:
+            continue
+        try:
+            build_team_matches(league)
+        except Exception as e:
+            print(f"skipped {league}: {e}")
+            continue
+        built += 1
+        print(f"built team matches for {league}")
+    return built
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the per-league team match tables.')
+    parser.add_argument('leagues', nargs='*', help='league folders to build (default: all)')
+    args = parser.parse_args()
+    count = build_all(args.leagues or None)
+    print(f"{count} team match table(s) built in {STORE_DIR}")